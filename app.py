@@ -1,42 +1,212 @@
-from flask import Flask
-import mysql.connector
-
-app = Flask(__name__, template_folder='./template')
-app.secret_key = 'secret123'
-
-# MySQL configuration
-db = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="password",
-    database="SixSeven"
+import importlib
+import time
+
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+
+# Boundaries are imported by create_app (and timed), not when this module loads
+BLUEPRINTS = (
+    ("boundary.auth_boundary", "auth_api"),
+    ("boundary.role_page_boundary", "role_page_api"),
+    ("boundary.health_boundary", "health_api"),
+    ("boundary.platform_manager_boundary", "pm_api"),
+    ("boundary.request_boundary", "pin_req_api"),
+    ("boundary.match_boundary", "match_api"),
+    ("boundary.shortlist_boundary", "csr_shortlist_api"),
+    ("boundary.admin_boundary", "admin_api"),
+    ("boundary.user_boundary", "user_api"),
+    ("boundary.report_boundary", "report_page_api"),
+    ("boundary.metrics_boundary", "metrics_api"),
 )
-app.config["DB"] = db
-
-
-# Register boundaries
-from boundary.auth_boundary import auth_api
-from boundary.role_page_boundary import role_page_api
-from boundary.health_boundary import health_api
-from boundary.platform_manager_boundary import pm_api
-from boundary.request_boundary import pin_req_api
-from boundary.match_boundary import match_api
-from boundary.shortlist_boundary import csr_shortlist_api
-from boundary.admin_boundary import admin_api
-from boundary.user_boundary import user_api
-from boundary.report_boundary import report_page_api
-
-
-app.register_blueprint(auth_api)
-app.register_blueprint(role_page_api)
-app.register_blueprint(health_api)
-app.register_blueprint(pm_api)
-app.register_blueprint(pin_req_api)  
-app.register_blueprint(match_api)    
-app.register_blueprint(csr_shortlist_api)
-app.register_blueprint(admin_api)
-app.register_blueprint(user_api)
-app.register_blueprint(report_page_api)
+
+
+def create_app(config=None):
+    """
+    Build the app. `config` overrides the defaults below (tests pass e.g.
+    {"DB_BACKEND": "sqlite"}). No database connection is opened here: the pool
+    connects on the first checkout. Seconds spent importing each module are
+    kept in app.extensions["import_timings"] (see `flask --app app import-times`).
+    """
+    app = Flask(__name__, template_folder='./template')
+    app.secret_key = 'secret123'
+
+    # MySQL configuration ("sqlite" runs on an embedded in-memory database instead, see entity/sqlite_backend.py)
+    app.config["DB_BACKEND"] = "mysql"
+    app.config["DB_CONFIG"] = {
+        "host": "localhost",
+        "user": "root",
+        "password": "password",
+        "database": "SixSeven",
+    }
+    app.config["DB_POOL_SIZE"] = 10      # connections shared by all worker threads
+    app.config["DB_POOL_TIMEOUT"] = 10.0  # seconds to wait for a free connection
+
+    # Request views are buffered and written in batches by a background thread
+    app.config["VIEW_SINK_BATCH_SIZE"] = 500       # flush once this many views are queued
+    app.config["VIEW_SINK_FLUSH_INTERVAL"] = 1.0   # ...or after this many seconds
+    app.config["VIEW_SINK_MAX_QUEUE"] = 10000      # views beyond this are dropped (and counted)
+
+    # Service categories are cached in memory; other workers pick up edits within this many seconds
+    app.config["CATEGORY_CACHE_CHECK_INTERVAL"] = 2.0
+
+    # Request details are cached per worker; writes invalidate locally, other workers catch up within the TTL
+    app.config["REQUEST_CACHE_MAX_ENTRIES"] = 1024  # least recently read requests are evicted beyond this
+    app.config["REQUEST_CACHE_TTL"] = 30.0          # seconds
+
+    # Identical concurrent dashboard searches share one query (see entity/single_flight.py)
+    app.config["SINGLE_FLIGHT_ENABLED"] = True
+    app.config["SINGLE_FLIGHT_WINDOW"] = 0.05  # seconds a finished result is still shared; writes in it aren't seen
+
+    # Per-request SQL profiling: Server-Timing header, recent requests at /debug/sql, N+1 warnings
+    app.config["SQL_PROFILER_ENABLED"] = True
+    app.config["SQL_PROFILE_ENDPOINT"] = False         # serve /debug/sql (unauthenticated) outside debug mode
+    app.config["SQL_PROFILER_HISTORY"] = 200           # requests kept in the ring buffer
+    app.config["SQL_PROFILER_REPEAT_THRESHOLD"] = 10   # same statement more often than this = likely N+1
+    app.config["SQL_PROFILER_STRICT"] = False          # True: fail the request instead of logging
+
+    # Live request events at /api/requests/events (Server-Sent Events)
+    app.config["EVENT_HUB_HISTORY"] = 1000    # recent events kept so reconnecting clients can resume
+    app.config["EVENT_HUB_KEEPALIVE"] = 15.0  # seconds between heartbeats on an idle stream
+
+    # Reports read daily rollups; changed days are re-aggregated at most this often (seconds)
+    app.config["REPORT_ROLLUP_MAX_AGE"] = 60.0
+
+    if config:
+        app.config.update(config)
+
+    timings = {}
+    app.extensions["import_timings"] = timings
+
+    def load(module_name):
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        # a module already imported by an earlier app (or an earlier entry) costs ~0 here
+        timings[module_name] = time.perf_counter() - started
+        return module
+
+    # Extensions; the order matters (the view sink needs the pool, metrics read everything else)
+    for name in (
+        "entity.db_pool",
+        "entity.view_event_sink",
+        "entity.category_cache",
+        "entity.request_cache",
+        "entity.single_flight",
+        "entity.sql_profiler",
+        "utility.event_hub",
+        "utility.metrics",  # Prometheus-format request/pool/cache/queue metrics at /metrics
+    ):
+        load(name).init_app(app)
+
+    # Register boundaries
+    for module_name, attr in BLUEPRINTS:
+        app.register_blueprint(getattr(load(module_name), attr))
+
+    app.cli.add_command(reconcile_counters)
+    app.cli.add_command(rebuild_report_rollup)
+    app.cli.add_command(import_times)
+    app.cli.add_command(migrate)
+    app.cli.add_command(migrate_down)
+    app.cli.add_command(migrate_status)
+    app.cli.add_command(check_indexes)
+    return app
+
+
+# CLI: flask --app app reconcile-counters [--request-id N]
+@click.command("reconcile-counters")
+@with_appcontext
+@click.option("--request-id", type=int, default=None, help="Only reconcile this request.")
+def reconcile_counters(request_id):
+    """Fix drift in request.view_count / shortlist_count."""
+    from entity.pin_request_repository import RequestRepository
+    from control.request_controller import ReconcileRequestCountersController
+
+    fixed = ReconcileRequestCountersController(RequestRepository()).reconcile(request_id)
+    click.echo(f"Reconciled {fixed} request(s).")
+
+
+# CLI: flask --app app rebuild-report-rollup
+@click.command("rebuild-report-rollup")
+@with_appcontext
+def rebuild_report_rollup():
+    """Recompute every day of the report rollup tables."""
+    from entity.report_rollup_repository import ReportRollupRepository
+
+    days = ReportRollupRepository().rebuild_all()
+    click.echo(f"Rebuilt {days} day(s) of report rollups.")
+
+
+# CLI: flask --app app import-times
+@click.command("import-times")
+@with_appcontext
+def import_times():
+    """Show how long create_app spent importing each module, slowest first."""
+    timings = current_app.extensions["import_timings"]
+    for name, seconds in sorted(timings.items(), key=lambda kv: kv[1], reverse=True):
+        click.echo(f"{seconds * 1000:8.1f} ms  {name}")
+    click.echo(f"{sum(timings.values()) * 1000:8.1f} ms  total")
+
+
+# CLI: flask --app app migrate [--target N]
+@click.command("migrate")
+@with_appcontext
+@click.option("--target", type=int, default=None, help="Stop after this version (default: latest).")
+def migrate(target):
+    """Apply pending schema migrations (migrations/)."""
+    from entity.db_pool import get_db
+    from entity.migration_runner import MigrationRunner
+
+    ran = MigrationRunner(get_db()).upgrade(target)
+    for m in ran:
+        click.echo(f"Applied {m.version:04d}_{m.name}")
+    click.echo(f"{len(ran)} migration(s) applied.")
+
+
+# CLI: flask --app app migrate-down --target N
+@click.command("migrate-down")
+@with_appcontext
+@click.option("--target", type=int, required=True, help="Undo every migration above this version (0 = all).")
+def migrate_down(target):
+    """Revert schema migrations, newest first."""
+    from entity.db_pool import get_db
+    from entity.migration_runner import MigrationRunner
+
+    ran = MigrationRunner(get_db()).downgrade(target)
+    for m in ran:
+        click.echo(f"Reverted {m.version:04d}_{m.name}")
+    click.echo(f"{len(ran)} migration(s) reverted.")
+
+
+# CLI: flask --app app migrate-status
+@click.command("migrate-status")
+@with_appcontext
+def migrate_status():
+    """List known migrations and when each was applied."""
+    from entity.db_pool import get_db
+    from entity.migration_runner import MigrationRunner
+
+    for m, applied_at in MigrationRunner(get_db()).status():
+        click.echo(f"{m.version:04d}_{m.name:<40} {applied_at or 'pending'}")
+
+
+# CLI: flask --app app check-indexes
+@click.command("check-indexes")
+@with_appcontext
+def check_indexes():
+    """EXPLAIN the hot queries and confirm they use the migrated indexes."""
+    from entity.db_pool import get_db
+    from migrations.index_checks import run_checks
+
+    failed = 0
+    for result in run_checks(get_db()):
+        failed += not result.ok
+        used = ", ".join(sorted(result.used)) or "none"
+        click.echo(f"{'ok  ' if result.ok else 'FAIL'}  {result.check.name}: want {result.check.index}, plan uses {used}")
+    if failed:
+        raise click.ClickException(f"{failed} query plan(s) miss their index")
+
+
+app = create_app()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,48 @@
+# benchmarks/compare.py
+"""
+Compare two benchmark JSON files written by benchmarks.run.
+
+    python -m benchmarks.compare bench-100k-abc123.json bench-100k-def456.json [--threshold 10]
+
+Exits with status 1 when any method's p95 got slower by more than --threshold
+percent, or its queries per call went up.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("base")
+    p.add_argument("head")
+    p.add_argument("--threshold", type=float, default=10.0, help="allowed p95 slowdown in percent")
+    args = p.parse_args(argv)
+
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    head = json.loads(Path(args.head).read_text(encoding="utf-8"))
+    print(f"base {base['commit']} ({base['scale']})  ->  head {head['commit']} ({head['scale']})")
+    print(f"{'method':28s} {'p50':>18s} {'p95':>18s} {'p99':>18s} {'q/call':>10s}")
+
+    regressed = False
+    for name, h in head["results"].items():
+        b = base["results"].get(name)
+        if b is None:
+            print(f"{name:28s} (new)")
+            continue
+        cols = [f"{b[k]:7.2f}->{h[k]:7.2f}" for k in ("p50_ms", "p95_ms", "p99_ms")]
+        slower = b["p95_ms"] and (h["p95_ms"] - b["p95_ms"]) / b["p95_ms"] * 100 > args.threshold
+        more_queries = h["queries_per_call"] > b["queries_per_call"]
+        flag = "  <-- slower" if slower else ""
+        flag += "  <-- more queries" if more_queries else ""
+        regressed = regressed or bool(slower) or more_queries
+        print(f"{name:28s} {cols[0]:>18s} {cols[1]:>18s} {cols[2]:>18s} "
+              f"{b['queries_per_call']:4.1f}->{h['queries_per_call']:<4.1f}{flag}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
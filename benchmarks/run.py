@@ -0,0 +1,216 @@
+# benchmarks/run.py
+"""
+Time the hot repository methods against a seeded MySQL database.
+
+    python -m benchmarks.run --scale 10k --output bench-10k.json
+    python -m benchmarks.run --scale 100k --no-seed --iterations 500
+    python -m benchmarks.compare base.json head.json
+
+Each method is called with randomised (but seeded) arguments; the JSON output
+records p50/p95/p99 latency, queries and rows per call, the dataset counts and
+the git commit, so runs can be compared across commits. Point it at a
+throwaway database: seeding truncates every table.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import mysql.connector
+
+from benchmarks.seed import SCALES, SeedConfig, SeededDataset, create_schema, seed
+from entity.match_repository import MatchRepository
+from entity.pin_request_repository import RequestRepository
+from entity.shortlist_repository import ShortlistRepository
+from entity.sql_profiler import SqlProfiler
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def build_cases(db, data: SeededDataset, rng: random.Random) -> Dict[str, Callable[[], Any]]:
+    """One zero-argument callable per benchmarked method; each call draws fresh arguments."""
+    requests = RequestRepository(db)
+    matches = MatchRepository(db)
+    shortlists = ShortlistRepository(db)
+
+    def window(days: int):
+        to = data.last_day - timedelta(days=rng.randrange(0, 30))
+        return to - timedelta(days=days), to
+
+    def search_requests_by_status():
+        return requests.search_requests_by_status(status="Open", query=rng.choice(["", "groceries", "clinic"]), limit=50)
+
+    def get_request_by_id():
+        return requests.get_request_by_id(rng.randint(1, data.requests))
+
+    def list_past_matches():
+        frm, to = window(90)
+        return matches.list_past_matches(
+            user_id=rng.choice(data.pins), user_type="pin_user_id",
+            completion_from=frm, completion_to=to,
+        )
+
+    def view_shortlist():
+        return shortlists.view_shortlist(rng.choice(data.csrs), rng.choice(["", "help"]))
+
+    def count_by_category():
+        frm, to = window(30)
+        return requests.count_by_category(frm, to)
+
+    def completion_trend_with_ma():
+        frm, to = window(90)
+        return matches.completion_trend_with_ma(frm, to, window=7)
+
+    return {
+        "search_requests_by_status": search_requests_by_status,
+        "get_request_by_id": get_request_by_id,
+        "list_past_matches": list_past_matches,
+        "view_shortlist": view_shortlist,
+        "count_by_category": count_by_category,
+        "completion_trend_with_ma": completion_trend_with_ma,
+    }
+
+
+def run_case(profiler: SqlProfiler, fn: Callable[[], Any], *, iterations: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    queries = rows = 0
+    for _ in range(iterations):
+        with profiler.capture() as profile:
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        queries += profile.query_count
+        rows += profile.rows
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "max_ms": round(samples[-1], 3),
+        "queries_per_call": round(queries / iterations, 2),
+        "rows_per_call": round(rows / iterations, 1),
+    }
+
+
+def dataset_from_db(conn) -> SeededDataset:
+    """Rebuild the argument pools from an already seeded database (--no-seed)."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT user_id, role FROM user")
+        users = cur.fetchall()
+        cur.execute("SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM request")
+        n, first, last = cur.fetchone()
+        cur.execute("SELECT category_id FROM service_category")
+        categories = [r[0] for r in cur.fetchall()]
+        counts = {"requests": n}
+        for key, table in (("views", "request_view"), ("shortlists", "shortlist"), ("matches", "match")):
+            cur.execute(f"SELECT COUNT(*) FROM `{table}`")
+            counts[key] = cur.fetchone()[0]
+    finally:
+        cur.close()
+    return SeededDataset(
+        requests=n,
+        pins=[u for u, role in users if role == "PIN_Support"],
+        csrs=[u for u, role in users if role == "Csr_Rep"],
+        categories=categories,
+        first_day=first,
+        last_day=last,
+        counts=counts,
+    )
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--scale", choices=sorted(SCALES), default="10k", help="number of requests to seed")
+    p.add_argument("--requests", type=int, help="seed exactly this many requests (overrides --scale)")
+    p.add_argument("--no-seed", action="store_true", help="reuse the data already in the database")
+    p.add_argument("--iterations", type=int, default=200)
+    p.add_argument("--warmup", type=int, default=20)
+    p.add_argument("--only", action="append", help="benchmark only this method (repeatable)")
+    p.add_argument("--output", default=None, help="JSON file to write (default: bench-<scale>-<commit>.json)")
+    p.add_argument("--host", default=os.environ.get("BENCH_DB_HOST", "127.0.0.1"))
+    p.add_argument("--port", type=int, default=int(os.environ.get("BENCH_DB_PORT", "3306")))
+    p.add_argument("--user", default=os.environ.get("BENCH_DB_USER", "root"))
+    p.add_argument("--password", default=os.environ.get("BENCH_DB_PASSWORD", "password"))
+    p.add_argument("--database", default=os.environ.get("BENCH_DB_NAME", "sixseven_bench"))
+    args = p.parse_args(argv)
+
+    server = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=args.password)
+    create_schema(server, args.database)
+    server.close()
+    conn = mysql.connector.connect(
+        host=args.host, port=args.port, user=args.user, password=args.password, database=args.database
+    )
+
+    if args.no_seed:
+        data = dataset_from_db(conn)
+    else:
+        n = args.requests or SCALES[args.scale]
+        print(f"Seeding {n} requests into {args.database} ...")
+        data = seed(conn, SeedConfig(requests=n))
+
+    profiler = SqlProfiler()
+    db = profiler.wrap(conn)
+    cases = build_cases(db, data, random.Random(13))
+    if args.only:
+        unknown = set(args.only) - set(cases)
+        if unknown:
+            p.error(f"unknown method(s): {', '.join(sorted(unknown))}")
+        cases = {k: v for k, v in cases.items() if k in args.only}
+
+    results: Dict[str, Any] = {}
+    for name, fn in cases.items():
+        results[name] = run_case(profiler, fn, iterations=args.iterations, warmup=args.warmup)
+        conn.commit()  # don't let one long read view span the whole run
+        r = results[name]
+        print(f"{name:28s} p50 {r['p50_ms']:9.2f} ms  p95 {r['p95_ms']:9.2f} ms  "
+              f"p99 {r['p99_ms']:9.2f} ms  {r['queries_per_call']:.1f} q/call")
+    conn.close()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "scale": args.requests or args.scale,
+        "dataset": data.counts,
+        "iterations": args.iterations,
+        "python": sys.version.split()[0],
+        "machine": platform.platform(),
+        "results": results,
+    }
+    out = Path(args.output or f"bench-{args.requests or args.scale}-{commit}.json")
+    out.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    print(f"Wrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+# benchmarks/seed.py
+"""
+Deterministic synthetic dataset for the repository benchmarks.
+
+The schema comes from refinedModel.sql (re-targeted at the benchmark
+database) plus every migration, so benchmarks always run against the same
+tables and indexes as the app. Volumes scale from the number of requests; everything else is
+proportional so 10k / 100k / 1M runs stay comparable.
+"""
+from __future__ import annotations
+
+import random
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, List, Sequence
+
+from entity.migration_runner import MigrationRunner
+
+SCHEMA_FILE = Path(__file__).resolve().parent.parent / "refinedModel.sql"
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+CATEGORIES = [
+    "Medical Escort", "Groceries", "Home Repair", "Tutoring", "Transport",
+    "Companionship", "Meal Delivery", "Senior Support", "Shelter", "Hunger Relief",
+]
+LOCATIONS = [
+    "Ang Mo Kio", "Bedok", "Bishan", "Bukit Batok", "Clementi", "Hougang",
+    "Jurong West", "Orchard", "Punggol", "Sengkang", "Tampines", "Woodlands",
+]
+WORDS = (
+    "help need weekly groceries transport clinic appointment elderly repair leaking "
+    "tap tutoring math english meal delivery companionship visit wheelchair shopping "
+    "medicine pickup laundry cleaning garden paperwork forms computer phone setup"
+).split()
+STATUSES = ["Open"] * 5 + ["In Progress"] * 2 + ["Completed"] * 2 + ["Cancelled"]
+
+BATCH = 5_000
+
+
+@dataclass
+class SeedConfig:
+    requests: int
+    days: int = 365
+    views_per_request: float = 5.0
+    shortlists_per_request: float = 0.5
+    requests_per_pin: int = 20
+    requests_per_csr: int = 100
+    seed: int = 67
+
+
+@dataclass
+class SeededDataset:
+    requests: int
+    pins: List[int]
+    csrs: List[int]
+    categories: List[int]
+    first_day: datetime
+    last_day: datetime
+    counts: dict
+
+
+def create_schema(conn, database: str) -> None:
+    """Create `database` from refinedModel.sql (DDL only, no sample rows) and apply every migration."""
+    ddl = SCHEMA_FILE.read_text(encoding="utf-8").split("-- Dumping data", 1)[0]
+    ddl = re.sub(r"`sixseven`", f"`{database}`", ddl, flags=re.IGNORECASE)
+    cur = conn.cursor()
+    try:
+        for stmt in _statements(ddl):
+            cur.execute(stmt)
+        conn.commit()
+    finally:
+        cur.close()
+    MigrationRunner(conn).upgrade()  # the connection is on `database` after the model's USE
+
+
+def seed(conn, cfg: SeedConfig, log=print) -> SeededDataset:
+    """Empty every table and load a dataset sized by `cfg`. Returns what the benchmarks need to pick arguments."""
+    rng = random.Random(cfg.seed)
+    now = datetime.now().replace(microsecond=0)
+    first = now - timedelta(days=cfg.days)
+    n_pins = max(1, cfg.requests // cfg.requests_per_pin)
+    n_csrs = max(1, cfg.requests // cfg.requests_per_csr)
+
+    cur = conn.cursor()
+    try:
+        cur.execute("SET FOREIGN_KEY_CHECKS = 0")
+        for t in ("request_view", "shortlist", "match", "request", "service_category", "user",
+                  "report_daily_rollup", "report_daily_csr", "report_rollup_dirty"):
+            cur.execute(f"TRUNCATE TABLE `{t}`")
+        cur.execute("SET FOREIGN_KEY_CHECKS = 1")
+        conn.commit()
+
+        started = time.perf_counter()
+        cur.executemany(
+            "INSERT INTO service_category (category_id, category_name) VALUES (%s, %s)",
+            [(i + 1, name) for i, name in enumerate(CATEGORIES)],
+        )
+        users = [(f"pin{i}", "x", "PIN_Support", first) for i in range(n_pins)]
+        users += [(f"csr{i}", "x", "Csr_Rep", first) for i in range(n_csrs)]
+        _insert(conn, cur, "INSERT INTO user (username, password, role, created_at) VALUES (%s, %s, %s, %s)", users)
+        pins = list(range(1, n_pins + 1))
+        csrs = list(range(n_pins + 1, n_pins + n_csrs + 1))
+
+        # only (created_at, pin, status) is kept per request; the text is generated as it streams out
+        created, owner, status = [], [], []
+        span = int((now - first).total_seconds())
+
+        def request_rows() -> Iterator[Sequence]:
+            for _ in range(cfg.requests):
+                ts = first + timedelta(seconds=rng.randrange(span))
+                pin, st = rng.choice(pins), rng.choice(STATUSES)
+                created.append(ts)
+                owner.append(pin)
+                status.append(st)
+                yield (
+                    pin, " ".join(rng.sample(WORDS, 4)).capitalize(), " ".join(rng.choices(WORDS, k=25)),
+                    st, ts, ts, rng.randint(1, len(CATEGORIES)), rng.choice(LOCATIONS),
+                )
+
+        _insert(conn, cur, """
+            INSERT INTO request (pin_user_id, title, description, status, created_at, updated_at, category_id, location)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, request_rows())
+        log(f"  requests: {cfg.requests} in {time.perf_counter() - started:.1f}s")
+
+        def after(ts: datetime) -> datetime:
+            return ts + timedelta(seconds=rng.randrange(max(1, int((now - ts).total_seconds()))))
+
+        n_views = int(cfg.requests * cfg.views_per_request)
+        _insert(conn, cur, "INSERT INTO request_view (request_id, viewed_at) VALUES (%s, %s)", (
+            (rid, after(created[rid - 1]))
+            for rid in (rng.randint(1, cfg.requests) for _ in range(n_views))
+        ))
+
+        pairs = {(rng.choice(csrs), rng.randint(1, cfg.requests)) for _ in range(int(cfg.requests * cfg.shortlists_per_request))}
+        _insert(conn, cur, "INSERT INTO shortlist (csr_user_id, request_id, added_at) VALUES (%s, %s, %s)", (
+            (csr, rid, after(created[rid - 1])) for csr, rid in sorted(pairs)
+        ))
+
+        matches = []
+        for rid in range(1, cfg.requests + 1):
+            if status[rid - 1] == "Completed":
+                done = after(created[rid - 1])
+                matches.append((rid, rng.choice(csrs), owner[rid - 1], done.date(), done, "Completed"))
+        _insert(conn, cur, """
+            INSERT INTO `match` (request_id, csr_user_id, pin_user_id, service_date, completion_date, status)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, matches)
+
+        cur.execute("""
+            UPDATE request r
+            LEFT JOIN (SELECT request_id, COUNT(*) AS cnt FROM request_view GROUP BY request_id) rv
+              ON rv.request_id = r.request_id
+            LEFT JOIN (SELECT request_id, COUNT(*) AS cnt FROM shortlist GROUP BY request_id) sl
+              ON sl.request_id = r.request_id
+            SET r.view_count = COALESCE(rv.cnt, 0),
+                r.shortlist_count = COALESCE(sl.cnt, 0),
+                r.updated_at = r.updated_at
+        """)
+        cur.execute("ANALYZE TABLE request, request_view, shortlist, `match`, user")
+        cur.fetchall()
+        conn.commit()
+        log(f"  seeded in {time.perf_counter() - started:.1f}s")
+    finally:
+        cur.close()
+
+    from entity.report_rollup_repository import ReportRollupRepository
+    ReportRollupRepository(conn).rebuild_all()
+
+    return SeededDataset(
+        requests=cfg.requests,
+        pins=pins,
+        csrs=csrs,
+        categories=list(range(1, len(CATEGORIES) + 1)),
+        first_day=first,
+        last_day=now,
+        counts={
+            "requests": cfg.requests, "views": n_views, "shortlists": len(pairs),
+            "matches": len(matches), "pins": n_pins, "csrs": n_csrs,
+        },
+    )
+
+
+def _insert(conn, cur, sql: str, rows: Iterable[Sequence]) -> None:
+    # executemany rewrites INSERT ... VALUES into multi-row statements
+    for chunk in _chunks(rows, BATCH):
+        cur.executemany(sql, chunk)
+        conn.commit()
+
+
+def _chunks(rows: Iterable[Sequence], size: int) -> Iterator[List[Sequence]]:
+    chunk: List[Sequence] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _statements(sql: str) -> Iterator[str]:
+    body = "\n".join(line for line in sql.splitlines() if not line.lstrip().startswith("--"))
+    for stmt in body.split(";"):
+        if stmt.strip():
+            yield stmt.strip()
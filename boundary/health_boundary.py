@@ -1,15 +1,32 @@
-from flask import Blueprint, current_app
+from flask import Blueprint, current_app, jsonify, request
+from entity.db_pool import get_db, get_pool
+from entity.sql_profiler import get_profiler
 
 health_api = Blueprint("health", __name__)
 
 @health_api.get("/test_db")
 def test_db():
     try:
-        db = current_app.config["DB"]
+        db = get_db()
         cur = db.cursor()
         cur.execute("SELECT 1")
         result = cur.fetchone()
         cur.close()
-        return f"Database connection successful! Test query result: {result}"
+        return f"Database connection successful! Test query result: {result} (pool: {get_pool().stats()})"
     except Exception as e:
         return f"Database connection failed: {str(e)}"
+
+
+def recent_sql_profiles():
+    profiler = get_profiler()
+    if profiler is None:
+        return jsonify({"error": "SQL profiling is disabled"}), 404
+    flagged_only = request.args.get("flagged", "").lower() in ("1", "true", "yes")
+    return jsonify({"stats": profiler.stats(), "requests": profiler.recent(flagged_only=flagged_only)})
+
+
+@health_api.record
+def _register_sql_profiles(state):
+    # recent SQL (statements and parameters) is only served in debug mode or when explicitly enabled
+    if state.app.debug or state.app.config.get("SQL_PROFILE_ENDPOINT", False):
+        state.add_url_rule("/debug/sql", view_func=recent_sql_profiles, methods=["GET"])
@@ -8,7 +8,9 @@ from datetime import datetime, date
 
 from entity.match_repository import MatchRepository
 from entity.pin_request_repository import RequestRepository
+from entity.unit_of_work import run_in_transaction
 from control.match_controller import ViewPastMatchController, SearchPastMatchController
+from utility.json_stream import stream_json_array, wants_stream
 from entity.service_category_repository import ServiceCategoryRepository
 
 match_api = Blueprint("match_api", __name__, url_prefix="/api/pin/matches")
@@ -25,6 +27,8 @@ def cat_repo():
 
 # ---------- helpers ----------
 def _match_to_dict(m) -> Dict[str, Any]:
+    if isinstance(m, dict):
+        return dict(m)  # repository row
     try:
         return asdict(m)  # dataclass
     except Exception:
@@ -74,6 +78,7 @@ def _parse_dt(s: Optional[str]) -> Optional[datetime]:
 
 
 # GET /api/pin/matches/past?pin_user_id=3&category_id=2&service_date_from=YYYY-MM-DD&...&completion_to=YYYY-MM-DDTHH:MM
+#     add &stream=1 to receive the same array as a chunked stream
 @match_api.get("/past")
 def view_past_matches():
     try:
@@ -99,7 +104,10 @@ def view_past_matches():
             service_date_to=request.args.get("service_date_to"),
             completion_from=request.args.get("completion_from"),
             completion_to=request.args.get("completion_to"),
+            stream=wants_stream(),
         )
+        if wants_stream():
+            return stream_json_array(items, _normalize_match)
         return jsonify(_list_to_dicts(items))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -171,21 +179,28 @@ def undo_complete():
         mrepo = MatchRepository()
         rrepo = RequestRepository()
 
-        # 1) delete all matches for this request (owned by this PIN)
-        n_deleted = mrepo.delete_by_request(int(request_id), int(pin_user_id))
+        # Both steps commit together, or neither does
+        def undo(uow):
+            # 1) delete all matches for this request (owned by this PIN)
+            n_deleted = mrepo.delete_by_request(int(request_id), int(pin_user_id))
 
-        # 2) switch request away from 'Completed' so it can be edited/deleted later
-        updated = rrepo.update_request(
-            request_id=int(request_id),
-            pin_user_id=int(pin_user_id),
-            status=new_status
-        )
+            # 2) switch request away from 'Completed' so it can be edited/deleted later
+            updated = rrepo.update_request(
+                request_id=int(request_id),
+                pin_user_id=int(pin_user_id),
+                status=new_status
+            )
+            if not updated:
+                uow.rollback_only()  # keep the matches of a request this PIN can't update
+            return n_deleted, updated
+
+        n_deleted, updated = run_in_transaction(mrepo.db, undo)
 
         if not updated:
             return jsonify({
                 "success": False,
-                "message": "Matches removed, but request not updated (not found or not allowed).",
-                "matches_deleted": n_deleted
+                "message": "Request not found or not allowed; no matches were removed.",
+                "matches_deleted": 0
             }), 404
 
         # normalize timestamps for JSON
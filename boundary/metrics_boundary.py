@@ -0,0 +1,8 @@
+from flask import Blueprint, Response, current_app
+from utility.metrics import CONTENT_TYPE, get_metrics
+
+metrics_api = Blueprint("metrics", __name__)
+
+@metrics_api.get("/metrics")
+def metrics():
+    return Response(get_metrics().render(current_app), content_type=CONTENT_TYPE)
@@ -2,13 +2,18 @@
 from flask import Blueprint, jsonify, request, current_app
 from control.service_category_controller import CreateServiceCategoryController, ReadServiceCategoryController, DeleteServiceCategoryController, UpdateServiceCategoryController
 from entity.service_category_repository import ServiceCategoryRepository
+from utility.etag import conditional
 
 pm_api = Blueprint("platform_manager_api", __name__, url_prefix="/api/platform_manager")
 
 def cat_repo() -> ServiceCategoryRepository:
     return ServiceCategoryRepository()
 
+def _categories_marker():
+    return ReadServiceCategoryController(cat_repo()).categories_version()
+
 @pm_api.get("")
+@conditional(_categories_marker)
 def pm_read_categories():
     try:
         categories = ReadServiceCategoryController(cat_repo()).read_categories()
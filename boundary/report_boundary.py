@@ -5,7 +5,7 @@ from entity.report import ReportRepository
 report_page_api = Blueprint("report_api", __name__, url_prefix="/api/report")
 
 def report_repo():
-    return ReportRepository()
+    return ReportRepository(rollup_max_age=current_app.config.get("REPORT_ROLLUP_MAX_AGE", 60.0))
 
 
 @report_page_api.get("")
@@ -1,15 +1,20 @@
 # app/boundaries/pin_request_boundary.py
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app
 from dataclasses import asdict
 from typing import Any, Dict, List
 
 from entity.pin_request_repository import RequestRepository
 from entity.match_repository import MatchRepository
 from entity.request_view_repository import RequestViewRepository
+from entity.view_event_sink import get_view_sink
+from entity.request_cache import get_request_cache
 from entity.service_category_repository import ServiceCategoryRepository
 from control.request_controller import *
+from utility.json_stream import stream_json_array, wants_stream
+from utility.etag import conditional
+from utility.event_hub import format_sse, get_event_hub
 
 pin_req_api = Blueprint("pin_request_api", __name__, url_prefix="/api/requests")
 
@@ -23,9 +28,16 @@ def match_repo():
 def req_view_repo():
     return RequestViewRepository()
 
+def view_sink():
+    # buffered, non-blocking drop-in for RequestViewRepository.save_view
+    return get_view_sink()
+
 def cat_repo():
     return ServiceCategoryRepository()
 
+def events():
+    return get_event_hub()
+
 
 # ---------- helpers ----------
 def _req_to_dict(r) -> Dict[str, Any]:
@@ -48,7 +60,7 @@ def _list_to_dicts(items) -> List[Dict[str, Any]]:
 @pin_req_api.get("/<int:request_id>")
 def get_request_by_id(request_id: int):
     try:
-        controller = ReadRequestController(req_repo(), req_view_repo(), cat_repo())
+        controller = ReadRequestController(req_repo(), view_sink(), cat_repo(), get_request_cache())
         item = controller.read_request(request_id=request_id)
         if item is None:
             return jsonify({"error": "request not found"}), 404
@@ -56,19 +68,38 @@ def get_request_by_id(request_id: int):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# GET /api/requests/active?search=...                      -> full list (legacy)
+# GET /api/requests/active?search=...&stream=1             -> full list, streamed in chunks
+# GET /api/requests/active?search=...&limit=50[&cursor=...] -> {"items": [...], "next_cursor": "..."|null}
+def _active_marker():
+    return SearchPinRequestController(req_repo(), cat_repo=cat_repo()).active_requests_marker()
+
+# All variants answer 304 to a matching If-None-Match
 @pin_req_api.get("/active")
+@conditional(_active_marker)
 def search_active_requests():
     try:
         search = request.args.get("search", type=str)
         if not search:
             search = ""
         controller = SearchPinRequestController(req_repo(), cat_repo= cat_repo())
+        if "limit" in request.args or "cursor" in request.args:
+            items, next_cursor = controller.list_active_requests_page(
+                search,
+                limit=request.args.get("limit", type=int),
+                cursor=request.args.get("cursor"),
+            )
+            return jsonify({"items": items, "next_cursor": next_cursor})
+        if wants_stream():
+            return stream_json_array(controller.list_active_requests(search, stream=True))
         items = controller.list_active_requests(search)
         return jsonify((items))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# GET /api/requests?pin_user_id=3&status=Open
+# GET /api/requests?pin_user_id=3&status=Open[&stream=1]
 @pin_req_api.get("")
 def list_my_requests():
     try:
@@ -77,11 +108,37 @@ def list_my_requests():
             return jsonify({"error": "pin_user_id is required"}), 400
         status = request.args.get("status")  # optional
         controller = ListMyPinRequestsController(req_repo(), match_repo(), cat_repo())
+        if wants_stream():
+            items = controller.list_my_requests(pin_user_id=pin_user_id, status=status, stream=True)
+            return stream_json_array(items, _req_to_dict)
         items = controller.list_my_requests(pin_user_id=pin_user_id, status=status)
         return jsonify(_list_to_dicts(items))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# GET /api/requests/events?status=Open&category_id=2   (text/event-stream)
+# events: created / updated / deleted, plus reset when a reconnect is too far behind (refetch the list)
+@pin_req_api.get("/events")
+def request_events():
+    try:
+        feed = RequestFeedController(events()).subscribe(
+            status=request.args.get("status"),
+            category_id=request.args.get("category_id", type=int),
+            last_event_id=request.headers.get("Last-Event-ID", type=int),
+        )
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    # not wrapped in stream_with_context: an idle subscriber must not pin the request's pooled connection
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield "retry: 3000\n\n"
+        for event in feed:
+            yield format_sse(event, dumps)
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # POST /api/requests
 # body: { "pin_user_id": 3, "title": "...", "description": "...", "location": "...", "category_id": 2 }
 @pin_req_api.post("")
@@ -93,7 +150,7 @@ def create_request():
         if missing:
             return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
 
-        req = CreatePinRequestController(req_repo(), match_repo()).create_request(
+        req = CreatePinRequestController(req_repo(), match_repo(), events()).create_request(
             pin_user_id=int(data["pin_user_id"]),
             title=data["title"],
             description=data["description"],
@@ -114,7 +171,7 @@ def update_request():
         if not data.get("pin_user_id") or not data.get("request_id"):
             return jsonify({"error": "pin_user_id and request_id are required"}), 400
         print("CSr: ",data['csr_id'])
-        updated = UpdatePinRequestController(req_repo(), match_repo(), cat_repo=cat_repo()).update_request(
+        updated = UpdatePinRequestController(req_repo(), match_repo(), cat_repo=cat_repo(), events=events()).update_request(
             pin_user_id=int(data["pin_user_id"]),
             request_id=int(data["request_id"]),
             csr_user_id = to_int_or_none(data['csr_id']),
@@ -140,7 +197,7 @@ def delete_request():
         if not data.get("pin_user_id") or not data.get("request_id"):
             return jsonify({"error": "pin_user_id and request_id are required"}), 400
 
-        ok = DeleteMyPinRequestController(req_repo(), match_repo()).delete_request(
+        ok = DeleteMyPinRequestController(req_repo(), match_repo(), events()).delete_request(
             pin_user_id=int(data["pin_user_id"]),
             request_id=int(data["request_id"]),
         )
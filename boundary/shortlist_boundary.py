@@ -1,9 +1,16 @@
 from control.shortlist_controller import *
 from flask import Blueprint, jsonify, request, current_app
+from utility.json_stream import stream_json_array, wants_stream
+from utility.etag import conditional
 
 csr_shortlist_api = Blueprint("csr_shortlist_api", __name__, url_prefix="/api/shortlist")
 
+def _shortlist_marker():
+    csr_id = request.args.get("csr_id", type=int)
+    return ViewShortlistController().shortlist_marker(csr_id) if csr_id else None
+
 @csr_shortlist_api.get("")
+@conditional(_shortlist_marker)
 def csr_view_shortlist():
     try:
         csr_id = request.args.get("csr_id", type=int)
@@ -12,6 +19,8 @@ def csr_view_shortlist():
         search = request.args.get("search", type=str)
         if not search:
             search = ""
+        if wants_stream():
+            return stream_json_array(ViewShortlistController().get_shortlist(csr_id, search, stream=True))
         results = ViewShortlistController().get_shortlist(csr_id, search)
         return jsonify(results)
     except Exception as e:
@@ -27,7 +27,9 @@ class ViewPastMatchController:
         completion_from: Optional[datetime | str] = None,
         completion_to: Optional[datetime | str] = None,
         order_desc: bool = True,
+        stream: bool = False,
     ) -> List[Match]:
+        """stream=True returns a lazy iterator of Match (validation still happens up front)."""
         _require_positive_id(user_id, user_type)
         if category_id is not None:
             _require_positive_id(category_id, "category_id")
@@ -40,7 +42,8 @@ class ViewPastMatchController:
         comp_to = _parse_dt(completion_to) if completion_to else None
         _require_dt_order(comp_from, comp_to)
 
-        matches = [Match._row_to_match(match) for match in self.match_repo.list_past_matches(
+        # Rows already include the request and category, so each Match is fully hydrated
+        rows = self.match_repo.list_past_matches(
             user_id=user_id,
             user_type=user_type,
             category_id=category_id,
@@ -49,13 +52,11 @@ class ViewPastMatchController:
             completion_from=comp_from,
             completion_to=comp_to,
             order_desc=order_desc,
-        )]
-
-        for match in matches:
-            request = Request._row_to_request(self.req_repo.get_request_by_id(match.request_id))
-            request.set_service_category(self.cat_repo.get_category(request.category_id))
-            match.set_request(request)
-        return matches
+            stream=stream,
+        )
+        if stream:
+            return map(Match._row_to_match, rows)
+        return [Match._row_to_match(match) for match in rows]
 
 class SearchPastMatchController:
     def __init__(self, match_repo: MatchRepository, req_repo: Optional[RequestRepository], cat_repo = Optional[ServiceCategoryRepository]):
@@ -88,6 +89,7 @@ class SearchPastMatchController:
         comp_to = _parse_dt(completion_to) if completion_to else None
         _require_dt_order(comp_from, comp_to)
 
+        # Rows already include the request and category, so each Match is fully hydrated
         matches = [Match._row_to_match(match) for match in self.match_repo.search_past_matches(
             user_id=user_id,
             user_type=user_type,
@@ -100,11 +102,6 @@ class SearchPastMatchController:
             order_desc=order_desc,
         )]
 
-        for match in matches:
-            request = Request._row_to_request(self.req_repo.get_request_by_id(match.request_id))
-            request.set_service_category(self.cat_repo.get_category(request.category_id))
-            match.set_request(request)
-
         return matches
 
 # ----------------------
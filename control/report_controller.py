@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from entity.match_repository import MatchRepository
 from entity.pin_request_repository import RequestRepository
 from entity.report import ReportSummary, ReportRepository
@@ -10,7 +10,8 @@ class GetReportData:
         
     def execute(self, days: int) -> ReportSummary:
         try:
-            to_ts = datetime.now()
+            # the last `days` whole days, today included
+            to_ts = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
             from_ts = to_ts - timedelta(days=days)
             
             reportSummary = self.report_repo.get_report(from_ts, to_ts)
@@ -2,13 +2,18 @@
 from __future__ import annotations
 
 from typing import List, Optional, Dict, Any
+from dataclasses import asdict
 from datetime import datetime
 from entity.pin_request import Request
 from entity.pin_request_repository import RequestRepository
 from entity.service_category_repository import ServiceCategoryRepository
 from entity.match_repository import MatchRepository
 from utility.request_validation import RequestValidation
+from utility.pagination import KeysetCursor
 from entity.request_view_repository import RequestViewRepository;
+from entity.request_cache import RequestCache
+from entity.unit_of_work import is_retryable, run_in_transaction
+from utility.event_hub import Event, EventHub
 
 ALLOWED_STATUSES = {"Open", "In Progress", "Completed", "Cancelled"} 
 
@@ -17,33 +22,78 @@ class SearchPinRequestController:
         self.pin_req_repo = pin_req_repo
         self.cat_repo = cat_repo
     # 1. List active/open requests
-    def list_active_requests(self, search) -> List[Dict[str, Any]]:
-        rows = self.pin_req_repo.search_requests_by_status(status = ('Open', 'In Progress'), query=search)
+    def list_active_requests(self, search, stream: bool = False) -> List[Dict[str, Any]]:
+        rows = self.pin_req_repo.search_requests_by_status(status = ('Open', 'In Progress'), query=search, stream=stream)
 
-        requests = [Request._row_to_request(row) for row in rows] 
-        for request in requests:
-            request.set_service_category(self.cat_repo.get_category(request.category_id))
-        return requests
+        # category_name comes back on each row, so no per-row category lookup
+        if stream:
+            return map(Request._row_to_request, rows)
+        return [Request._row_to_request(row) for row in rows]
+
+    # 1a. Change marker for the active list (category names are joined in, so their version counts too)
+    def active_requests_marker(self):
+        marker = (self.pin_req_repo.version(),)
+        if self.cat_repo is not None:
+            marker += (self.cat_repo.version(),)
+        return marker
+
+    # 1b. One page of active/open requests (keyset pagination)
+    def list_active_requests_page(self, search, *, limit: Optional[int] = None, cursor: Optional[str] = None):
+        """
+        Returns (requests, next_cursor). next_cursor is None on the last page.
+        """
+        limit = KeysetCursor._require_limit(limit)
+        after = KeysetCursor.decode(cursor)
+        # Fetch one extra row to know whether another page exists
+        rows = self.pin_req_repo.search_requests_by_status(
+            status=('Open', 'In Progress'), query=search, limit=limit + 1, after=after
+        )
+        requests = [Request._row_to_request(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = requests[-1]
+            next_cursor = KeysetCursor.encode(last.created_at, last.request_id)
+        return requests, next_cursor
 
 class ReadRequestController:
-    def __init__(self, request_repo: RequestRepository, view_repo: RequestViewRepository, cat_repo: Optional[ServiceCategoryRepository]):
+    # view_repo is anything with save_view(request_id, timestamp): the repository
+    # or the write-behind ViewEventSink (the count on the returned request may lag by a flush)
+    # cache is an optional read-through RequestCache; writers invalidate it in the repositories
+    def __init__(self, request_repo: RequestRepository, view_repo: RequestViewRepository, cat_repo: Optional[ServiceCategoryRepository], cache: Optional[RequestCache] = None):
         self.request_repo = request_repo
         self.cat_repo = cat_repo
         self.view_repo = view_repo
+        self.cache = cache
 
     def read_request(self, *, request_id: int):
         
         RequestValidation._require_positive_id(request_id, "pin_user_id")
-        self.view_repo.save_view(request_id, datetime.now())
-        request = Request._row_to_request(self.request_repo.get_request_by_id(request_id))
-        request.set_service_category(self.cat_repo.get_category(request.category_id))
-    
+        request = self._load(request_id)
+        if request is not None:
+            # only views of requests that exist are recorded
+            self.view_repo.save_view(request_id, datetime.now())
+        return request
+
+    def _load(self, request_id: int):
+        if self.cache is None:
+            row = self.request_repo.get_request_by_id(request_id)
+            return Request._row_to_request(row) if row else None
+        cached = self.cache.get(request_id)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation()
+        row = self.request_repo.get_request_by_id(request_id)
+        if not row:
+            return None
+        request = Request._row_to_request(row)
+        self.cache.put(request_id, request, generation)
         return request
 
 class CreatePinRequestController:
-    def __init__(self, request_repo, match_repo: Optional[object] = None):
+    def __init__(self, request_repo, match_repo: Optional[object] = None, events: Optional[EventHub] = None):
         self.request_repo = request_repo
         self.match_repo = match_repo  
+        self.events = events
 
     # -------- #23: Create a request --------
     def create_request(
@@ -69,7 +119,10 @@ class CreatePinRequestController:
             category_id=category_id,
             location=location.strip(),
         ) 
-        return Request._row_to_request(row)
+        request = Request._row_to_request(row)
+        if self.events is not None:
+            self.events.publish("created", {"request": asdict(request), "changed": []})
+        return request
 
     # -------- #24: View my requests --------
 class ListMyPinRequestsController:
@@ -80,24 +133,24 @@ class ListMyPinRequestsController:
 
     # -------- #24: View my requests --------
     def list_my_requests(
-        self, *, pin_user_id: int, status: Optional[str] = None, order_desc: bool = True
+        self, *, pin_user_id: int, status: Optional[str] = None, order_desc: bool = True, stream: bool = False
     ):
         RequestValidation._require_positive_id(pin_user_id, "pin_user_id")
         if status is not None:
             RequestValidation._require_status(status)
         rows = self.request_repo.list_requests_by_pin(
-            pin_user_id=pin_user_id, status=status, order_desc=order_desc
+            pin_user_id=pin_user_id, status=status, order_desc=order_desc, stream=stream
         )  
-        requests = [Request._row_to_request(row) for row in rows]
-        for request in requests:
-            request.set_service_category(self.cat_repo.get_category(request.category_id))
-        return requests
+        if stream:
+            return map(Request._row_to_request, rows)
+        return [Request._row_to_request(row) for row in rows]
 
     # -------- #25: Update my request --------
 class UpdatePinRequestController:
-    def __init__(self, request_repo, match_repo: Optional[MatchRepository] = None, cat_repo: Optional[ServiceCategoryRepository] = None):
+    def __init__(self, request_repo, match_repo: Optional[MatchRepository] = None, cat_repo: Optional[ServiceCategoryRepository] = None, events: Optional[EventHub] = None):
         self.request_repo = request_repo
         self.cat_repo = cat_repo
+        self.events = events
         self.match_repo = match_repo  # used here for ensure_completed_match  # [web:44][web:58]
 
     # -------- #25: Update my request --------
@@ -126,47 +179,62 @@ class UpdatePinRequestController:
         if status is not None:
             RequestValidation._require_status(status)  # [web:33][web:46]
 
-        updated = self.request_repo.update_request(
-            request_id=request_id,
-            pin_user_id=pin_user_id,
-            title=title.strip() if isinstance(title, str) else title,
-            description=description.strip() if isinstance(description, str) else description,
-            category_id=category_id,
-            location=location.strip() if isinstance(location, str) else location,
-            status=status,
-        )  
-    
-        # If the request was (or is now) Completed, ensure a Completed match row exists.
-        # NOTE: We use pin_user_id as a placeholder csr_user_id if none is known.
-        #       Replace with the actual CSR id when you have it in your flow.
-        if updated and status == "Completed" and self.match_repo is not None:
-            try:
-                self.match_repo.ensure_completed_match(
-                    request_id=request_id,
-                    pin_user_id=pin_user_id,
-                    csr_user_id=csr_user_id,  # TODO: provide real CSR user id when available
-                )
-            except Exception:
-                # Don't block the request update if match creation fails; surface via logs if desired.
-                pass  # [web:44][web:58]
+        # The update and the match it implies commit together (one transaction, retried on deadlock)
+        def write(uow):
+            updated = self.request_repo.update_request(
+                request_id=request_id,
+                pin_user_id=pin_user_id,
+                title=title.strip() if isinstance(title, str) else title,
+                description=description.strip() if isinstance(description, str) else description,
+                category_id=category_id,
+                location=location.strip() if isinstance(location, str) else location,
+                status=status,
+            )  
+        
+            # If the request was (or is now) Completed, ensure a Completed match row exists.
+            # NOTE: We use pin_user_id as a placeholder csr_user_id if none is known.
+            #       Replace with the actual CSR id when you have it in your flow.
+            if updated and status == "Completed" and self.match_repo is not None:
+                try:
+                    with uow.savepoint():
+                        self.match_repo.ensure_completed_match(
+                            request_id=request_id,
+                            pin_user_id=pin_user_id,
+                            csr_user_id=csr_user_id,  # TODO: provide real CSR user id when available
+                        )
+                except Exception as e:
+                    if is_retryable(e):
+                        raise
+                    # Don't block the request update if match creation fails; surface via logs if desired.
+                    pass  # [web:44][web:58]
+            return updated
+
+        updated = run_in_transaction(self.request_repo.db, write)
         request = Request._row_to_request(updated)
         print(request)
-        request.set_service_category(self.cat_repo.get_category(request.category_id))
-        print("TEST")
+        if updated and self.events is not None:
+            changed = [name for name, value in (
+                ("title", title), ("description", description), ("category_id", category_id),
+                ("location", location), ("status", status),
+            ) if value is not None]
+            self.events.publish("updated", {"request": asdict(request), "changed": changed})
         return request
 
 
     # -------- #26: Delete my request --------
 class DeleteMyPinRequestController:
-    def __init__(self, request_repo, match_repo: Optional[object] = None):
+    def __init__(self, request_repo, match_repo: Optional[object] = None, events: Optional[EventHub] = None):
         self.request_repo = request_repo
         self.match_repo = match_repo 
+        self.events = events
 
     # -------- #26: Delete my request --------
     def delete_request(self, *, pin_user_id: int, request_id: int) -> bool:
         RequestValidation._require_positive_id(pin_user_id, "pin_user_id")
         RequestValidation._require_positive_id(request_id, "request_id")
         deleted = self.request_repo.delete_request(request_id=request_id, pin_user_id=pin_user_id)
+        if deleted is not None and self.events is not None:
+            self.events.publish("deleted", {"request_id": request_id, "pin_user_id": pin_user_id})
         return deleted is not None 
 
     # -------- #27: Search my requests --------
@@ -208,7 +276,37 @@ class SearchMyPinRequestsController:
             order_desc=order_desc,
         ) 
 
-        requests = [Request._row_to_request(row) for row in rows]
-        for request in requests:
-            request.set_service_category(self.cat_repo.get_category(request.category_id))
-        return requests
\ No newline at end of file
+        return [Request._row_to_request(row) for row in rows]
+
+class RequestFeedController:
+    """Live create/update/delete events for requests, filtered by status and category."""
+    def __init__(self, events: EventHub):
+        self.events = events
+
+    def subscribe(
+        self, *, status: Optional[str] = None, category_id: Optional[int] = None, last_event_id: Optional[int] = None
+    ):
+        if status is not None:
+            RequestValidation._require_status(status)
+        if category_id is not None:
+            RequestValidation._require_positive_id(category_id, "category_id")
+
+        def accept(event: Event) -> bool:
+            if event.type == "deleted":
+                return True  # no state left to filter on; clients drop the id if they hold it
+            req = event.data["request"]
+            if (status is None or req["status"] == status) and (category_id is None or req["category_id"] == category_id):
+                return True
+            # an update that moved the request out of this view still has to reach the client
+            return event.type == "updated" and bool({"status", "category_id"} & set(event.data["changed"]))
+
+        return self.events.subscribe(last_event_id, accept)
+
+class ReconcileRequestCountersController:
+    def __init__(self, request_repo: RequestRepository):
+        self.request_repo = request_repo
+
+    def reconcile(self, request_id: Optional[int] = None) -> int:
+        if request_id is not None:
+            RequestValidation._require_positive_id(request_id, "request_id")
+        return self.request_repo.reconcile_counters(request_id)
@@ -7,6 +7,8 @@ class ReadServiceCategoryController:
         self.repo = repo
     def read_categories(self) -> List[Dict[str, Any]]:
         return self.repo.list_categories()
+    def categories_version(self) -> int:
+        return self.repo.version()
     
 class CreateServiceCategoryController:
     def __init__(self, repo: ServiceCategoryRepository):
@@ -20,8 +20,11 @@ class ViewShortlistController:
     def __init__(self):
         self.shortlist_repo = ShortlistRepository()
 
-    def get_shortlist(self, csr_id: int, search: str) -> List[Dict[str, Any]]:
-        return self.shortlist_repo.view_shortlist(csr_id=csr_id, query=search)
+    def get_shortlist(self, csr_id: int, search: str, stream: bool = False) -> List[Dict[str, Any]]:
+        return self.shortlist_repo.view_shortlist(csr_id=csr_id, query=search, stream=stream)
+
+    def shortlist_marker(self, csr_id: int) -> tuple:
+        return self.shortlist_repo.shortlist_marker(csr_id)
 
 class SearchShortlistController:
     def __init__(self):
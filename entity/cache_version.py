@@ -0,0 +1,59 @@
+# entity/cache_version.py
+"""
+Shared change counters in the `cache_version` table.
+
+A writer calls `bump(db, name)` right after `commit(db)`. The counter is
+advanced in its own one-statement transaction once the change is visible
+(queued with `after_commit` inside a unit of work), so the shared row is
+locked for a single statement instead of for every write transaction. A reader
+may see the new data under the old number for a moment and fetch it once more
+when the number moves; it never sees the new number with the old data.
+Readers compare `read(db, name)` with what they saw before. One indexed row
+read is far cheaper than aggregating the table it stands for, and unlike a
+timestamp it can't miss two changes in the same second.
+
+Names in use:
+  - CATEGORIES: service_category rows (entity/category_cache.py)
+  - REQUESTS: anything the request lists show (rows, status, view/shortlist
+    counters); the ETag of /api/requests/active
+"""
+from __future__ import annotations
+
+from entity.unit_of_work import after_commit
+
+CATEGORIES = "service_category"
+REQUESTS = "request"
+
+
+def bump(db, name: str) -> None:
+    """Advance the counter once the caller's write has committed."""
+    after_commit(db, _advance, db, name)
+
+
+def _advance(db, name: str) -> None:
+    cur = db.cursor()
+    try:
+        cur.execute(
+            """
+            INSERT INTO cache_version (name, version) VALUES (%s, 1)
+            ON DUPLICATE KEY UPDATE version = version + 1
+            """,
+            (name,),
+        )
+        db.commit()
+    except Exception as e:
+        # the write itself is committed; the next bump moves the counter past it
+        db.rollback()
+        print("cache_version bump failed:", e)
+    finally:
+        cur.close()
+
+
+def read(db, name: str) -> int:
+    cur = db.cursor(buffered=True)
+    try:
+        cur.execute("SELECT version FROM cache_version WHERE name = %s", (name,))
+        row = cur.fetchone()
+        return int(row[0]) if row else 0
+    finally:
+        cur.close()
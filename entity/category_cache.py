@@ -0,0 +1,114 @@
+# entity/category_cache.py
+"""
+Process-wide cache of service categories.
+
+Categories only change through the Platform Manager endpoints, so every worker
+keeps the whole table in memory. Writes bump a row in `cache_version`; each
+process compares that version at most once per `check_interval` seconds and
+reloads when it moved, so other workers see a change within that interval and
+the writing worker sees it immediately.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, current_app
+
+from entity import cache_version
+
+CACHE_NAME = cache_version.CATEGORIES
+
+
+class CategoryCache:
+    def __init__(self, check_interval: float = 2.0):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None   # version the in-memory copy was loaded at
+        self._checked_at = 0.0
+        self._by_id: Dict[int, Dict[str, Any]] = {}
+        self._ordered: List[Dict[str, Any]] = []
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- reads ----------
+    def list_categories(self, db) -> List[Dict[str, Any]]:
+        self._refresh_if_stale(db)
+        return [{"id": c["category_id"], "name": c["category_name"]} for c in self._ordered]
+
+    def get_category(self, db, category_id) -> Optional[Dict[str, Any]]:
+        self._refresh_if_stale(db)
+        row = self._by_id.get(category_id)
+        return dict(row) if row else None
+
+    def version(self, db) -> int:
+        """Version of the categories this process is serving (for ETags)."""
+        self._refresh_if_stale(db)
+        return self._version
+
+    # ---------- invalidation ----------
+    @staticmethod
+    def bump_version(db) -> None:
+        """Advance the shared version once the caller's write has committed."""
+        cache_version.bump(db, CACHE_NAME)
+
+    def invalidate(self) -> None:
+        """Drop the local copy so the next read reloads (this process only)."""
+        with self._lock:
+            self._version = None
+            self._checked_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "version": self._version,
+            "size": len(self._ordered),
+        }
+
+    # ---------- internals ----------
+    def _refresh_if_stale(self, db) -> None:
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.check_interval:
+            self.hits += 1
+            return
+        with self._lock:
+            if self._version is not None and now - self._checked_at < self.check_interval:
+                self.hits += 1
+                return
+            version = self._read_version(db)
+            if version != self._version:
+                self._load(db)
+                self._version = version
+                self.misses += 1
+            else:
+                self.hits += 1
+            self._checked_at = now
+
+    @staticmethod
+    def _read_version(db) -> int:
+        return cache_version.read(db, CACHE_NAME)
+
+    def _load(self, db) -> None:
+        cur = db.cursor(dictionary=True, buffered=True)
+        try:
+            cur.execute("SELECT category_id, category_name FROM service_category ORDER BY category_name")
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        self._ordered = rows
+        self._by_id = {r["category_id"]: r for r in rows}
+
+
+# ---------- Flask integration ----------
+def init_app(app: Flask) -> CategoryCache:
+    app.config.setdefault("CATEGORY_CACHE_CHECK_INTERVAL", 2.0)
+    cache = CategoryCache(check_interval=float(app.config["CATEGORY_CACHE_CHECK_INTERVAL"]))
+    app.extensions["category_cache"] = cache
+    return cache
+
+
+def get_category_cache(app: Optional[Flask] = None) -> CategoryCache:
+    app = app or current_app
+    return app.extensions["category_cache"]
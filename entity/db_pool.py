@@ -0,0 +1,197 @@
+# entity/db_pool.py
+"""
+Pooled database connections for the repository layer.
+
+One `DatabasePool` is created per Flask app. Each HTTP request checks a
+connection out the first time a repository calls `get_db()` and hands it back
+when the app context is torn down, so concurrent requests on a threaded server
+never share a connection.
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from flask import Flask, current_app, g
+from mysql.connector import errors, pooling
+
+
+class DatabasePool:
+    """
+    Thin wrapper around `mysql.connector.pooling.MySQLConnectionPool` that adds:
+      - a bounded wait when every connection is checked out (the driver fails fast),
+      - a health ping with automatic reconnect on checkout,
+      - simple usage counters.
+    The driver pool (which opens all `size` connections at once) is only created
+    on the first checkout, so building the app needs no reachable server.
+    """
+
+    def __init__(
+        self,
+        *,
+        size: int = 5,
+        checkout_timeout: float = 10.0,
+        name: str = "sixseven",
+        **connect_args: Any,
+    ):
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self._name = name
+        self._connect_args = connect_args
+        self._pool: Optional[pooling.MySQLConnectionPool] = None
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self.in_use = 0
+
+    @property
+    def opened(self) -> bool:
+        return self._pool is not None
+
+    def _driver_pool(self) -> pooling.MySQLConnectionPool:
+        if self._pool is None:
+            with self._open_lock:
+                if self._pool is None:
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name=self._name,
+                        pool_size=self.size,
+                        pool_reset_session=True,
+                        **self._connect_args,
+                    )
+        return self._pool
+
+    # ---------- checkout / return ----------
+    def acquire(self):
+        """
+        Check a connection out of the pool, waiting up to `checkout_timeout` seconds.
+        The connection is pinged (and transparently reconnected) before it is returned.
+        """
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise errors.PoolError("Timed out waiting for a free database connection")
+        try:
+            conn = self._driver_pool().get_connection()
+            conn.ping(reconnect=True, attempts=3, delay=1)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+        return conn
+
+    def release(self, conn) -> None:
+        """
+        Return a connection to the pool. Any open transaction is rolled back first
+        so the next borrower starts clean.
+        """
+        try:
+            try:
+                conn.rollback()
+            except errors.Error:
+                pass
+            conn.close()  # pooled connection: hands the socket back to the pool
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection outside of a request (background jobs, scripts)."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": self.size, "in_use": self.in_use, "idle": self.size - self.in_use}
+
+
+# ---------- Flask integration ----------
+def init_app(app: Flask) -> DatabasePool:
+    """
+    Create the app's pool from `DB_CONFIG` / `DB_POOL_SIZE` / `DB_POOL_TIMEOUT`
+    and register the teardown hook that returns per-request connections.
+
+    `DB_BACKEND = "sqlite"` swaps MySQL for the embedded stand-in in
+    entity/sqlite_backend.py (`DB_SQLITE_PATH`, default in-memory); the
+    repositories can't tell the difference.
+    """
+    app.config.setdefault("DB_BACKEND", "mysql")
+    app.config.setdefault("DB_POOL_SIZE", 5)
+    app.config.setdefault("DB_POOL_TIMEOUT", 10.0)
+
+    backend = app.config["DB_BACKEND"]
+    if backend == "sqlite":
+        from entity.sqlite_backend import SqlitePool
+
+        app.config.setdefault("DB_SQLITE_PATH", ":memory:")
+        pool = SqlitePool(
+            size=int(app.config["DB_POOL_SIZE"]),
+            checkout_timeout=float(app.config["DB_POOL_TIMEOUT"]),
+            database=app.config["DB_SQLITE_PATH"],
+        )
+    elif backend == "mysql":
+        pool = DatabasePool(
+            size=int(app.config["DB_POOL_SIZE"]),
+            checkout_timeout=float(app.config["DB_POOL_TIMEOUT"]),
+            **app.config["DB_CONFIG"],
+        )
+    else:
+        raise ValueError(f"Unknown DB_BACKEND {backend!r} (expected 'mysql' or 'sqlite')")
+    app.extensions["db_pool"] = pool
+    app.teardown_appcontext(_return_connection)
+    return pool
+
+
+def get_pool(app: Optional[Flask] = None) -> DatabasePool:
+    app = app or current_app
+    return app.extensions["db_pool"]
+
+
+def get_db():
+    """
+    Connection for the current app context. Checked out on first use and
+    returned to the pool automatically at teardown. Wrapped for SQL profiling
+    when the app has a profiler (see entity/sql_profiler.py).
+    """
+    if "db" not in g:
+        conn = get_pool().acquire()
+        profiler = current_app.extensions.get("sql_profiler")
+        g._raw_db = conn  # the pool gets back what it handed out, never the profiling wrapper
+        g.db = profiler.wrap(conn) if profiler is not None else conn
+    return g.db
+
+
+def _return_connection(exc: Optional[BaseException]) -> None:
+    g.pop("db", None)
+    conn = g.pop("_raw_db", None)
+    if conn is not None:
+        get_pool().release(conn)
+
+
+def stream_rows(db, sql: str, params: Sequence[Any] = (), *, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    Yield rows from an unbuffered dictionary cursor, `batch_size` at a time, so
+    memory stays flat however many rows match. The query runs on the first
+    `next()`. The connection is busy until the generator is exhausted or closed,
+    so don't issue other queries on it in between.
+    """
+    cur = db.cursor(dictionary=True)
+    try:
+        cur.execute(sql, tuple(params))
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        # an abandoned stream still has to drain its result before the connection is reused
+        try:
+            while cur.fetchmany(batch_size):
+                pass
+        except errors.Error:
+            pass
+        cur.close()
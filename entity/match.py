@@ -18,7 +18,7 @@ class Match:
     # ---------- helpers ----------
     @staticmethod
     def _row_to_match(row: Dict[str, Any]):
-        return Match(
+        match = Match(
             match_id=row["match_id"],
             request_id=row["request_id"],
             csr_user_id=row["csr_user_id"],
@@ -26,6 +26,23 @@ class Match:
             service_date=row["service_date"],
             completion_date=row.get("completion_date"),
         )
+        # Rows from the past-match queries also carry the joined request
+        if "request_status" in row:
+            match.set_request(Request._row_to_request({
+                "request_id": row["request_id"],
+                "pin_user_id": row["request_pin_user_id"],
+                "title": row["request_title"],
+                "description": row["request_description"],
+                "status": row["request_status"],
+                "created_at": row["request_created_at"],
+                "updated_at": row["request_updated_at"],
+                "category_id": row["category_id"],
+                "location": row["location"],
+                "view_count": row["view_count"],
+                "shortlist_count": row["shortlist_count"],
+                "category_name": row["category_name"],
+            }))
+        return match
     
     def set_request(self, request: Request) -> None:
         self.request = request
\ No newline at end of file
@@ -2,10 +2,35 @@
 from __future__ import annotations
 
 from typing import List, Optional, Any, Dict, Tuple
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
-from flask import current_app
+from entity import cache_version
+from entity.db_pool import get_db, stream_rows
+from entity.unit_of_work import after_commit, begin, commit, is_retryable, rollback
 from entity.match import Match
+from entity.report_rollup_repository import ReportRollupRepository
+from entity.request_cache import invalidate_request
+from entity.single_flight import coalesce
+from entity.text_search import TextSearch
+
+
+# Columns for a fully hydrated past match: the match itself, its request and the
+# request's category. Request columns are prefixed so they don't clash with `match`.
+PAST_MATCH_COLUMNS = """
+    m.match_id, m.request_id, m.csr_user_id, m.pin_user_id,
+    m.service_date, m.completion_date, m.status,
+    r.pin_user_id AS request_pin_user_id, r.title AS request_title,
+    r.description AS request_description, r.status AS request_status,
+    r.created_at AS request_created_at, r.updated_at AS request_updated_at,
+    r.category_id, r.location,
+    r.view_count, r.shortlist_count,
+    sc.category_name
+"""
+
+
+# `match.status` is an ENUM, so it always holds the canonical spelling: reads compare the raw
+# column and stay range scans on the (user, status, completion_date) indexes.
+COMPLETED = "Completed"
 
 
 class MatchRepository:
@@ -14,9 +39,8 @@ class MatchRepository:
     Joins `match` -> `request` -> `service_category` to support service/date filters.
     """
 
-    def __init__(self):
-        db = current_app.config["DB"]
-        self.db = db
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_db()
 
     # ---------- fetch one ----------
     def get_by_id(self, match_id: int, pin_user_id: Optional[int] = None) -> Optional[Match]:
@@ -74,10 +98,10 @@ class MatchRepository:
                 FROM `match`
                 WHERE request_id = %s
                   AND pin_user_id = %s
-                  AND LOWER(TRIM(status)) = 'completed'
+                  AND status = %s
                 LIMIT 1
                 """,
-                (request_id, pin_user_id),
+                (request_id, pin_user_id, COMPLETED),
             )
             existing = cur.fetchone()
         finally:
@@ -92,7 +116,10 @@ class MatchRepository:
                         "UPDATE `match` SET completion_date = COALESCE(%s, NOW()) WHERE match_id = %s",
                         (completion_date, existing["match_id"]),
                     )
-                    self.db.commit()
+                    if completion_date is not None:
+                        ReportRollupRepository.mark_days_dirty(cur2, [completion_date.date()])
+                    commit(self.db)
+                    after_commit(self.db, invalidate_request, request_id)
                 finally:
                     cur2.close()
             return existing["match_id"]
@@ -105,20 +132,28 @@ class MatchRepository:
                 INSERT INTO `match`
                     (request_id, csr_user_id, pin_user_id, service_date, completion_date, status)
                 VALUES
-                    (%s, %s, %s, COALESCE(%s, CURDATE()), COALESCE(%s, NOW()), 'Completed')
+                    (%s, %s, %s, COALESCE(%s, CURDATE()), COALESCE(%s, NOW()), %s)
                 """,
-                (request_id, csr_user_id, pin_user_id, service_date, completion_date),
+                (request_id, csr_user_id, pin_user_id, service_date, completion_date, COMPLETED),
             )
             
             new_id = cur3.lastrowid
-            self.db.commit()
+            # back-dated events land before the rollup watermark
+            ReportRollupRepository.mark_days_dirty(
+                cur3, [service_date, completion_date.date() if completion_date else None]
+            )
+            commit(self.db)
+            after_commit(self.db, invalidate_request, request_id)
             return new_id
         except Exception as e:
+            if is_retryable(e):
+                raise  # the transaction is gone; let the unit of work retry it
             print("error:", e)
         finally:
             cur3.close()
 
     # --- list/view past matches (robust) ---
+    @coalesce
     def list_past_matches(
         self,
         user_id: int,
@@ -130,18 +165,17 @@ class MatchRepository:
         completion_from: Optional[datetime] = None,
         completion_to: Optional[datetime] = None,
         order_desc: bool = True,
+        stream: bool = False,
     ) -> List[Match]:
         
         """
-        View past matches (status 'Completed' case-insensitive) with optional filters.
+        View past matches (status 'Completed') with optional filters.
         Requires non-NULL completion_date to count as 'past'.
+        Each row carries the request and category columns (see PAST_MATCH_COLUMNS).
+        stream=True returns a lazy row iterator instead (see stream_rows).
         """
-        sql = """
-            SELECT
-                m.match_id, m.request_id, m.csr_user_id, m.pin_user_id,
-                m.service_date, m.completion_date, m.status,
-                r.title AS request_title, r.category_id, r.location,
-                sc.category_name
+        sql = f"""
+            SELECT {PAST_MATCH_COLUMNS}
             FROM `match` m
             JOIN request r ON r.request_id = m.request_id
             LEFT JOIN service_category sc ON sc.category_id = r.category_id
@@ -149,9 +183,9 @@ class MatchRepository:
         """
         sql += user_type
 
-        sql += """ = %s AND LOWER(TRIM(m.status)) = 'completed'
+        sql += """ = %s AND m.status = %s
             AND m.completion_date IS NOT NULL"""
-        params: List[Any] = [user_id]
+        params: List[Any] = [user_id, COMPLETED]
         
         if category_id is not None:
             sql += " AND r.category_id = %s"
@@ -175,11 +209,12 @@ class MatchRepository:
 
         sql += " ORDER BY m.completion_date " + ("DESC" if order_desc else "ASC")
         
+        if stream:
+            return stream_rows(self.db, sql, params)
         cur = self.db.cursor(dictionary=True, buffered=True)
         try:
             cur.execute(sql, tuple(params))
             rows = cur.fetchall()
-            print(rows)
             return rows
         finally:
             cur.close()
@@ -201,15 +236,12 @@ class MatchRepository:
         order_desc: bool = True,
     ) -> List[Match]:
         """
-        Search past matches (status 'Completed' case-insensitive) by optional category,
+        Search past matches (status 'Completed') by optional category,
         keyword (title/description), and date ranges. Requires non-NULL completion_date.
+        Each row carries the request and category columns (see PAST_MATCH_COLUMNS).
         """
-        sql = """
-            SELECT
-                m.match_id, m.request_id, m.csr_user_id, m.pin_user_id,
-                m.service_date, m.completion_date, m.status,
-                r.title AS request_title, r.category_id, r.location,
-                r.description, sc.category_name
+        sql = f"""
+            SELECT {PAST_MATCH_COLUMNS}
             FROM `match` m
             JOIN request r ON r.request_id = m.request_id
             LEFT JOIN service_category sc ON sc.category_id = r.category_id
@@ -217,18 +249,19 @@ class MatchRepository:
         """
         sql += user_type
 
-        sql += """ = %s AND LOWER(TRIM(m.status)) = 'completed'
+        sql += """ = %s AND m.status = %s
             AND m.completion_date IS NOT NULL"""
-        params: List[Any] = [user_id]
+        params: List[Any] = [user_id, COMPLETED]
 
         if category_id is not None:
             sql += " AND r.category_id = %s"
             params.append(category_id)
 
-        if keyword:
-            sql += " AND (r.title LIKE %s OR r.description LIKE %s)"
-            like = f"%{keyword}%"
-            params.extend([like, like])
+        text = TextSearch(keyword)
+        if text.active:
+            clause, clause_params = text.where()
+            sql += " AND " + clause
+            params.extend(clause_params)
 
         if service_date_from:
             sql += " AND m.service_date >= %s"
@@ -246,7 +279,13 @@ class MatchRepository:
             sql += " AND m.completion_date <= %s"
             params.append(completion_to)
 
-        sql += " ORDER BY m.completion_date " + ("DESC" if order_desc else "ASC")
+        relevance = text.relevance()
+        if relevance:
+            sql += f" ORDER BY {relevance[0]},"
+            params.extend(relevance[1])
+        else:
+            sql += " ORDER BY"
+        sql += " m.completion_date " + ("DESC" if order_desc else "ASC")
 
         cur = self.db.cursor(dictionary=True, buffered=True)
         try:
@@ -273,12 +312,15 @@ class MatchRepository:
         cur = self.db.cursor()
         try:
             # Begin a transaction
-            self.db.start_transaction()
+            begin(self.db)
+
+            # The request changes status, so every day holding one of its events is re-bucketed
+            ReportRollupRepository.mark_requests_dirty(cur, "r.request_id = %s", (m["request_id"],))
 
             # Re-open the request owned by the same PIN
             cur.execute(
                 "UPDATE request SET status = 'In Progress' WHERE request_id = %s AND pin_user_id = %s",
-                (m.request_id, m.pin_user_id),
+                (m["request_id"], m["pin_user_id"]),
             )
             req_updated = cur.rowcount or 0
 
@@ -292,16 +334,18 @@ class MatchRepository:
             cur.execute(sql, tuple(params))
             match_deleted = cur.rowcount or 0
 
-            self.db.commit()
+            commit(self.db)
+            cache_version.bump(self.db, cache_version.REQUESTS)
+            after_commit(self.db, invalidate_request, m["request_id"])
             return {
                 "success": True,
-                "request_id": m.request_id,
-                "pin_user_id": m.pin_user_id,
+                "request_id": m["request_id"],
+                "pin_user_id": m["pin_user_id"],
                 "request_updated": bool(req_updated),
                 "match_deleted": bool(match_deleted),
             }
         except Exception:
-            self.db.rollback()
+            rollback(self.db)
             raise
         finally:
             cur.close()
@@ -324,8 +368,11 @@ class MatchRepository:
                 sql += " AND pin_user_id = %s"
                 params.append(pin_user_id)
 
+            ReportRollupRepository.mark_days_dirty(
+                cur, [existing["service_date"], existing["completion_date"] and existing["completion_date"].date()]
+            )
             cur.execute(sql, tuple(params))
-            self.db.commit()
+            commit(self.db)
             return existing
         finally:
             cur.close()
@@ -338,15 +385,16 @@ class MatchRepository:
         """
         cur = self.db.cursor()
         try:
-            sql = "DELETE FROM `match` WHERE request_id = %s"
+            where = "m.request_id = %s"
             params: List[Any] = [request_id]
             if pin_user_id is not None:
-                sql += " AND pin_user_id = %s"
+                where += " AND m.pin_user_id = %s"
                 params.append(pin_user_id)
 
-            cur.execute(sql, tuple(params))
+            ReportRollupRepository.mark_matches_dirty(cur, where, params)
+            cur.execute(f"DELETE m FROM `match` m WHERE {where}", tuple(params))
             affected = cur.rowcount or 0
-            self.db.commit()
+            commit(self.db)
             return affected
         finally:
             cur.close()
@@ -360,19 +408,23 @@ class MatchRepository:
         """
         cur = self.db.cursor()
         try:
-            sql = """
-                DELETE m FROM `match` m
-                JOIN request r ON r.request_id = m.request_id
-                WHERE r.category_id = %s
-            """
+            where = "r.category_id = %s"
             params: List[Any] = [category_id]
             if pin_user_id is not None:
-                sql += " AND m.pin_user_id = %s"
+                where += " AND m.pin_user_id = %s"
                 params.append(pin_user_id)
 
-            cur.execute(sql, tuple(params))
+            ReportRollupRepository.mark_matches_dirty(cur, where, params)
+            cur.execute(
+                f"""
+                DELETE m FROM `match` m
+                JOIN request r ON r.request_id = m.request_id
+                WHERE {where}
+                """,
+                tuple(params),
+            )
             n = cur.rowcount or 0
-            self.db.commit()
+            commit(self.db)
             return n
         finally:
             cur.close()
@@ -409,37 +461,17 @@ class MatchRepository:
             return float(row[0]) if row and row[0] is not None else None
 
     def completion_trend_with_ma(self, frm: datetime, to: datetime, window: int = 7) -> List[Dict]:
-        sql = """
-        WITH daily AS (
-        SELECT DATE(m.completion_date) AS day, COUNT(*) AS completed
-        FROM `match` m
-        WHERE m.completion_date IS NOT NULL
-            AND m.completion_date >= %s AND m.completion_date < %s
-        GROUP BY DATE(m.completion_date)
-        ),
-        series AS (
-        WITH RECURSIVE dates AS (
-            SELECT DATE(%s) AS day
-            UNION ALL
-            SELECT day + INTERVAL 1 DAY
-            FROM dates
-            WHERE day + INTERVAL 1 DAY < DATE(%s)  -- end is exclusive
-        )
-        SELECT day FROM dates
-        )
-        SELECT s.day,
-            COALESCE(d.completed, 0) AS completed,
-            AVG(COALESCE(d.completed, 0)) OVER (
-                ORDER BY s.day
-                ROWS BETWEEN %s PRECEDING AND CURRENT ROW
-            ) AS ma
-        FROM series s
-        LEFT JOIN daily d ON d.day = s.day
-        ORDER BY s.day;
-        """
-        
-        # For MySQL, replace generate_series with a calendar table or recursive CTE and adjust casts.
-        with self.db.cursor(dictionary=True) as cur:
-            cur.execute(sql, (frm, to, frm, to, window - 1))
-            data = cur.fetchall()
-            return list(data)
+        """Daily completions over [frm.date(), to.date()) with a trailing moving average, from the rollup."""
+        first, end = frm.date(), to.date()  # end is exclusive
+        if first >= end:
+            return []
+        per_day = ReportRollupRepository(self.db).completed_per_day(first, end)
+        out: List[Dict] = []
+        recent: List[int] = []
+        day = first
+        while day < end:
+            completed = per_day.get(day, 0)
+            recent = (recent + [completed])[-window:]
+            out.append({"day": day, "completed": completed, "ma": sum(recent) / len(recent)})
+            day += timedelta(days=1)
+        return out
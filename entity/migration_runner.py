@@ -0,0 +1,227 @@
+# entity/migration_runner.py
+"""
+Versioned schema migrations.
+
+Migrations live in the `migrations` package as `NNNN_name.py` modules with
+`up(runner)` and `down(runner)` functions. Applied versions are recorded in
+`schema_migrations`, so `upgrade()` only runs what is missing and
+`downgrade(target)` undoes everything above `target`, newest first. The
+runner offers dialect-aware helpers (`create_index`, `drop_index`, `has_index`)
+so one migration runs on MySQL and on the SQLite backend.
+
+Migrations start from the baseline schema, so a database created from an older
+refinedModel.sql can be brought up to date. Objects that refinedModel.sql now
+creates itself are only added when `has_table` / `has_index` says they are
+missing, so running every migration on a freshly loaded model is harmless too.
+A migration calls `record(name)` for what it did create (kept in
+`schema_migration_objects`), and its `down` drops only what `created(name)`
+confirms, never an object the model itself made.
+
+MySQL commits DDL implicitly, so a migration that fails half-way is not rolled
+back: keep each one small and make `down` able to undo it.
+
+`explain_indexes(db, sql, params)` returns the indexes the database would use
+for a statement (EXPLAIN on MySQL, EXPLAIN QUERY PLAN on SQLite); see
+migrations/index_checks.py.
+"""
+from __future__ import annotations
+
+import importlib
+import pkgutil
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+_MODULE_RE = re.compile(r"^(\d{4})_(\w+)$")
+_SQLITE_INDEX_RE = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: Any
+
+
+def discover(package: str = "migrations") -> List[Migration]:
+    """Every `NNNN_name` module of `package`, oldest first."""
+    pkg = importlib.import_module(package)
+    found: Dict[int, Migration] = {}
+    for info in pkgutil.iter_modules(pkg.__path__):
+        m = _MODULE_RE.match(info.name)
+        if not m:
+            continue
+        version = int(m.group(1))
+        if version in found:
+            raise ValueError(f"Duplicate migration version {version}: {found[version].name}, {m.group(2)}")
+        found[version] = Migration(version, m.group(2), importlib.import_module(f"{package}.{info.name}"))
+    return [found[v] for v in sorted(found)]
+
+
+def dialect_of(db) -> str:
+    # SqliteConnection says so; profiled connections pass the attribute through
+    return getattr(db, "dialect", "mysql")
+
+
+class MigrationRunner:
+    def __init__(self, db, migrations: Optional[Sequence[Migration]] = None):
+        self.db = db
+        self.dialect = dialect_of(db)
+        self.migrations = list(migrations) if migrations is not None else discover()
+        self._running: Optional[int] = None
+
+    # ---------- helpers for migration modules ----------
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        cur = self.db.cursor()
+        try:
+            cur.execute(sql, tuple(params))
+        finally:
+            cur.close()
+
+    def create_index(self, name: str, table: str, columns: Sequence[str]) -> None:
+        cols = ", ".join(f"`{c}`" for c in columns)
+        self.execute(f"CREATE INDEX `{name}` ON `{table}` ({cols})")
+
+    def drop_index(self, name: str, table: str) -> None:
+        if self.dialect == "sqlite":
+            self.execute(f"DROP INDEX `{name}`")  # SQLite index names are global
+        else:
+            self.execute(f"DROP INDEX `{name}` ON `{table}`")
+
+    def has_index(self, name: str, table: str) -> bool:
+        if self.dialect == "sqlite":
+            return self._exists("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = %s", (name,))
+        return self._exists(
+            """
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+            """,
+            (table, name),
+        )
+
+    def has_table(self, name: str) -> bool:
+        if self.dialect == "sqlite":
+            return self._exists("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", (name,))
+        return self._exists(
+            "SELECT 1 FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+            (name,),
+        )
+
+    def record(self, name: str) -> None:
+        """Note that the running migration created `name`, so its `down` may drop it."""
+        self.execute(
+            "INSERT INTO schema_migration_objects (version, name) VALUES (%s, %s)", (self._running, name)
+        )
+
+    def created(self, name: str) -> bool:
+        """Whether the running migration created `name` (see `record`)."""
+        return self._exists(
+            "SELECT 1 FROM schema_migration_objects WHERE version = %s AND name = %s", (self._running, name)
+        )
+
+    def _exists(self, sql: str, params: Sequence[Any]) -> bool:
+        cur = self.db.cursor(buffered=True)
+        try:
+            cur.execute(sql, tuple(params))
+            return cur.fetchone() is not None
+        finally:
+            cur.close()
+
+    # ---------- bookkeeping ----------
+    def _ensure_table(self) -> None:
+        self.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+              version INT NOT NULL PRIMARY KEY,
+              name VARCHAR(100) NOT NULL,
+              applied_at TIMESTAMP NULL
+            )
+            """
+        )
+        self.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migration_objects (
+              version INT NOT NULL,
+              name VARCHAR(100) NOT NULL,
+              PRIMARY KEY (version, name)
+            )
+            """
+        )
+        self.db.commit()
+
+    def applied(self) -> Dict[int, Optional[datetime]]:
+        self._ensure_table()
+        cur = self.db.cursor()
+        try:
+            cur.execute("SELECT version, applied_at FROM schema_migrations")
+            return {int(version): applied_at for version, applied_at in cur.fetchall()}
+        finally:
+            cur.close()
+
+    def status(self) -> List[Tuple[Migration, Optional[datetime]]]:
+        """(migration, applied_at) for every known migration; applied_at is None when pending."""
+        done = self.applied()
+        return [(m, done.get(m.version)) for m in self.migrations]
+
+    def current_version(self) -> int:
+        return max(self.applied(), default=0)
+
+    # ---------- up / down ----------
+    def upgrade(self, target: Optional[int] = None) -> List[Migration]:
+        """Apply every pending migration up to `target` (default: all). Returns what ran."""
+        done = self.applied()
+        ran: List[Migration] = []
+        for m in self.migrations:
+            if target is not None and m.version > target:
+                break
+            if m.version in done:
+                continue
+            self._run(m, "up")
+            self.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                (m.version, m.name, datetime.now()),
+            )
+            self.db.commit()
+            ran.append(m)
+        return ran
+
+    def downgrade(self, target: int) -> List[Migration]:
+        """Undo every applied migration above `target`, newest first. Returns what ran."""
+        done = self.applied()
+        ran: List[Migration] = []
+        for m in reversed(self.migrations):
+            if m.version <= target:
+                break
+            if m.version not in done:
+                continue
+            self._run(m, "down")
+            self.execute("DELETE FROM schema_migration_objects WHERE version = %s", (m.version,))
+            self.execute("DELETE FROM schema_migrations WHERE version = %s", (m.version,))
+            self.db.commit()
+            ran.append(m)
+        return ran
+
+    def _run(self, migration: Migration, direction: str) -> None:
+        self._running = migration.version
+        try:
+            getattr(migration.module, direction)(self)
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self._running = None
+
+
+# ---------- EXPLAIN ----------
+def explain_indexes(db, sql: str, params: Sequence[Any] = ()) -> Set[str]:
+    """Names of the indexes the database plans to use for `sql` (nothing is executed)."""
+    cur = db.cursor(dictionary=True)
+    try:
+        if dialect_of(db) == "sqlite":
+            cur.execute("EXPLAIN QUERY PLAN " + sql, tuple(params))
+            return {name for row in cur.fetchall() for name in _SQLITE_INDEX_RE.findall(row["detail"])}
+        cur.execute("EXPLAIN " + sql, tuple(params))
+        return {row["key"] for row in cur.fetchall() if row.get("key")}
+    finally:
+        cur.close()
@@ -41,6 +41,12 @@ class Request:
         print("TEST")
         if (row["shortlist_count"]):
             req.shortlist_count=row["shortlist_count"]
+        # Rows joined with service_category carry the name, so no extra lookup is needed
+        if "category_name" in row:
+            req.set_service_category(
+                {"category_id": row["category_id"], "category_name": row["category_name"]}
+                if row["category_id"] is not None else None
+            )
         return req
 
     @classmethod
@@ -20,12 +20,18 @@
 #32
 # As a PIN, I want to view the number of times my request has been viewed so that I can gauge interest
 
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Tuple
 from datetime import datetime
 
-from flask import current_app
+from entity import cache_version
+from entity.db_pool import get_db, stream_rows
+from entity.unit_of_work import after_commit, commit, rollback
 from entity.pin_request import Request
 from entity.match_repository import MatchRepository
+from entity.request_cache import invalidate_all_requests, invalidate_request
+from entity.single_flight import coalesce
+from entity.report_rollup_repository import ReportRollupRepository
+from entity.text_search import TextSearch
 
 
 class RequestRepository:
@@ -35,9 +41,8 @@ class RequestRepository:
       #23 create, #24 view mine, #25 update, #26 delete,
       #27 search mine, #28 search past matches, #29 view past matches
     """
-    def __init__(self):
-        db = current_app.config["DB"]
-        self.db = db
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_db()
 
     # ---------- #23: Create a request ----------
     def create_request(
@@ -62,8 +67,9 @@ class RequestRepository:
             (pin_user_id, title, description, category_id, location),
         )
         new_id = cur.lastrowid
-        self.db.commit()
+        commit(self.db)
         cur.close()
+        cache_version.bump(self.db, cache_version.REQUESTS)
         # Return full row
         return self.get_request_by_id(new_id)
 
@@ -73,21 +79,9 @@ class RequestRepository:
         if pin_user_id is None:
             cur.execute(
                 """
-                SELECT
-                r.*,
-                COALESCE(sl.cnt, 0) AS shortlist_count,
-                COALESCE(rv.cnt, 0) AS view_count
+                SELECT r.*, sc.category_name
                 FROM request r
-                LEFT JOIN (
-                SELECT request_id, COUNT(*) AS cnt
-                FROM shortlist
-                GROUP BY request_id
-                ) sl ON sl.request_id = r.request_id
-                LEFT JOIN (
-                SELECT request_id, COUNT(*) AS cnt
-                FROM request_view
-                GROUP BY request_id
-                ) rv ON rv.request_id = r.request_id
+                LEFT JOIN service_category sc ON sc.category_id = r.category_id
                 WHERE r.request_id = %s;
                 """,
                 (request_id,),
@@ -95,21 +89,9 @@ class RequestRepository:
         else:
             cur.execute(
                 """
-                SELECT
-                r.*,
-                COALESCE(sl.cnt, 0) AS shortlist_count,
-                COALESCE(rv.cnt, 0) AS view_count
+                SELECT r.*, sc.category_name
                 FROM request r
-                LEFT JOIN (
-                SELECT request_id, COUNT(*) AS cnt
-                FROM shortlist
-                GROUP BY request_id
-                ) sl ON sl.request_id = r.request_id
-                LEFT JOIN (
-                SELECT request_id, COUNT(*) AS cnt
-                FROM request_view
-                GROUP BY request_id
-                ) rv ON rv.request_id = r.request_id
+                LEFT JOIN service_category sc ON sc.category_id = r.category_id
                 WHERE r.request_id = %s AND r.pin_user_id = %s;
                 """
                 ,
@@ -125,28 +107,18 @@ class RequestRepository:
         pin_user_id: int,
         status: Optional[str] = None,
         order_desc: bool = True,
+        stream: bool = False,
     ) -> List[Request]:
         try:
             """
             Returns all requests for a PIN (optionally filtered by status).
+            stream=True returns a lazy row iterator instead (see stream_rows).
             """
             params: List[Any] = [pin_user_id]
             sql = """
-            SELECT
-            r.*,
-            COALESCE(sl.cnt, 0) AS shortlist_count,
-            COALESCE(rv.cnt, 0) AS view_count
+            SELECT r.*, sc.category_name
             FROM request r
-            LEFT JOIN (
-            SELECT request_id, COUNT(*) AS cnt
-            FROM shortlist
-            GROUP BY request_id
-            ) sl ON sl.request_id = r.request_id
-            LEFT JOIN (
-            SELECT request_id, COUNT(*) AS cnt
-            FROM request_view
-            GROUP BY request_id
-            ) rv ON rv.request_id = r.request_id
+            LEFT JOIN service_category sc ON sc.category_id = r.category_id
             WHERE r.pin_user_id = %s
             """
             params = [pin_user_id]
@@ -154,6 +126,8 @@ class RequestRepository:
                 sql += " AND r.status = %s"
                 params.append(status)
             sql += " ORDER BY r.created_at " + ("DESC" if order_desc else "ASC")            
+            if stream:
+                return stream_rows(self.db, sql, params)
             cur = self.db.cursor(dictionary=True)
             cur.execute(sql, tuple(params))
             rows = cur.fetchall()
@@ -204,6 +178,11 @@ class RequestRepository:
         params.extend([request_id, pin_user_id])
 
         cur = self.db.cursor()
+        if category_id is not None or location is not None or status is not None:
+            # report rollups bucket by these columns, so the request's past days move
+            ReportRollupRepository.mark_requests_dirty(
+                cur, "r.request_id = %s AND r.pin_user_id = %s", (request_id, pin_user_id)
+            )
         cur.execute(
             f"""
             UPDATE request
@@ -212,8 +191,10 @@ class RequestRepository:
             """,
             tuple(params),
         )
-        self.db.commit()
+        commit(self.db)
         cur.close()
+        cache_version.bump(self.db, cache_version.REQUESTS)
+        after_commit(self.db, invalidate_request, request_id)
 
         return self.get_request_by_id(request_id, pin_user_id)
 
@@ -244,14 +225,21 @@ class RequestRepository:
                 (request_id, ),
             )
 
+            ReportRollupRepository.mark_requests_dirty(
+                cur, "r.request_id = %s AND r.pin_user_id = %s", (request_id, pin_user_id)
+            )
+
             # Proceed with deletion
             cur.execute(
                 "DELETE FROM request WHERE request_id = %s AND pin_user_id = %s",
                 (request_id, pin_user_id),
             )
-            self.db.commit()
+            deleted = cur.rowcount
+            commit(self.db)
+            cache_version.bump(self.db, cache_version.REQUESTS)
+            after_commit(self.db, invalidate_request, request_id)
 
-            if cur.rowcount == 0:
+            if deleted == 0:
                 # nothing deleted (race condition or ownership mismatch)
                 return None
 
@@ -260,7 +248,7 @@ class RequestRepository:
         except Exception as e:
             # any other FK blocks
             print("Error:",str(e))
-            self.db.rollback()
+            rollback(self.db)
             raise ValueError("Request cannot be deleted because it is referenced by other records.") from e
         finally:
             cur.close()
@@ -281,40 +269,49 @@ class RequestRepository:
         Search a PIN's requests using common filters.
         """
         sql = """
-            SELECT *
-            FROM request
-            WHERE pin_user_id = %s
+            SELECT r.*, sc.category_name
+            FROM request r
+            LEFT JOIN service_category sc ON sc.category_id = r.category_id
+            WHERE r.pin_user_id = %s
         """
         
         params: List[Any] = [pin_user_id]
     
-        if keyword:
-            sql += " AND (title LIKE %s OR description LIKE %s)"
-            like = f"%{keyword}%"
-            params.extend([like, like])
+        text = TextSearch(keyword)
+        if text.active:
+            clause, clause_params = text.where()
+            sql += " AND " + clause
+            params.extend(clause_params)
 
         if status:
             if isinstance(status, (list, tuple)):
                 placeholders = ", ".join(["%s"] * len(status))
-                sql += f" AND status IN ({placeholders})"
+                sql += f" AND r.status IN ({placeholders})"
                 params.extend(list(status))
             else:
-                sql += " AND status = %s"
+                sql += " AND r.status = %s"
                 params.append(status)
 
         if category_id is not None:
-            sql += " AND category_id = %s"
+            sql += " AND r.category_id = %s"
             params.append(category_id)
 
         if date_from:
-            sql += " AND created_at >= %s"
+            sql += " AND r.created_at >= %s"
             params.append(date_from)
 
         if date_to:
-            sql += " AND created_at <= %s"
+            sql += " AND r.created_at <= %s"
             params.append(date_to)
 
-        sql += " ORDER BY created_at " + ("DESC" if order_desc else "ASC")
+        # Best matches first when searching by keyword, newest first otherwise
+        relevance = text.relevance()
+        if relevance:
+            sql += f" ORDER BY {relevance[0]},"
+            params.extend(relevance[1])
+        else:
+            sql += " ORDER BY"
+        sql += " r.created_at " + ("DESC" if order_desc else "ASC")
 
         cur = self.db.cursor(dictionary=True)
         cur.execute(sql, tuple(params))
@@ -322,23 +319,33 @@ class RequestRepository:
         cur.close()
         return [(r) for r in rows]
     
+    @coalesce
     def search_requests_by_status(
         self,
         *,
         status = None,
         query = "",
         order_desc: bool = True,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        stream: bool = False,
     ) -> List[Request]:
         """
         Search a PIN's requests using common filters.
+        Keyset pagination: pass `limit`, and `after=(created_at, request_id)` of the
+        last row already seen to get the next page. Rows are ordered by
+        (created_at, request_id) so the scan follows idx_request_status_created
+        (or idx_pin_requests_created without a status filter).
+        stream=True returns a lazy row iterator instead (see stream_rows).
         """
         sql = f"""
             SELECT r.request_id, r.pin_user_id, r.title, r.description, r.status,
                    r.created_at, r.updated_at, r.shortlist_count,
-                   r.category_id, r.location, COALESCE(COUNT(rv.view_id), 0) AS view_count
+                   r.category_id, r.location, r.view_count,
+                   sc.category_name
             FROM request r
-            LEFT JOIN request_view AS rv ON rv.request_id = r.request_id
-            Where
+            LEFT JOIN service_category sc ON sc.category_id = r.category_id
+            WHERE 1 = 1
         """
 
         params = []
@@ -347,20 +354,39 @@ class RequestRepository:
         if status:
             if isinstance(status, (list, tuple)):
                 placeholders = ", ".join(["%s"] * len(status))
-                sql += f" status IN ({placeholders})"
+                sql += f" AND r.status IN ({placeholders})"
                 params.extend(list(status))
             else:
-                sql += " status = %s"
+                sql += " AND r.status = %s"
                 params.append(status)
                 
-        print(query)
-        sql += " AND (r.title LIKE %s OR r.description LIKE %s)"
-        params.append(f"%{query}%")
-        params.append(f"%{query}%")
+        text = TextSearch(query)
+        if text.active:
+            clause, clause_params = text.where()
+            sql += " AND " + clause
+            params.extend(clause_params)
+
+        if after is not None:
+            after_created, after_id = after
+            op = "<" if order_desc else ">"
+            sql += f" AND (r.created_at {op} %s OR (r.created_at = %s AND r.request_id {op} %s))"
+            params.extend([after_created, after_created, after_id])
+
+        direction = "DESC" if order_desc else "ASC"
+        # Keyset pages must keep the (created_at, request_id) order; unpaged searches rank by relevance
+        relevance = text.relevance() if limit is None and after is None else None
+        if relevance:
+            sql += f" ORDER BY {relevance[0]}, r.created_at {direction}, r.request_id {direction}"
+            params.extend(relevance[1])
+        else:
+            sql += f" ORDER BY r.created_at {direction}, r.request_id {direction}"
 
-        sql += " GROUP BY r.request_id ORDER BY created_at " + ("DESC" if order_desc else "ASC")
-        
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(int(limit))
 
+        if stream:
+            return stream_rows(self.db, sql, params)
         cur = self.db.cursor(dictionary=True)
         cur.execute(sql, tuple(params))
         rows = cur.fetchall()
@@ -368,6 +394,50 @@ class RequestRepository:
         return [(r) for r in rows]
 
 
+    def version(self) -> int:
+        """
+        Change marker for the request lists, used for ETags: one row read of a
+        counter that every write to a request (rows, status, view/shortlist
+        counters) bumps once it has committed (see entity/cache_version.py).
+        """
+        return cache_version.read(self.db, cache_version.REQUESTS)
+
+    # ---------- view/shortlist counters ----------
+    def reconcile_counters(self, request_id: Optional[int] = None) -> int:
+        """
+        Recompute request.view_count / shortlist_count from request_view and shortlist
+        and fix any row that has drifted (e.g. writes made outside the repositories).
+        Pass request_id to reconcile a single request. Returns the number of rows fixed.
+        """
+        # correlated subqueries rather than UPDATE ... JOIN so the statement also runs on the SQLite backend
+        sql = """
+            UPDATE request
+            SET view_count = (SELECT COUNT(*) FROM request_view rv WHERE rv.request_id = request.request_id),
+                shortlist_count = (SELECT COUNT(*) FROM shortlist sl WHERE sl.request_id = request.request_id),
+                updated_at = updated_at
+            WHERE (NOT (view_count <=> (SELECT COUNT(*) FROM request_view rv WHERE rv.request_id = request.request_id))
+                   OR NOT (shortlist_count <=> (SELECT COUNT(*) FROM shortlist sl WHERE sl.request_id = request.request_id)))
+        """
+        params: List[Any] = []
+        if request_id is not None:
+            sql += " AND request_id = %s"
+            params.append(request_id)
+
+        cur = self.db.cursor()
+        try:
+            cur.execute(sql, tuple(params))
+            fixed = cur.rowcount or 0
+            commit(self.db)
+            if fixed:
+                cache_version.bump(self.db, cache_version.REQUESTS)
+            if fixed and request_id is not None:
+                after_commit(self.db, invalidate_request, request_id)
+            elif fixed:
+                after_commit(self.db, invalidate_all_requests)
+            return fixed
+        finally:
+            cur.close()
+
     def count_created(self, frm: datetime, to: datetime) -> int:
         sql = "SELECT COUNT(*) FROM request WHERE created_at >= %s AND created_at < %s"
         with self.db.cursor() as cur:
@@ -425,7 +495,8 @@ class RequestRepository:
         order_desc: bool = True,
     ):
         return MatchRepository(self.db).search_past_matches(
-            pin_user_id=pin_user_id,
+            user_id=pin_user_id,
+            user_type="pin_user_id",
             category_id=category_id,
             keyword=keyword,
             service_date_from=service_date_from,
@@ -448,7 +519,8 @@ class RequestRepository:
         order_desc: bool = True,
     ):
         return MatchRepository(self.db).list_past_matches(
-            pin_user_id=pin_user_id,
+            user_id=pin_user_id,
+            user_type="pin_user_id",
             category_id=category_id,
             service_date_from=service_date_from,
             service_date_to=service_date_to,
@@ -1,47 +1,55 @@
 from dataclasses import dataclass
 from datetime import datetime, date
-from typing import List, Optional, Dict
-from flask import current_app
+from typing import Any, List, Optional, Dict
+from entity.db_pool import get_db
+from entity.category_cache import CategoryCache, get_category_cache
+from entity.report_rollup_repository import ReportRollupRepository
 
-# @dataclass
-# class StatusSnapshot:
-#     open: int
-#     in_progress: int
-#     completed: int
-#     cancelled: int
+@dataclass
+class StatusSnapshot:
+    open: int
+    in_progress: int
+    completed: int
+    cancelled: int
 
 @dataclass
 class LocationCount:
     location: str
     count: int
 
-# @dataclass
-# class CategoryCount:
-#     category: str
-#     count: int
+@dataclass
+class CategoryCount:
+    category: str
+    count: int
 
 @dataclass
 class ReportSummary:
     from_ts: datetime
     to_ts: datetime
-    # requests_created: int
-    # request_views: int
-    # request_shortlists: int
-    # matches_created: int
-    # matches_completed: int
-    # status_snapshot: StatusSnapshot
-    # avg_time_to_completion_days: Optional[float]
+    requests_created: int
+    request_views: int
+    request_shortlists: int
+    matches_created: int
+    matches_completed: int
+    status_snapshot: StatusSnapshot
+    avg_time_to_completion_days: Optional[float]
     by_location: List[LocationCount]
-    # by_category: List[CategoryCount]
-    # new_csrs: int
-    # active_csrs: int
+    by_category: List[CategoryCount]
+    new_csrs: int
+    active_csrs: int
 
 
 class ReportRepository:
-    
-    def __init__(self):
-        db = current_app.config["DB"]
-        self.db = db
+
+    def __init__(
+        self,
+        db=None,
+        cat_cache: Optional[CategoryCache] = None,
+        rollup_max_age: float = 60.0,
+    ):
+        self.db = db if db is not None else get_db()
+        self.rollup_max_age = rollup_max_age
+        self.cat_cache = cat_cache if cat_cache is not None else (get_category_cache() if db is None else CategoryCache())
 
     def count_by_location(self, frm: datetime, to: datetime) -> List[Dict]:
         sql = """
@@ -54,11 +62,80 @@ class ReportRepository:
         with self.db.cursor(dictionary=True) as cur:
             cur.execute(sql, (frm, to))
             return [LocationCount(**row) for row in cur.fetchall()]
-        
+
+    @staticmethod
+    def _csr_counts(db, first_day: date, end_day: date) -> Dict[str, Any]:
+        sql = """
+            SELECT
+                (SELECT COUNT(*) FROM user
+                  WHERE role = 'Csr_Rep' AND created_at >= %s AND created_at < %s) AS new_csrs,
+                (SELECT COUNT(DISTINCT csr_user_id) FROM report_daily_csr
+                  WHERE day >= %s AND day < %s) AS active_csrs
+        """
+        start = datetime.combine(first_day, datetime.min.time())
+        end = datetime.combine(end_day, datetime.min.time())
+        with db.cursor(dictionary=True) as cur:
+            cur.execute(sql, (start, end, first_day, end_day))
+            return cur.fetchone()
+
     def get_report(self, frm: datetime, to: datetime) -> ReportSummary:
-        print("TEST")
+        """
+        Full summary answered from the daily rollups, so the cost grows with the number
+        of days rather than the number of rows. Every field covers the same whole days,
+        [frm.date(), to.date()): pass midnights (to = the midnight after the last day
+        wanted). Changed days in that window are refreshed first; new days are picked
+        up at most once every rollup_max_age seconds. Everything runs on the request's own connection: a
+        second checkout per report would exhaust the pool under DB_POOL_SIZE concurrent
+        reports, each holding one connection while waiting for another.
+        """
+        rollup = ReportRollupRepository(self.db)
+        first_day, end_day = frm.date(), to.date()
+        rollup.refresh(max_age_seconds=self.rollup_max_age, window=(first_day, end_day))
+        rows = rollup.summary_rows(first_day, end_day)
+        csrs = self._csr_counts(self.db, first_day, end_day)
+
+        totals = {k: 0 for k in ("views", "shortlists", "matches_created", "completed", "completion_seconds")}
+        by_status: Dict[str, int] = {}
+        by_location: Dict[str, int] = {}
+        by_category_id: Dict[Optional[int], int] = {}
+        for row in rows:
+            for k in totals:
+                totals[k] += int(row[k] or 0)
+            n = int(row["created"] or 0)
+            if not n:
+                continue
+            by_status[row["status"]] = by_status.get(row["status"], 0) + n
+            by_location[row["location"]] = by_location.get(row["location"], 0) + n
+            by_category_id[row["category_id"]] = by_category_id.get(row["category_id"], 0) + n
+
+        # Every category is listed (zeros included), names come from the category cache
+        categories = self.cat_cache.list_categories(self.db)
+        by_category = sorted(
+            (CategoryCount(category=c["name"], count=by_category_id.get(c["id"], 0)) for c in categories),
+            key=lambda c: (-c.count, c.category),
+        )
+
+        completed = totals["completed"]
         return ReportSummary(
-            from_ts=frm,
-            to_ts=to,
-            by_location=self.count_by_location(frm, to)
-        )
\ No newline at end of file
+            from_ts=datetime.combine(first_day, datetime.min.time()),
+            to_ts=datetime.combine(end_day, datetime.min.time()),
+            requests_created=sum(by_status.values()),
+            request_views=totals["views"],
+            request_shortlists=totals["shortlists"],
+            matches_created=totals["matches_created"],
+            matches_completed=completed,
+            status_snapshot=StatusSnapshot(
+                open=by_status.get("Open", 0),
+                in_progress=by_status.get("In Progress", 0),
+                completed=by_status.get("Completed", 0),
+                cancelled=by_status.get("Cancelled", 0),
+            ),
+            avg_time_to_completion_days=(totals["completion_seconds"] / completed / 86400.0) if completed else None,
+            by_location=sorted(
+                (LocationCount(location=k, count=v) for k, v in by_location.items()),
+                key=lambda l: -l.count,
+            ),
+            by_category=by_category,
+            new_csrs=int(csrs["new_csrs"]),
+            active_csrs=int(csrs["active_csrs"]),
+        )
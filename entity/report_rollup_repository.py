@@ -0,0 +1,269 @@
+# entity/report_rollup_repository.py
+"""
+Daily pre-aggregates for the Platform Manager report.
+
+`report_daily_rollup` holds one row per (day, category_id, location, status) with
+the number of requests created, views, shortlists, matches created/completed and
+the summed request->completion seconds for that day. Dimensions are the request's
+*current* category/location/status. `report_daily_csr` records which CSRs were
+active on each day so distinct counts stay exact.
+
+Refreshes are incremental: only days since the last refresh plus days marked in
+`report_rollup_dirty` (by writes that move or remove older events) are rebuilt.
+A refresh for a report window rebuilds only the days inside it and leaves the
+rest flagged, so even the first refresh (no watermark yet) costs what the report
+covers rather than the whole history.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from entity.db_pool import get_db
+from entity.unit_of_work import commit, run_in_transaction
+
+# Requests whose events must be re-bucketed are selected with `r` as the request alias
+_DIRTY_DAYS_SQL = """
+    INSERT IGNORE INTO report_rollup_dirty (day)
+    SELECT DATE(r.created_at) FROM request r WHERE {where}
+    UNION SELECT DATE(rv.viewed_at) FROM request_view rv
+          JOIN request r ON r.request_id = rv.request_id WHERE {where}
+    UNION SELECT DATE(s.added_at) FROM shortlist s
+          JOIN request r ON r.request_id = s.request_id WHERE {where}
+    UNION SELECT m.service_date FROM `match` m
+          JOIN request r ON r.request_id = m.request_id WHERE {where}
+    UNION SELECT DATE(m.completion_date) FROM `match` m
+          JOIN request r ON r.request_id = m.request_id
+          WHERE {where} AND m.completion_date IS NOT NULL
+"""
+
+# Same for matches (alias `m`, with its request as `r`)
+_DIRTY_MATCH_DAYS_SQL = """
+    INSERT IGNORE INTO report_rollup_dirty (day)
+    SELECT m.service_date FROM `match` m
+          JOIN request r ON r.request_id = m.request_id WHERE {where}
+    UNION SELECT DATE(m.completion_date) FROM `match` m
+          JOIN request r ON r.request_id = m.request_id
+          WHERE {where} AND m.completion_date IS NOT NULL
+"""
+
+# Same for shortlist entries (alias `s`)
+_DIRTY_SHORTLIST_DAYS_SQL = """
+    INSERT IGNORE INTO report_rollup_dirty (day)
+    SELECT DATE(s.added_at) FROM shortlist s WHERE {where}
+"""
+
+_REBUILD_SQL = """
+    INSERT INTO report_daily_rollup
+        (day, category_id, location, status,
+         created, views, shortlists, matches_created, completed, completion_seconds)
+    SELECT e.day,
+           COALESCE(r.category_id, 0),
+           COALESCE(r.location, 'Unknown'),
+           COALESCE(r.status, 'Open'),
+           SUM(e.created), SUM(e.views), SUM(e.shortlists),
+           SUM(e.matches_created), SUM(e.completed), SUM(e.completion_seconds)
+    FROM (
+        SELECT request_id, DATE(created_at) AS day,
+               1 AS created, 0 AS views, 0 AS shortlists, 0 AS matches_created,
+               0 AS completed, 0 AS completion_seconds
+        FROM request WHERE created_at >= %s AND created_at < %s
+        UNION ALL
+        SELECT request_id, DATE(viewed_at), 0, 1, 0, 0, 0, 0
+        FROM request_view WHERE viewed_at >= %s AND viewed_at < %s
+        UNION ALL
+        SELECT request_id, DATE(added_at), 0, 0, 1, 0, 0, 0
+        FROM shortlist WHERE added_at >= %s AND added_at < %s
+        UNION ALL
+        SELECT request_id, service_date, 0, 0, 0, 1, 0, 0
+        FROM `match` WHERE service_date >= %s AND service_date < %s
+        UNION ALL
+        SELECT m.request_id, DATE(m.completion_date), 0, 0, 0, 0, 1,
+               TIMESTAMPDIFF(SECOND, rc.created_at, m.completion_date)
+        FROM `match` m JOIN request rc ON rc.request_id = m.request_id
+        WHERE m.completion_date >= %s AND m.completion_date < %s
+    ) e
+    JOIN request r ON r.request_id = e.request_id
+    GROUP BY e.day, COALESCE(r.category_id, 0), COALESCE(r.location, 'Unknown'), COALESCE(r.status, 'Open')
+"""
+
+_REBUILD_CSR_SQL = """
+    INSERT IGNORE INTO report_daily_csr (day, csr_user_id)
+    SELECT DATE(added_at), csr_user_id FROM shortlist WHERE added_at >= %s AND added_at < %s
+    UNION
+    SELECT service_date, csr_user_id FROM `match` WHERE service_date >= %s AND service_date < %s
+"""
+
+
+class ReportRollupRepository:
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_db()
+
+    # ---------- write-side hooks (run inside the caller's transaction) ----------
+    @staticmethod
+    def mark_requests_dirty(cur, where: str, params: Sequence[Any]) -> None:
+        """
+        Flag every day holding an event of the matching requests (alias `r`), e.g.
+        before a request changes category/location/status or is deleted.
+        """
+        cur.execute(_DIRTY_DAYS_SQL.format(where=where), tuple(params) * 5)
+
+    @staticmethod
+    def mark_matches_dirty(cur, where: str, params: Sequence[Any]) -> None:
+        """Flag the service/completion days of the matching matches (alias `m`) before they are deleted."""
+        cur.execute(_DIRTY_MATCH_DAYS_SQL.format(where=where), tuple(params) * 2)
+
+    @staticmethod
+    def mark_shortlists_dirty(cur, where: str, params: Sequence[Any]) -> None:
+        """Flag the days of the matching shortlist entries (alias `s`) before they are deleted."""
+        cur.execute(_DIRTY_SHORTLIST_DAYS_SQL.format(where=where), tuple(params))
+
+    @staticmethod
+    def mark_days_dirty(cur, days: Iterable[date]) -> None:
+        days = [d for d in days if d is not None]
+        if days:
+            cur.executemany("INSERT IGNORE INTO report_rollup_dirty (day) VALUES (%s)", [(d,) for d in days])
+
+    # ---------- refresh ----------
+    def refresh(
+        self,
+        *,
+        now: Optional[datetime] = None,
+        max_age_seconds: float = 0,
+        window: Optional[Tuple[date, date]] = None,
+    ) -> int:
+        """
+        Rebuild the days that changed since the last refresh. New days are picked up
+        at most once every max_age_seconds. With window=(first_day, end_day) only the
+        days in [first_day, end_day) are rebuilt (flagged ones included, however recent
+        the last refresh); changed days outside it stay flagged for a later refresh.
+        Returns the number of days rebuilt. Concurrent callers are serialised on the
+        report_rollup_state row. Runs as a unit of work (a savepoint when the caller
+        already has one open).
+        """
+        now = now or datetime.now()
+        return run_in_transaction(self.db, lambda uow: self._refresh(now, max_age_seconds, window))
+
+    def _refresh(self, now: datetime, max_age_seconds: float, window: Optional[Tuple[date, date]]) -> int:
+        cur = self.db.cursor(buffered=True)
+        try:
+            cur.execute("SELECT refreshed_at FROM report_rollup_state WHERE id = 1 FOR UPDATE")
+            row = cur.fetchone()
+            refreshed_at = row[0] if row else None
+            stale = refreshed_at is None or (now - refreshed_at).total_seconds() >= max_age_seconds
+            if not stale and window is None:
+                return 0
+
+            if window is None:
+                cur.execute("SELECT day FROM report_rollup_dirty")
+            else:
+                cur.execute("SELECT day FROM report_rollup_dirty WHERE day >= %s AND day < %s", window)
+            days = {r[0] for r in cur.fetchall()}
+            if stale:
+                if refreshed_at is None:
+                    days |= self._all_event_days(cur)
+                else:
+                    # anything written since the last refresh is stamped on or after that day
+                    d = refreshed_at.date()
+                    while d <= now.date():
+                        days.add(d)
+                        d += timedelta(days=1)
+            if window is not None:
+                outside = {d for d in days if not window[0] <= d < window[1]}
+                self.mark_days_dirty(cur, outside)
+                days -= outside
+            if not days and not stale:
+                return 0
+
+            for first, last in self._contiguous_ranges(days):
+                self._rebuild_range(cur, first, last)
+
+            if window is None:
+                cur.execute("DELETE FROM report_rollup_dirty")
+            else:
+                cur.execute("DELETE FROM report_rollup_dirty WHERE day >= %s AND day < %s", window)
+            if stale:
+                cur.execute(
+                    """
+                    INSERT INTO report_rollup_state (id, refreshed_at) VALUES (1, %s)
+                    ON DUPLICATE KEY UPDATE refreshed_at = VALUES(refreshed_at)
+                    """,
+                    (now,),
+                )
+            return len(days)
+        finally:
+            cur.close()
+
+    def rebuild_all(self) -> int:
+        """Forget the watermark and rebuild every day (after bulk loads or manual edits)."""
+        cur = self.db.cursor()
+        try:
+            cur.execute("UPDATE report_rollup_state SET refreshed_at = NULL WHERE id = 1")
+            cur.execute("DELETE FROM report_daily_rollup")
+            cur.execute("DELETE FROM report_daily_csr")
+            commit(self.db)
+        finally:
+            cur.close()
+        return self.refresh()
+
+    # ---------- reads ----------
+    def summary_rows(self, first_day: date, end_day: date) -> List[Dict[str, Any]]:
+        """Per (category, location, status) totals over the days [first_day, end_day)."""
+        sql = """
+            SELECT category_id, location, status,
+                   SUM(created) AS created, SUM(views) AS views, SUM(shortlists) AS shortlists,
+                   SUM(matches_created) AS matches_created, SUM(completed) AS completed,
+                   SUM(completion_seconds) AS completion_seconds
+            FROM report_daily_rollup
+            WHERE day >= %s AND day < %s
+            GROUP BY category_id, location, status
+        """
+        with self.db.cursor(dictionary=True) as cur:
+            cur.execute(sql, (first_day, end_day))
+            return list(cur.fetchall())
+
+    def completed_per_day(self, first_day: date, end_day: date) -> Dict[date, int]:
+        """Completions per day over [first_day, end_day); days without any are left out."""
+        sql = """
+            SELECT day, SUM(completed) AS completed
+            FROM report_daily_rollup
+            WHERE day >= %s AND day < %s
+            GROUP BY day
+        """
+        with self.db.cursor() as cur:
+            cur.execute(sql, (first_day, end_day))
+            return {row[0]: int(row[1]) for row in cur.fetchall()}
+
+    # ---------- internals ----------
+    @staticmethod
+    def _rebuild_range(cur, first: date, last: date) -> None:
+        start = datetime.combine(first, datetime.min.time())
+        end = datetime.combine(last + timedelta(days=1), datetime.min.time())
+        cur.execute("DELETE FROM report_daily_rollup WHERE day >= %s AND day <= %s", (first, last))
+        cur.execute("DELETE FROM report_daily_csr WHERE day >= %s AND day <= %s", (first, last))
+        cur.execute(_REBUILD_SQL, (start, end) * 5)
+        cur.execute(_REBUILD_CSR_SQL, (start, end, first, last + timedelta(days=1)))
+
+    @staticmethod
+    def _all_event_days(cur) -> set:
+        cur.execute(
+            """
+            SELECT DATE(created_at) FROM request
+            UNION SELECT DATE(viewed_at) FROM request_view
+            UNION SELECT DATE(added_at) FROM shortlist
+            UNION SELECT service_date FROM `match`
+            UNION SELECT DATE(completion_date) FROM `match` WHERE completion_date IS NOT NULL
+            """
+        )
+        return {r[0] for r in cur.fetchall() if r[0] is not None}
+
+    @staticmethod
+    def _contiguous_ranges(days: Iterable[date]) -> List[Tuple[date, date]]:
+        ranges: List[Tuple[date, date]] = []
+        for d in sorted(days):
+            if ranges and d == ranges[-1][1] + timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], d)
+            else:
+                ranges.append((d, d))
+        return ranges
@@ -0,0 +1,128 @@
+# entity/request_cache.py
+"""
+Per-process LRU/TTL cache of hydrated requests for `GET /api/requests/<id>`.
+
+Holds at most `max_entries` requests, each for at most `ttl` seconds. The
+repositories that change a request row (update/delete, shortlist toggles,
+match completion/undo) call `invalidate(request_id)` after committing, so this
+worker never serves a stale row; other workers converge within `ttl`.
+View counts are deliberately not invalidated: they already lag by a view-sink
+flush and would otherwise evict popular requests on every read.
+
+A read that started before an invalidation must not put its older copy back,
+so `put` only stores when no invalidation happened since the matching
+`generation()` call.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Flask, current_app, has_app_context
+
+from entity.pin_request import Request
+
+
+class RequestCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[float, Request]]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ---------- reads ----------
+    def get(self, request_id: int) -> Optional[Request]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(request_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[request_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(request_id)
+            self.hits += 1
+        # callers may modify what they get back; the shared copy stays as loaded
+        return replace(entry[1])
+
+    def generation(self) -> int:
+        """Take before loading from the database; pass to `put`."""
+        with self._lock:
+            return self._generation
+
+    def put(self, request_id: int, request: Request, generation: int) -> bool:
+        with self._lock:
+            if generation != self._generation:
+                return False  # invalidated while the caller was loading
+            self._entries[request_id] = (time.monotonic() + self.ttl, replace(request))
+            self._entries.move_to_end(request_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    # ---------- invalidation ----------
+    def invalidate(self, request_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._entries.pop(request_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# ---------- Flask integration ----------
+def init_app(app: Flask) -> RequestCache:
+    app.config.setdefault("REQUEST_CACHE_MAX_ENTRIES", 1024)
+    app.config.setdefault("REQUEST_CACHE_TTL", 30.0)
+    cache = RequestCache(
+        max_entries=int(app.config["REQUEST_CACHE_MAX_ENTRIES"]),
+        ttl=float(app.config["REQUEST_CACHE_TTL"]),
+    )
+    app.extensions["request_cache"] = cache
+    return cache
+
+
+def get_request_cache(app: Optional[Flask] = None) -> Optional[RequestCache]:
+    """The app's cache, or None outside an app (scripts, benchmarks) or when not configured."""
+    if app is None:
+        if not has_app_context():
+            return None
+        app = current_app
+    return app.extensions.get("request_cache")
+
+
+def invalidate_request(request_id: int) -> None:
+    """Drop one request from the current app's cache, if there is one."""
+    cache = get_request_cache()
+    if cache is not None:
+        cache.invalidate(request_id)
+
+
+def invalidate_all_requests() -> None:
+    cache = get_request_cache()
+    if cache is not None:
+        cache.clear()
@@ -1,14 +1,16 @@
+from collections import Counter
 from datetime import datetime
 
-from flask import current_app
+from entity import cache_version
+from entity.db_pool import get_db
+from entity.unit_of_work import commit, rollback
 from entity.shortlist import Shortlist
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 
 class RequestViewRepository:
   
-    def __init__(self):
-        db = current_app.config["DB"]
-        self.db = db
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_db()
 
 
     def save_view(self, request_id: int, timestamp: datetime) -> None:
@@ -18,9 +20,71 @@ class RequestViewRepository:
                     "INSERT INTO request_view (request_id, viewed_at) VALUES (%s, %s)",
                     (request_id, timestamp)
                 )
-                self.db.commit()
+                # Keep the denormalised counter in step (updated_at is left untouched)
+                cur.execute(
+                    """
+                    UPDATE request
+                    SET view_count = COALESCE(view_count, 0) + 1, updated_at = updated_at
+                    WHERE request_id = %s
+                    """,
+                    (request_id,)
+                )
+                commit(self.db)
             finally:
                 cur.close()
+            cache_version.bump(self.db, cache_version.REQUESTS)
+
+    def save_views(self, events: List[Tuple[int, datetime]]) -> int:
+        """
+        Bulk insert (request_id, viewed_at) events in one transaction: a single
+        multi-row INSERT plus one UPDATE that bumps every affected view_count.
+        Views of requests that no longer exist (deleted since the view was queued)
+        are skipped rather than failing the batch. Returns the number written.
+        """
+        if not events:
+            return 0
+        cur = self.db.cursor()
+        try:
+            # lock the requests that still exist so none is deleted between here and the INSERT
+            ids = sorted({request_id for request_id, _ in events})
+            cur.execute(
+                f"SELECT request_id FROM request WHERE request_id IN ({', '.join(['%s'] * len(ids))}) FOR UPDATE",
+                tuple(ids)
+            )
+            existing = {row[0] for row in cur.fetchall()}
+            events = [e for e in events if e[0] in existing]
+            if not events:
+                commit(self.db)
+                return 0
+            per_request = Counter(request_id for request_id, _ in events)
+            # mysql-connector rewrites an INSERT executemany into one multi-row INSERT
+            cur.executemany(
+                "INSERT INTO request_view (request_id, viewed_at) VALUES (%s, %s)",
+                events
+            )
+            cases = " ".join(["WHEN %s THEN %s"] * len(per_request))
+            placeholders = ", ".join(["%s"] * len(per_request))
+            params: List[Any] = []
+            for request_id, n in per_request.items():
+                params.extend([request_id, n])
+            params.extend(per_request.keys())
+            cur.execute(
+                f"""
+                UPDATE request
+                SET view_count = COALESCE(view_count, 0) + CASE request_id {cases} ELSE 0 END,
+                    updated_at = updated_at
+                WHERE request_id IN ({placeholders})
+                """,
+                tuple(params)
+            )
+            commit(self.db)
+        except Exception:
+            rollback(self.db)
+            raise
+        finally:
+            cur.close()
+        cache_version.bump(self.db, cache_version.REQUESTS)  # once per batch
+        return len(events)
 
     def count_views(self, frm: datetime, to: datetime) -> int:
         sql = "SELECT COUNT(*) FROM request_view WHERE viewed_at >= %s AND viewed_at < %s"
@@ -1,39 +1,33 @@
 # app/entity/service_category_repository.py
 from typing import List, Dict, Any, Optional, Tuple
-from flask import current_app
+from entity.db_pool import get_db
+from entity.unit_of_work import after_commit, commit
+from entity.category_cache import CategoryCache, get_category_cache
+from entity.request_cache import invalidate_all_requests
 from mysql.connector import errorcode, errors
 
 
 class ServiceCategoryRepository:
-    def __init__(self):
-        db = current_app.config["DB"]
-        self.db = db
+    def __init__(self, db=None, cache: Optional[CategoryCache] = None):
+        self.db = db if db is not None else get_db()
+        self.cache = cache if cache is not None else get_category_cache()
 
-    # ---------- Read ----------
+    # ---------- Read (served from the process-wide CategoryCache) ----------
     def list_categories(self) -> List[Dict[str, Any]]:
         """
         Return simple JSON-ready dicts: [{id, name}, ...]
         """
-        cur = self.db.cursor(dictionary=True, buffered=True)
-        try:
-            cur.execute(
-                "SELECT category_id AS id, category_name AS name FROM service_category"
-            )
-            rows = cur.fetchall()
-            return rows  # already dicts with {id, name}
-        finally:
-            cur.close()
+        return self.cache.list_categories(self.db)
 
-    def get_category(self, id) -> List[Dict[str, Any]]:
-        cur = self.db.cursor(dictionary=True, buffered=True)
-        try:
-            cur.execute(
-                "SELECT * FROM service_category WHERE category_id = %s"
-            , (id, ))
-            row = cur.fetchone()
-            return row  # already dicts with {id, name}
-        finally:
-            cur.close()
+    def get_category(self, id) -> Optional[Dict[str, Any]]:
+        """
+        Return {category_id, category_name} or None.
+        """
+        return self.cache.get_category(self.db, id)
+
+    def version(self) -> int:
+        """Bumped on every category write; a cheap change marker for ETags."""
+        return self.cache.version(self.db)
 
     # ---------- Create ----------
     def create_category(self, name: str) -> int:
@@ -45,8 +39,11 @@ class ServiceCategoryRepository:
             cur.execute(
                 "INSERT INTO service_category (category_name) VALUES (%s)", (name,)
             )
-            self.db.commit()
-            return cur.lastrowid
+            new_id = cur.lastrowid
+            commit(self.db)
+            self.cache.bump_version(self.db)
+            after_commit(self.db, self.cache.invalidate)
+            return new_id
         finally:
             cur.close()
 
@@ -58,7 +55,10 @@ class ServiceCategoryRepository:
                 "UPDATE service_category SET category_name = %s WHERE category_id = %s",
                 (name, category_id),
             )
-            self.db.commit()
+            commit(self.db)
+            self.cache.bump_version(self.db)
+            after_commit(self.db, self.cache.invalidate)
+            after_commit(self.db, invalidate_all_requests)  # cached requests carry the category name
         finally:
             cur.close()
 
@@ -79,7 +79,10 @@ class ServiceCategoryRepository:
         cur = self.db.cursor()
         try:
             cur.execute("DELETE FROM service_category WHERE category_id = %s", (category_id,))
-            self.db.commit()
+            commit(self.db)
+            self.cache.bump_version(self.db)
+            after_commit(self.db, self.cache.invalidate)
+            after_commit(self.db, invalidate_all_requests)  # cached requests carry the category name
         except errors.IntegrityError as e:
             # Fallback in case of race conditions or other FK paths
             if getattr(e, "errno", None) == errorcode.ER_ROW_IS_REFERENCED_2:  # 1451
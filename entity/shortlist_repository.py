@@ -1,14 +1,17 @@
 from datetime import datetime
 
-from flask import current_app
+from entity import cache_version
+from entity.db_pool import get_db, stream_rows
+from entity.unit_of_work import after_commit, commit
+from entity.report_rollup_repository import ReportRollupRepository
+from entity.request_cache import invalidate_request
 from entity.shortlist import Shortlist
 from typing import List, Dict, Optional, Any
 
 class ShortlistRepository:
   
-    def __init__(self):
-        db = current_app.config["DB"]
-        self.db = db
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_db()
 
 
     def save_shortlist(self, csr_id: int, request_id: int, notes: Optional[str], added_at: datetime) -> None:
@@ -18,7 +21,10 @@ class ShortlistRepository:
                 "INSERT INTO shortlist (csr_user_id, request_id, notes, added_at) VALUES (%s, %s, %s, %s)",
                 (csr_id, request_id, notes, added_at)
             )
-            self.db.commit()
+            self._bump_shortlist_count(cur, request_id, +1)
+            commit(self.db)
+            cache_version.bump(self.db, cache_version.REQUESTS)
+            after_commit(self.db, invalidate_request, request_id)
             print("TEST")
         finally:
             cur.close()
@@ -42,33 +48,66 @@ class ShortlistRepository:
     def delete_shortlist_by_userid_and_requestid(self, csr_id: int, request_id: int) -> bool:
         cur = self.db.cursor(dictionary=True, buffered=True)
         try:
+            ReportRollupRepository.mark_shortlists_dirty(
+                cur, "s.csr_user_id = %s AND s.request_id = %s", (csr_id, request_id)
+            )
             cur.execute(
                 "DELETE FROM shortlist WHERE csr_user_id = %s AND request_id = %s",
                 (csr_id, request_id)
             )
-            self.db.commit()
-            return cur.rowcount > 0
+            deleted = cur.rowcount > 0
+            if deleted:
+                self._bump_shortlist_count(cur, request_id, -1)
+            commit(self.db)
+            if deleted:
+                cache_version.bump(self.db, cache_version.REQUESTS)
+                after_commit(self.db, invalidate_request, request_id)
+            return deleted
         finally:
             cur.close()
 
+    @staticmethod
+    def _bump_shortlist_count(cur, request_id: int, delta: int) -> None:
+        """Adjust request.shortlist_count in the caller's transaction (updated_at is left untouched)."""
+        cur.execute(
+            """
+            UPDATE request
+            SET shortlist_count = GREATEST(COALESCE(shortlist_count, 0) + %s, 0), updated_at = updated_at
+            WHERE request_id = %s
+            """,
+            (delta, request_id)
+        )
 
 
-    def view_shortlist(self, csr_id: int, query: str) -> List[Dict[str, Any]]:
-        cur = self.db.cursor(dictionary=True, buffered=True)
-        try:
-            cur.execute("""
+
+    def view_shortlist(self, csr_id: int, query: str, stream: bool = False) -> List[Dict[str, Any]]:
+        sql = """
                 SELECT * FROM shortlist s
                 JOIN request r ON s.request_id = r.request_id
                 WHERE s.csr_user_id = %s
                 AND (r.title LIKE %s OR r.description LIKE %s OR s.notes LIKE %s)
                 ORDER BY r.created_at DESC
-            """, (csr_id, f"%{query}%", f"%{query}%", f"%{query}%"))
+            """
+        params = (csr_id, f"%{query}%", f"%{query}%", f"%{query}%")
+        if stream:
+            return stream_rows(self.db, sql, params)
+        cur = self.db.cursor(dictionary=True, buffered=True)
+        try:
+            cur.execute(sql, params)
             rows = cur.fetchall()
             return rows
         finally:
             cur.close()
 
 
+    def shortlist_marker(self, csr_id: int) -> tuple:
+        """
+        Change marker (for ETags) over a CSR's shortlist and the requests on it. Every
+        shortlist toggle and request write bumps the requests counter, so that is enough.
+        """
+        return (cache_version.read(self.db, cache_version.REQUESTS),)
+
+
     # ------------------------------------
     #33 PIN view request shortlisted count
     # ------------------------------------
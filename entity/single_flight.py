@@ -0,0 +1,144 @@
+# entity/single_flight.py
+"""
+Coalescing of identical concurrent repository reads.
+
+`@coalesce` on a repository read method routes calls through the app's
+`SingleFlight`: while one call with the same method and (normalised)
+arguments is running, other callers wait for it and get its result instead
+of sending the same query to MySQL. A finished result is still handed out for
+`window` seconds, so a burst that arrives just after the leader finished is
+absorbed too; keep it short, since a write inside the window is not seen.
+
+Followers get their own copy of a list result (the rows themselves are
+shared, so don't mutate them). Exceptions reach every waiting caller.
+Streamed calls (`stream=True`) and calls outside an app are never coalesced.
+"""
+from __future__ import annotations
+
+import inspect
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from flask import Flask, current_app, has_app_context
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "finished_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.finished_at = 0.0
+
+
+class SingleFlight:
+    def __init__(self, window: float = 0.0):
+        self.window = window
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            call = self._calls.get(key)
+            stale = call is not None and call.done.is_set() and (
+                call.error is not None or now - call.finished_at > self.window
+            )
+            if stale:
+                del self._calls[key]
+                call = None
+            if call is None:
+                self._sweep(now)
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                call.finished_at = time.monotonic()
+                if self.window <= 0 or call.error is not None:
+                    with self._lock:
+                        if self._calls.get(key) is call:
+                            del self._calls[key]
+                call.done.set()
+            return call.result
+
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return list(call.result) if isinstance(call.result, list) else call.result
+
+    def _sweep(self, now: float) -> None:
+        # finished results outlive their window only until the next new key (caller holds the lock)
+        expired = [k for k, c in self._calls.items() if c.done.is_set() and now - c.finished_at > self.window]
+        for k in expired:
+            del self._calls[k]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"executions": self.executions, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+def _freeze(value: Any) -> Hashable:
+    """Normalise arguments so e.g. a list and a tuple of the same statuses share a key."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in value))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def coalesce(method: Callable) -> Callable:
+    """Decorate a repository read method so identical concurrent calls run once."""
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        flight = get_single_flight()
+        if flight is None or kwargs.get("stream"):
+            return method(self, *args, **kwargs)
+        # bind so positional/keyword spellings and omitted defaults give the same key
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = list(bound.arguments.items())[1:]
+        key = (method.__qualname__, _freeze(params))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return flight.do(key, lambda: method(self, *args, **kwargs))
+    return wrapper
+
+
+# ---------- Flask integration ----------
+def init_app(app: Flask) -> Optional[SingleFlight]:
+    app.config.setdefault("SINGLE_FLIGHT_ENABLED", True)
+    app.config.setdefault("SINGLE_FLIGHT_WINDOW", 0.0)
+    if not app.config["SINGLE_FLIGHT_ENABLED"]:
+        return None
+    flight = SingleFlight(window=float(app.config["SINGLE_FLIGHT_WINDOW"]))
+    app.extensions["single_flight"] = flight
+    return flight
+
+
+def get_single_flight(app: Optional[Flask] = None) -> Optional[SingleFlight]:
+    if app is None:
+        if not has_app_context():
+            return None
+        app = current_app
+    return app.extensions.get("single_flight")
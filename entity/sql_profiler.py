@@ -0,0 +1,275 @@
+# entity/sql_profiler.py
+"""
+Per-request SQL instrumentation.
+
+`get_db()` hands repositories a connection whose cursors time every
+`execute`/`executemany` and count the rows fetched. Each HTTP request gets a
+`QueryProfile` (query count, total DB time, slowest statement, rows returned);
+it is reported in a `Server-Timing` header and kept in a ring buffer of recent
+requests. Statements are normalised (literals and placeholders collapsed), so
+a loop issuing the same query per row shows up as one statement repeated N
+times; above `SQL_PROFILER_REPEAT_THRESHOLD` the request is flagged as a likely
+N+1 and logged (or rejected when `SQL_PROFILER_STRICT` is on, e.g. in tests).
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import Flask, current_app, g, request
+
+_current: ContextVar[Optional["QueryProfile"]] = ContextVar("sql_profile", default=None)
+
+_WS_RE = re.compile(r"\s+")
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(sql: Any) -> str:
+    """Collapse whitespace, literals and placeholders so repeated statements compare equal."""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    s = _WS_RE.sub(" ", str(sql)).strip()
+    s = _STRING_RE.sub("?", s)
+    s = s.replace("%s", "?")
+    s = _NUMBER_RE.sub("?", s)
+    return _LIST_RE.sub("(?, ...)", s)
+
+
+class RepeatedQueryError(RuntimeError):
+    """Raised in strict mode when a request repeats one statement too often."""
+
+
+class QueryProfile:
+    """SQL activity of one unit of work (normally one HTTP request)."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.query_count = 0
+        self.total_seconds = 0.0
+        self.rows = 0
+        self.slowest_seconds = 0.0
+        self.slowest_sql: Optional[str] = None
+        self.statements: Counter = Counter()
+
+    def record(self, sql: Any, seconds: float) -> None:
+        normalized = normalize_sql(sql)
+        self.query_count += 1
+        self.total_seconds += seconds
+        self.statements[normalized] += 1
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_sql = normalized
+
+    def record_fetch(self, rows: int, seconds: float) -> None:
+        self.rows += rows
+        self.total_seconds += seconds
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed more than `threshold` times, most frequent first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n > threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total_seconds * 1000:.1f};desc="{self.query_count} queries, {self.rows} rows", '
+            f"db-slowest;dur={self.slowest_seconds * 1000:.1f}"
+        )
+
+    def as_dict(self, threshold: int) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "query_count": self.query_count,
+            "db_ms": round(self.total_seconds * 1000, 2),
+            "rows": self.rows,
+            "slowest": {"sql": self.slowest_sql, "ms": round(self.slowest_seconds * 1000, 2)},
+            "repeated": [{"sql": sql, "count": n} for sql, n in self.repeated(threshold)],
+        }
+
+
+class _ProfiledCursor:
+    """Cursor proxy: times statements and counts fetched rows into the active profile."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, operation, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, *args, **kwargs)
+        finally:
+            _record(operation, time.perf_counter() - start)
+
+    def executemany(self, operation, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, *args, **kwargs)
+        finally:
+            _record(operation, time.perf_counter() - start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        _record_fetch(0 if row is None else 1, time.perf_counter() - start)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        _record_fetch(len(rows), time.perf_counter() - start)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        _record_fetch(len(rows), time.perf_counter() - start)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _ProfiledConnection:
+    """Connection proxy whose cursors are profiled; everything else is passed through."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return _ProfiledCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _record(sql: Any, seconds: float) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.record(sql, seconds)
+
+
+def _record_fetch(rows: int, seconds: float) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.record_fetch(rows, seconds)
+
+
+class SqlProfiler:
+    def __init__(self, *, history: int = 200, repeat_threshold: int = 10, strict: bool = False):
+        self.repeat_threshold = repeat_threshold
+        self.strict = strict
+        self._recent: deque = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.flagged = 0
+
+    @staticmethod
+    def wrap(conn):
+        return _ProfiledConnection(conn)
+
+    @staticmethod
+    def current() -> Optional[QueryProfile]:
+        return _current.get()
+
+    @contextmanager
+    def capture(self, label: str = "") -> Iterator[QueryProfile]:
+        """Profile a block outside the request hooks (scripts, tests)."""
+        profile = QueryProfile(label)
+        token = _current.set(profile)
+        try:
+            yield profile
+        finally:
+            _current.reset(token)
+
+    def finish(self, profile: QueryProfile, **extra: Any) -> Dict[str, Any]:
+        """Store a finished profile in the ring buffer and flag likely N+1 patterns."""
+        entry = profile.as_dict(self.repeat_threshold)
+        entry.update(extra)
+        with self._lock:
+            self.requests += 1
+            if entry["repeated"]:
+                self.flagged += 1
+            self._recent.append(entry)
+        return entry
+
+    def recent(self, *, flagged_only: bool = False) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._recent)
+        if flagged_only:
+            entries = [e for e in entries if e["repeated"]]
+        return entries[::-1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "flagged": self.flagged, "buffered": len(self._recent)}
+
+
+# ---------- Flask integration ----------
+def init_app(app: Flask) -> Optional[SqlProfiler]:
+    app.config.setdefault("SQL_PROFILER_ENABLED", True)
+    app.config.setdefault("SQL_PROFILER_HISTORY", 200)
+    app.config.setdefault("SQL_PROFILER_REPEAT_THRESHOLD", 10)
+    app.config.setdefault("SQL_PROFILER_STRICT", False)
+    if not app.config["SQL_PROFILER_ENABLED"]:
+        return None
+
+    profiler = SqlProfiler(
+        history=int(app.config["SQL_PROFILER_HISTORY"]),
+        repeat_threshold=int(app.config["SQL_PROFILER_REPEAT_THRESHOLD"]),
+        strict=bool(app.config["SQL_PROFILER_STRICT"]),
+    )
+    app.extensions["sql_profiler"] = profiler
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_reset_profile)
+    return profiler
+
+
+def get_profiler(app: Optional[Flask] = None) -> Optional[SqlProfiler]:
+    app = app or current_app
+    return app.extensions.get("sql_profiler")
+
+
+def _start_profile() -> None:
+    g._sql_profile_token = _current.set(QueryProfile(f"{request.method} {request.endpoint or request.path}"))
+
+
+def _finish_profile(response):
+    profile = _current.get()
+    profiler = get_profiler()
+    if profile is None or profiler is None:
+        return response
+    entry = profiler.finish(profile, path=request.path, status=response.status_code)
+    response.headers.add("Server-Timing", profile.server_timing())
+    if entry["repeated"]:
+        worst = entry["repeated"][0]
+        current_app.logger.warning(
+            "Possible N+1 in %s: statement ran %d times: %s", profile.label, worst["count"], worst["sql"]
+        )
+        if profiler.strict:
+            raise RepeatedQueryError(f"{profile.label} ran one statement {worst['count']} times: {worst['sql']}")
+    return response
+
+
+def _reset_profile(exc: Optional[BaseException]) -> None:
+    token = g.pop("_sql_profile_token", None)
+    if token is not None:
+        try:
+            _current.reset(token)
+        except ValueError:  # torn down from a different context; the var dies with it
+            pass
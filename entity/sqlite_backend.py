@@ -0,0 +1,416 @@
+# entity/sqlite_backend.py
+"""
+Embedded SQLite stand-in for the MySQL database, for tests and benchmarks.
+
+With `DB_BACKEND = "sqlite"` the app gets a `SqlitePool` instead of a
+`DatabasePool`. Its connections and cursors behave like mysql-connector's as
+far as the repositories use them (`cursor(dictionary=, buffered=)`,
+`start_transaction`, `in_transaction`, `rowcount`, `lastrowid`, ...), and
+SQLite errors are raised as the matching `mysql.connector.errors` with the
+MySQL errno (1062 duplicate key, 1451/1452 foreign key, 1205 lock wait), so
+repository code runs unchanged.
+
+The MySQL dialect the repositories use is rewritten per statement (and
+cached): `%s` placeholders, INSERT IGNORE, ON DUPLICATE KEY UPDATE, `<=>`,
+FOR UPDATE, multi-table `DELETE m FROM`, TIMESTAMPDIFF, and FULLTEXT
+`MATCH ... AGAINST` (boolean mode `+term*` queries, scored by `ft_match`).
+NOW(), CURDATE(), GREATEST() and LEAST() are registered as functions.
+
+`database=":memory:"` (the default) creates a private shared-cache database per
+pool, loaded from sqliteModel.sql plus the migrations/ package and dropped with
+the pool, so parallel test processes never see each other's data. Known differences from MySQL: UPDATE
+`rowcount` counts matched rather than changed rows, and strings that look
+exactly like a DATE/DATETIME come back as `date`/`datetime` (SQLite has no
+column types for expressions such as `DATE(created_at)`).
+"""
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from mysql.connector import errorcode, errors
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sqliteModel.sql")
+
+# ---------- MySQL -> SQLite statement rewriting ----------
+_PLACEHOLDER_RE = re.compile(r"%s")
+_INSERT_IGNORE_RE = re.compile(r"\bINSERT\s+IGNORE\b", re.I)
+_ON_DUPLICATE_RE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.I)
+_VALUES_FN_RE = re.compile(r"\bVALUES\(\s*`?(\w+)`?\s*\)", re.I)
+_FOR_UPDATE_RE = re.compile(r"\s+FOR\s+UPDATE\b", re.I)
+_NULL_SAFE_EQ_RE = re.compile(r"<=>")
+_TIMESTAMPDIFF_RE = re.compile(r"\bTIMESTAMPDIFF\(\s*(\w+)\s*,", re.I)
+_FULLTEXT_RE = re.compile(r"\bMATCH\s*\(([^)]*)\)\s*AGAINST\s*\(\s*\?\s+IN\s+BOOLEAN\s+MODE\s*\)", re.I)
+_MULTI_DELETE_RE = re.compile(r"^\s*DELETE\s+(\w+)\s+FROM\s+(`?\w+`?)\s+\1\b(.*)$", re.I | re.S)
+
+_NO_IMPLICIT_TX = ("SELECT", "WITH", "EXPLAIN", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+@lru_cache(maxsize=512)
+def translate(sql: str) -> str:
+    """Rewrite one MySQL statement into SQLite."""
+    s = _PLACEHOLDER_RE.sub("?", sql)
+    s = _INSERT_IGNORE_RE.sub("INSERT OR IGNORE", s)
+    parts = _ON_DUPLICATE_RE.split(s, maxsplit=1)
+    if len(parts) == 2:
+        s = parts[0] + "ON CONFLICT DO UPDATE SET" + _VALUES_FN_RE.sub(r"excluded.\1", parts[1])
+    s = _FOR_UPDATE_RE.sub("", s)
+    s = _NULL_SAFE_EQ_RE.sub(" IS ", s)
+    s = _TIMESTAMPDIFF_RE.sub(r"TIMESTAMPDIFF('\1',", s)
+    s = _FULLTEXT_RE.sub(r"ft_match(?, \1)", s)
+    m = _MULTI_DELETE_RE.match(s)
+    if m:
+        alias, table, rest = m.groups()
+        s = f"DELETE FROM {table} WHERE rowid IN (SELECT {alias}.rowid FROM {table} {alias}{rest})"
+    return s
+
+
+# ---------- SQL functions MySQL has and SQLite doesn't ----------
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_SECONDS = {"SECOND": 1, "MINUTE": 60, "HOUR": 3600, "DAY": 86400, "WEEK": 604800}
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _curdate() -> str:
+    return date.today().isoformat()
+
+
+def _parse_temporal(value: Any) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _timestampdiff(unit: str, start: Any, end: Any) -> Optional[int]:
+    a, b = _parse_temporal(start), _parse_temporal(end)
+    if a is None or b is None:
+        return None
+    return int((b - a).total_seconds() // _SECONDS[unit.upper()])
+
+
+def _greatest(*args: Any) -> Any:
+    return None if any(a is None for a in args) else max(args)
+
+
+def _least(*args: Any) -> Any:
+    return None if any(a is None for a in args) else min(args)
+
+
+def _ft_match(query: Optional[str], *columns: Any) -> float:
+    """
+    Relevance of `columns` for a BOOLEAN MODE query of `+term*` terms (see
+    entity/text_search.py): 0 unless every term prefixes some word, otherwise
+    the number of matching words.
+    """
+    if not query:
+        return 0.0
+    words = [w for c in columns if c for w in _TOKEN_RE.findall(str(c).lower())]
+    score = 0
+    for term in query.lower().split():
+        term = term.strip("+*")
+        hits = sum(1 for w in words if w.startswith(term))
+        if not hits:
+            return 0.0
+        score += hits
+    return float(score)
+
+
+# ---------- errors ----------
+def _is_lock_error(msg: str) -> bool:
+    return "locked" in msg or "busy" in msg
+
+
+def _mysql_error(e: sqlite3.Error, sql: str) -> errors.Error:
+    msg = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        if "UNIQUE" in msg or "PRIMARY KEY" in msg:
+            return errors.IntegrityError(msg=msg, errno=errorcode.ER_DUP_ENTRY)
+        if "FOREIGN KEY" in msg:
+            referenced = sql.lstrip()[:6].upper() in ("DELETE", "UPDATE")
+            errno = errorcode.ER_ROW_IS_REFERENCED_2 if referenced else errorcode.ER_NO_REFERENCED_ROW_2
+            return errors.IntegrityError(msg=msg, errno=errno)
+        if "NOT NULL" in msg:
+            return errors.IntegrityError(msg=msg, errno=errorcode.ER_BAD_NULL_ERROR)
+        if "CHECK" in msg:
+            return errors.DataError(msg=msg, errno=errorcode.WARN_DATA_TRUNCATED)
+        return errors.IntegrityError(msg=msg)
+    if isinstance(e, sqlite3.OperationalError):
+        if _is_lock_error(msg):
+            return errors.DatabaseError(msg=msg, errno=errorcode.ER_LOCK_WAIT_TIMEOUT)
+        return errors.ProgrammingError(msg=msg, errno=errorcode.ER_PARSE_ERROR)
+    return errors.DatabaseError(msg=msg)
+
+
+# ---------- values ----------
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DATETIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d{1,6})?$")
+
+
+def _to_sqlite(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _from_sqlite(value: Any) -> Any:
+    if isinstance(value, str) and len(value) >= 10 and value[4] == "-":
+        if _DATETIME_RE.match(value):
+            return datetime.fromisoformat(value)
+        if _DATE_RE.match(value):
+            return date.fromisoformat(value)
+    return value
+
+
+# ---------- connection / cursor ----------
+class SqliteCursor:
+    """mysql-connector style cursor; results are always read in full (buffered)."""
+
+    def __init__(self, conn: "SqliteConnection", dictionary: bool = False):
+        self._conn = conn
+        self._cur = conn._raw.cursor()
+        self._dictionary = dictionary
+        self._rows: List[Any] = []
+        self._pos = 0
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid: Optional[int] = None
+
+    @property
+    def column_names(self) -> tuple:
+        return tuple(d[0] for d in self.description or ())
+
+    def execute(self, operation: str, params: Sequence[Any] = ()) -> None:
+        sql = translate(operation)
+        args = tuple(_to_sqlite(p) for p in params or ())
+        self._conn._run(sql, lambda: self._cur.execute(sql, args))
+        self._load()
+
+    def executemany(self, operation: str, seq_params: Sequence[Sequence[Any]]) -> None:
+        sql = translate(operation)
+        rows = [tuple(_to_sqlite(p) for p in params) for params in seq_params]
+        self._conn._run(sql, lambda: self._cur.executemany(sql, rows))
+        self._load()
+
+    def _load(self) -> None:
+        self.description = self._cur.description
+        self.lastrowid = self._cur.lastrowid
+        if self.description is None:
+            self._rows, self._pos = [], 0
+            self.rowcount = self._cur.rowcount
+            return
+        names = self.column_names
+        rows = []
+        for raw in self._cur.fetchall():
+            values = tuple(_from_sqlite(v) for v in raw)
+            rows.append(dict(zip(names, values)) if self._dictionary else values)
+        self._rows, self._pos = rows, 0
+        self.rowcount = len(rows)
+
+    def fetchone(self) -> Optional[Any]:
+        if self._pos >= len(self._rows):
+            return None
+        row = self._rows[self._pos]
+        self._pos += 1
+        return row
+
+    def fetchmany(self, size: int = 1) -> List[Any]:
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return rows
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.fetchone, None)
+
+    def close(self) -> None:
+        self._rows = []
+        self._cur.close()
+
+    def __enter__(self) -> "SqliteCursor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SqliteConnection:
+    """
+    mysql-connector style connection with autocommit off: the first write
+    statement opens a transaction that lasts until commit()/rollback().
+    """
+
+    dialect = "sqlite"  # read by entity/migration_runner.py
+
+    def __init__(self, raw: sqlite3.Connection, lock_timeout: float = 5.0):
+        self._raw = raw
+        self.lock_timeout = lock_timeout
+
+    def cursor(self, dictionary: bool = False, buffered: Optional[bool] = None, **_: Any) -> SqliteCursor:
+        return SqliteCursor(self, dictionary=dictionary)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._raw.in_transaction
+
+    def start_transaction(self, **_: Any) -> None:
+        if self._raw.in_transaction:
+            raise errors.ProgrammingError("Transaction already in progress")
+        self._run("BEGIN", lambda: self._raw.execute("BEGIN"))
+
+    def commit(self) -> None:
+        if self._raw.in_transaction:
+            self._run("COMMIT", self._raw.commit)
+
+    def rollback(self) -> None:
+        if self._raw.in_transaction:
+            self._raw.rollback()
+
+    def ping(self, *_, **__) -> None:
+        pass
+
+    def is_connected(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self._raw.close()
+
+    def _run(self, sql: str, fn) -> Any:
+        if not self._raw.in_transaction and not sql.lstrip()[:9].upper().startswith(_NO_IMPLICIT_TX):
+            self._raw.execute("BEGIN")
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.001
+        while True:
+            try:
+                return fn()
+            except sqlite3.OperationalError as e:
+                # shared-cache table locks don't go through the busy handler: wait here instead
+                if _is_lock_error(str(e)) and time.monotonic() < deadline:
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.05)
+                    continue
+                raise _mysql_error(e, sql) from e
+            except sqlite3.Error as e:
+                raise _mysql_error(e, sql) from e
+
+
+# ---------- pool ----------
+class SqlitePool:
+    """Same interface as `entity.db_pool.DatabasePool`, backed by SQLite."""
+
+    def __init__(
+        self,
+        *,
+        size: int = 5,
+        checkout_timeout: float = 10.0,
+        database: str = ":memory:",
+        schema: Optional[str] = SCHEMA_PATH,
+        lock_timeout: float = 5.0,
+        migrate: bool = True,
+    ):
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.lock_timeout = lock_timeout
+        if database == ":memory:":
+            self._target, self._uri = f"file:sixseven-{uuid.uuid4().hex}?mode=memory&cache=shared", True
+        else:
+            self._target, self._uri = database, False
+        # keeps an in-memory database alive while connections come and go
+        self._anchor = self._connect()
+        if schema:
+            with open(schema, encoding="utf-8") as f:
+                self._anchor._raw.executescript(f.read())
+            if migrate:
+                from entity.migration_runner import MigrationRunner
+
+                MigrationRunner(self._anchor).upgrade()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[SqliteConnection] = []
+        self.in_use = 0
+
+    def _connect(self) -> SqliteConnection:
+        raw = sqlite3.connect(
+            self._target,
+            uri=self._uri,
+            timeout=self.lock_timeout,
+            isolation_level=None,  # transactions are opened by SqliteConnection, MySQL style
+            check_same_thread=False,
+        )
+        raw.execute("PRAGMA foreign_keys = ON")
+        if not self._uri:
+            raw.execute("PRAGMA journal_mode = WAL")
+        raw.create_function("NOW", 0, _now)
+        raw.create_function("CURDATE", 0, _curdate)
+        raw.create_function("TIMESTAMPDIFF", 3, _timestampdiff, deterministic=True)
+        raw.create_function("GREATEST", -1, _greatest, deterministic=True)
+        raw.create_function("LEAST", -1, _least, deterministic=True)
+        raw.create_function("ft_match", -1, _ft_match, deterministic=True)
+        return SqliteConnection(raw, lock_timeout=self.lock_timeout)
+
+    # ---------- checkout / return ----------
+    def acquire(self) -> SqliteConnection:
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise errors.PoolError("Timed out waiting for a free database connection")
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+        return conn
+
+    def release(self, conn: SqliteConnection) -> None:
+        try:
+            conn.rollback()
+            with self._lock:
+                self._idle.append(conn)
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[SqliteConnection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": self.size, "in_use": self.in_use, "idle": self.size - self.in_use}
+
+    def close(self) -> None:
+        """Close every idle connection; an in-memory database is gone after this."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        self._anchor.close()
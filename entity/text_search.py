@@ -0,0 +1,52 @@
+# entity/text_search.py
+"""
+Keyword search over request title/description.
+
+Searches use the FULLTEXT index `ft_request_text (title, description)` in
+BOOLEAN MODE, so every term must match (as a prefix) and results can be ranked
+by relevance. Terms shorter than InnoDB's `innodb_ft_min_token_size` are never
+indexed; a keyword made only of such terms falls back to a LIKE scan.
+"""
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+MIN_TOKEN_LEN = 3  # innodb_ft_min_token_size default
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class TextSearch:
+    def __init__(self, keyword: Optional[str], columns: Sequence[str] = ("r.title", "r.description")):
+        self.keyword = (keyword or "").strip()
+        self.columns = tuple(columns)
+        self.boolean_query = self._to_boolean_query(self.keyword)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.keyword)
+
+    @property
+    def uses_index(self) -> bool:
+        return self.boolean_query is not None
+
+    def where(self) -> Tuple[str, List[Any]]:
+        """SQL predicate (without a leading AND) plus its params; ("", []) when there is no keyword."""
+        if not self.active:
+            return "", []
+        if self.uses_index:
+            return f"MATCH({', '.join(self.columns)}) AGAINST (%s IN BOOLEAN MODE)", [self.boolean_query]
+        like = f"%{self.keyword}%"
+        return "(" + " OR ".join(f"{c} LIKE %s" for c in self.columns) + ")", [like] * len(self.columns)
+
+    def relevance(self) -> Optional[Tuple[str, List[Any]]]:
+        """ORDER BY expression ranking rows by relevance, or None if results can't be ranked."""
+        if not self.uses_index:
+            return None
+        return f"MATCH({', '.join(self.columns)}) AGAINST (%s IN BOOLEAN MODE) DESC", [self.boolean_query]
+
+    @staticmethod
+    def _to_boolean_query(keyword: str) -> Optional[str]:
+        tokens = [t for t in _TOKEN_RE.findall(keyword.lower()) if len(t) >= MIN_TOKEN_LEN]
+        if not tokens:
+            return None
+        # +term* : every term required, prefix match ("transp" finds "transport")
+        return " ".join(f"+{t}*" for t in dict.fromkeys(tokens))
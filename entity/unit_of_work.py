@@ -0,0 +1,162 @@
+# entity/unit_of_work.py
+"""
+Unit of work: group several repository writes into one transaction.
+
+Repositories end their writes with `commit(self.db)` instead of
+`self.db.commit()`. Outside a unit of work that commits as before; inside
+`with UnitOfWork(db):` it does nothing, and the block commits once at the
+end or rolls back on an exception. A nested `UnitOfWork` on the same
+connection (or `uow.savepoint()`) becomes a SAVEPOINT, so an inner step can
+fail and roll back alone.
+
+Side effects that must only happen once the data is visible (cache
+invalidation) go through `after_commit(db, fn, *args)`; they are dropped if
+the transaction rolls back.
+
+`run_in_transaction(db, fn)` runs `fn(uow)` in a unit of work and retries the
+whole thing on deadlock or lock-wait timeout, which InnoDB resolves by
+rolling back one of the transactions.
+"""
+from __future__ import annotations
+
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Tuple
+
+from mysql.connector import errorcode
+
+RETRYABLE_ERRNOS = frozenset({errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT})  # 1213, 1205
+
+_active: ContextVar[Optional["UnitOfWork"]] = ContextVar("unit_of_work", default=None)
+
+
+class UnitOfWork:
+    def __init__(self, db):
+        self.db = db
+        self._parent: Optional[UnitOfWork] = None
+        self._root: UnitOfWork = self
+        self._savepoint: Optional[str] = None
+        self._savepoints = 0
+        self._after_commit: List[Tuple[Callable, tuple]] = []
+        self._rollback_only = False
+        self._token = None
+
+    def __enter__(self) -> "UnitOfWork":
+        self._parent = _active.get()
+        outer = _find(self.db)
+        if outer is not None:
+            self._root = outer._root
+            self._root._savepoints += 1
+            self._savepoint = f"uow_sp_{self._root._savepoints}"
+            self._execute(f"SAVEPOINT {self._savepoint}")
+        else:
+            if self.db.in_transaction:
+                self.db.commit()  # end the implicit read snapshot so the unit of work sees current data
+            self.db.start_transaction()
+        self._token = _active.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _active.reset(self._token)
+        failed = exc_type is not None or self._rollback_only
+        if self._savepoint is not None:
+            if failed:
+                # after a deadlock InnoDB has already rolled back the whole transaction, savepoints included
+                if not (exc is not None and is_retryable(exc)):
+                    self._execute(f"ROLLBACK TO SAVEPOINT {self._savepoint}")
+            else:
+                self._execute(f"RELEASE SAVEPOINT {self._savepoint}")
+                self._parent_on(self.db)._after_commit.extend(self._after_commit)
+            return False
+        if failed:
+            self.db.rollback()
+            return False
+        self.db.commit()
+        for fn, args in self._after_commit:
+            fn(*args)
+        return False
+
+    def savepoint(self) -> "UnitOfWork":
+        """`with uow.savepoint():` - a nested step that can roll back on its own."""
+        return UnitOfWork(self.db)
+
+    def rollback_only(self) -> None:
+        """Roll this unit of work (or savepoint) back on exit without raising."""
+        self._rollback_only = True
+
+    def _parent_on(self, db) -> "UnitOfWork":
+        uow = self._parent
+        while uow is not None and uow.db is not db:
+            uow = uow._parent
+        return uow
+
+    def _execute(self, sql: str) -> None:
+        cur = self.db.cursor()
+        try:
+            cur.execute(sql)
+        finally:
+            cur.close()
+
+
+def _find(db) -> Optional[UnitOfWork]:
+    uow = _active.get()
+    while uow is not None and uow.db is not db:
+        uow = uow._parent
+    return uow
+
+
+# ---------- helpers for repositories ----------
+def in_unit_of_work(db) -> bool:
+    return _find(db) is not None
+
+
+def begin(db) -> None:
+    """Explicit transaction for a single repository method; a no-op inside a unit of work."""
+    if _find(db) is None:
+        if db.in_transaction:
+            db.commit()  # an implicit read transaction would make start_transaction() fail
+        db.start_transaction()
+
+
+def commit(db) -> None:
+    if _find(db) is None:
+        db.commit()
+
+
+def rollback(db) -> None:
+    # inside a unit of work the caller re-raises and the unit of work rolls back as a whole
+    if _find(db) is None:
+        db.rollback()
+
+
+def after_commit(db, fn: Callable, *args: Any) -> None:
+    uow = _find(db)
+    if uow is None:
+        fn(*args)
+    else:
+        uow._after_commit.append((fn, args))
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return getattr(exc, "errno", None) in RETRYABLE_ERRNOS
+
+
+def run_in_transaction(db, fn: Callable[[UnitOfWork], Any], *, retries: int = 3, backoff: float = 0.05) -> Any:
+    """
+    Run `fn(uow)` in one transaction, retrying on deadlock / lock-wait timeout.
+    Nested inside another unit of work it runs as a savepoint without retries:
+    the deadlock already rolled back the outer transaction, so only the
+    outermost caller can retry.
+    """
+    if _find(db) is not None:
+        with UnitOfWork(db) as uow:
+            return fn(uow)
+    for attempt in range(retries + 1):
+        try:
+            with UnitOfWork(db) as uow:
+                return fn(uow)
+        except Exception as e:
+            if not is_retryable(e) or attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
@@ -15,14 +15,17 @@
 
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from flask import current_app
+from entity import cache_version
+from entity.db_pool import get_db
+from entity.unit_of_work import after_commit, commit, rollback
+from entity.report_rollup_repository import ReportRollupRepository
+from entity.request_cache import invalidate_all_requests
 from entity.user import UserProfile, UserAccount
 
 
 class UserRepository:
-    def __init__(self):
-        db = current_app.config["DB"]
-        self.db = db
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_db()
 
     # ---------- Auth ----------
     def get_user_by_credentials(self, username: str, password: str, role: str) -> Optional[UserProfile]:
@@ -69,7 +72,7 @@ class UserRepository:
                 VALUES (%s, %s, %s, %s)
             """
             cursor.execute(sql, (username, password, role, username))
-            self.db.commit()
+            commit(self.db)
 
             user_id = cursor.lastrowid
             cursor.close()
@@ -121,7 +124,7 @@ class UserRepository:
                     WHERE user_id = %s
                 """
                 cursor.execute(sql, (username, role, user_id))
-            self.db.commit()
+            commit(self.db)
             cursor.close()
             return {"success": True, "updated_user_id": user_id}
         except Exception as e:
@@ -130,14 +133,41 @@ class UserRepository:
     def delete_user(self, user_id):
         """Delete a user."""
         try:
-            cursor = self.db.cursor()
-            cursor.execute("DELETE FROM user WHERE user_id = %s", (user_id,))
-            self.db.commit()
-            cursor.close()
+            self._delete_user_row(user_id)
             return {"success": True, "deleted_user_id": user_id}
         except Exception as e:
             raise Exception(f"Error deleting user: {e}")
 
+    def _delete_user_row(self, user_id):
+        """
+        Delete the user row. Their requests (with views and shortlists) and their own
+        shortlist entries go with it (ON DELETE CASCADE), so the report days holding
+        those events are flagged for the rollup first, and the shortlist_count of every
+        request they shortlisted is decremented, in the same transaction.
+        """
+        cursor = self.db.cursor()
+        try:
+            ReportRollupRepository.mark_requests_dirty(cursor, "r.pin_user_id = %s", (user_id,))
+            ReportRollupRepository.mark_shortlists_dirty(cursor, "s.csr_user_id = %s", (user_id,))
+            # a subquery rather than UPDATE ... JOIN so the statement also runs on the SQLite backend
+            cursor.execute(
+                """
+                UPDATE request
+                SET shortlist_count = GREATEST(COALESCE(shortlist_count, 0) - 1, 0), updated_at = updated_at
+                WHERE request_id IN (SELECT request_id FROM shortlist WHERE csr_user_id = %s)
+                """,
+                (user_id,),
+            )
+            cursor.execute("DELETE FROM user WHERE user_id = %s", (user_id,))
+            commit(self.db)
+        except Exception:
+            rollback(self.db)
+            raise
+        finally:
+            cursor.close()
+        cache_version.bump(self.db, cache_version.REQUESTS)
+        after_commit(self.db, invalidate_all_requests)
+
     def search_users(self, keyword):
         """Search for users by username or role."""
         try:
@@ -167,7 +197,7 @@ class UserRepository:
                 VALUES (%s, %s, %s, %s)
             """
             cursor.execute(sql, (username, full_name, email, password))
-            self.db.commit()
+            commit(self.db)
             profile_id = cursor.lastrowid
             cursor.close()
             return {
@@ -205,7 +235,7 @@ class UserRepository:
                 WHERE user_Id = %s
             """
             cursor.execute(sql, (full_name, email, profile_id))
-            self.db.commit()
+            commit(self.db)
             cursor.close()
             return {"success": True, "updated_profile_id": profile_id}
         except Exception as e:
@@ -214,10 +244,7 @@ class UserRepository:
     def delete_profile(self, profile_id):
         """Delete a user profile."""
         try:
-            cursor = self.db.cursor()
-            cursor.execute("DELETE FROM user WHERE user_id = %s", (profile_id,))
-            self.db.commit()
-            cursor.close()
+            self._delete_user_row(profile_id)
             return {"success": True, "deleted_profile_id": profile_id}
         except Exception as e:
             raise Exception(f"Error deleting profile: {e}")
@@ -0,0 +1,156 @@
+# entity/view_event_sink.py
+"""
+Write-behind buffer for request view events.
+
+`ReadRequestController` records a view on every detail read. Instead of an
+INSERT + COMMIT inside the request, the sink queues the event and a background
+thread writes batches through `RequestViewRepository.save_views`, either when
+`batch_size` events are waiting or every `flush_interval` seconds.
+"""
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, current_app
+
+from entity.db_pool import DatabasePool
+from entity.request_view_repository import RequestViewRepository
+
+
+class ViewEventSink:
+    def __init__(
+        self,
+        pool: DatabasePool,
+        *,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+    ):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Tuple[int, datetime]]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # orphaned: views of requests deleted before their batch was written
+        self._counters = {"accepted": 0, "dropped": 0, "flushed": 0, "failed": 0, "orphaned": 0, "batches": 0}
+        self._counters_lock = threading.Lock()
+
+    # ---------- producer side ----------
+    def save_view(self, request_id: int, timestamp: datetime) -> bool:
+        """
+        Queue a view without blocking. Same call shape as RequestViewRepository.save_view,
+        so controllers can use either. Returns False if the buffer was full and the
+        event was dropped.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((request_id, timestamp))
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("accepted")
+        return True
+
+    # ---------- consumer side ----------
+    def flush(self) -> int:
+        """Write everything currently buffered. Returns the number of events flushed."""
+        total = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    return total
+                total += self._write(batch)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the writer thread and flush whatever is left (called at shutdown)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._counters_lock:
+            data = dict(self._counters)
+        data["queued"] = self._queue.qsize()
+        return data
+
+    # ---------- internals ----------
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="view-event-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            # Give the batch up to flush_interval to fill before writing it
+            self._stop.wait(self.flush_interval if self._queue.qsize() < self.batch_size else 0)
+            with self._flush_lock:
+                batch = [first] + self._drain(self.batch_size - 1)
+                self._write(batch)
+
+    def _drain(self, limit: int) -> List[Tuple[int, datetime]]:
+        batch: List[Tuple[int, datetime]] = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Tuple[int, datetime]]) -> int:
+        try:
+            with self.pool.connection() as conn:
+                written = RequestViewRepository(conn).save_views(batch)
+        except Exception as e:
+            print("view sink flush failed:", e)
+            self._count("failed", len(batch))
+            return 0
+        self._count("flushed", written)
+        self._count("orphaned", len(batch) - written)
+        self._count("batches")
+        return written
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._counters_lock:
+            self._counters[name] += n
+
+
+# ---------- Flask integration ----------
+def init_app(app: Flask) -> ViewEventSink:
+    """
+    Create the app's sink from VIEW_SINK_BATCH_SIZE / VIEW_SINK_FLUSH_INTERVAL /
+    VIEW_SINK_MAX_QUEUE. Must run after db_pool.init_app.
+    """
+    app.config.setdefault("VIEW_SINK_BATCH_SIZE", 500)
+    app.config.setdefault("VIEW_SINK_FLUSH_INTERVAL", 1.0)
+    app.config.setdefault("VIEW_SINK_MAX_QUEUE", 10000)
+
+    sink = ViewEventSink(
+        app.extensions["db_pool"],
+        batch_size=int(app.config["VIEW_SINK_BATCH_SIZE"]),
+        flush_interval=float(app.config["VIEW_SINK_FLUSH_INTERVAL"]),
+        max_queue=int(app.config["VIEW_SINK_MAX_QUEUE"]),
+    )
+    app.extensions["view_sink"] = sink
+    atexit.register(sink.close)
+    return sink
+
+
+def get_view_sink(app: Optional[Flask] = None) -> ViewEventSink:
+    app = app or current_app
+    return app.extensions["view_sink"]
@@ -0,0 +1,43 @@
+"""
+Composite and covering indexes for the hot reads.
+
+- active feed: status IN (...) ORDER BY created_at          -> (status, created_at)
+- "my requests": pin_user_id = ? ORDER BY created_at        -> (pin_user_id, created_at)
+- past matches: <user> = ? AND status = ? ORDER BY completion_date
+                                   -> (pin_user_id | csr_user_id, status, completion_date)
+- report rollup rebuild: range on viewed_at / added_at, reading only the
+  grouped columns                  -> (viewed_at, request_id), (added_at, request_id, csr_user_id)
+
+The single-column indexes on request.pin_user_id, request.status and
+match.pin_user_id are left-prefixes of the new ones, so they are dropped
+(the new indexes also serve the foreign keys).
+"""
+
+NEW_INDEXES = (
+    ("idx_request_status_created", "request", ("status", "created_at")),
+    ("idx_request_pin_created", "request", ("pin_user_id", "created_at")),
+    ("idx_match_pin_status_completed", "match", ("pin_user_id", "status", "completion_date")),
+    ("idx_match_csr_status_completed", "match", ("csr_user_id", "status", "completion_date")),
+    ("idx_request_view_viewed_at", "request_view", ("viewed_at", "request_id")),
+    ("idx_shortlist_added_at", "shortlist", ("added_at", "request_id", "csr_user_id")),
+)
+
+REDUNDANT_INDEXES = (
+    ("idx_pin_requests_pin_user", "request", ("pin_user_id",)),
+    ("idx_pin_requests_status", "request", ("status",)),
+    ("pin_user_id", "match", ("pin_user_id",)),
+)
+
+
+def up(runner):
+    for name, table, columns in NEW_INDEXES:
+        runner.create_index(name, table, columns)
+    for name, table, _ in REDUNDANT_INDEXES:
+        runner.drop_index(name, table)
+
+
+def down(runner):
+    for name, table, columns in REDUNDANT_INDEXES:
+        runner.create_index(name, table, columns)
+    for name, table, _ in reversed(NEW_INDEXES):
+        runner.drop_index(name, table)
@@ -0,0 +1,21 @@
+"""
+FULLTEXT index for request keyword search (entity/text_search.py).
+
+MySQL only: the SQLite backend answers MATCH ... AGAINST with its ft_match()
+function and needs no index. Skipped when refinedModel.sql already created it,
+and then `down` leaves it in place too.
+"""
+
+NAME = "ft_request_text"
+
+
+def up(runner):
+    if runner.dialect == "sqlite" or runner.has_index(NAME, "request"):
+        return
+    runner.execute(f"CREATE FULLTEXT INDEX `{NAME}` ON `request` (`title`, `description`)")
+    runner.record(NAME)
+
+
+def down(runner):
+    if runner.created(NAME):
+        runner.drop_index(NAME, "request")
@@ -0,0 +1,23 @@
+"""
+Shared change counters behind the category cache and the list ETags
+(entity/cache_version.py).
+"""
+
+
+def up(runner):
+    if runner.has_table("cache_version"):  # refinedModel.sql creates it now
+        return
+    runner.execute(
+        """
+        CREATE TABLE `cache_version` (
+          `name` VARCHAR(50) NOT NULL PRIMARY KEY,
+          `version` BIGINT NOT NULL DEFAULT 0
+        )
+        """
+    )
+    runner.record("cache_version")
+
+
+def down(runner):
+    if runner.created("cache_version"):
+        runner.execute("DROP TABLE `cache_version`")
@@ -0,0 +1,57 @@
+"""
+Daily report rollup tables (entity/report_rollup_repository.py).
+
+The watermark row starts at NULL, so the first report refresh after this
+migration aggregates every existing day. Tables refinedModel.sql already
+created are left alone, by `up` and by `down`.
+"""
+
+TABLES = {
+    "report_daily_rollup": """
+    CREATE TABLE `report_daily_rollup` (
+      `day` DATE NOT NULL,
+      `category_id` INT NOT NULL DEFAULT 0,
+      `location` VARCHAR(75) NOT NULL,
+      `status` VARCHAR(20) NOT NULL,
+      `created` INT NOT NULL DEFAULT 0,
+      `views` INT NOT NULL DEFAULT 0,
+      `shortlists` INT NOT NULL DEFAULT 0,
+      `matches_created` INT NOT NULL DEFAULT 0,
+      `completed` INT NOT NULL DEFAULT 0,
+      `completion_seconds` BIGINT NOT NULL DEFAULT 0,
+      PRIMARY KEY (`day`, `category_id`, `location`, `status`)
+    )
+    """,
+    "report_daily_csr": """
+    CREATE TABLE `report_daily_csr` (
+      `day` DATE NOT NULL,
+      `csr_user_id` INT NOT NULL,
+      PRIMARY KEY (`day`, `csr_user_id`)
+    )
+    """,
+    "report_rollup_dirty": """
+    CREATE TABLE `report_rollup_dirty` (
+      `day` DATE NOT NULL PRIMARY KEY
+    )
+    """,
+    "report_rollup_state": """
+    CREATE TABLE `report_rollup_state` (
+      `id` TINYINT NOT NULL PRIMARY KEY,
+      `refreshed_at` DATETIME NULL DEFAULT NULL
+    )
+    """,
+}
+
+
+def up(runner):
+    for table, ddl in TABLES.items():
+        if not runner.has_table(table):
+            runner.execute(ddl)
+            runner.record(table)
+    runner.execute("INSERT IGNORE INTO `report_rollup_state` (`id`, `refreshed_at`) VALUES (1, NULL)")
+
+
+def down(runner):
+    for table in reversed(list(TABLES)):
+        if runner.created(table):
+            runner.execute(f"DROP TABLE `{table}`")
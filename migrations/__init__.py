@@ -0,0 +1,7 @@
+"""
+Schema migrations applied on top of refinedModel.sql / sqliteModel.sql.
+
+Each `NNNN_name.py` module defines `up(runner)` and `down(runner)`; see
+entity/migration_runner.py. Run them with `flask --app app migrate`.
+Versions are never reused: 0002 (a no-op match status rewrite) was retired.
+"""
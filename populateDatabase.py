@@ -1,74 +1,43 @@
 # WARNING: RUNNING THIS FILE CLEARS DATABASE
+"""
+Bulk test-data generator.
+
+    python populateDatabase.py                      # 200 requests, 100 users (the classic dataset)
+    python populateDatabase.py --scale 1000 --workers 8
+
+Rows are generated in chunks of requests. Every chunk has its own seed derived
+from --seed, so the same seed and scale produce the same data whatever the
+number of workers (timestamps are relative to the day it runs). Chunks can be
+generated by a process pool (Faker is the slow part) while the main process
+writes the previous chunk with multi-row INSERTs, committing once per batch.
+"""
+import argparse
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Sequence, Tuple
 
-from typing import Optional
 import mysql.connector
-import random 
 from faker import Faker
-from datetime import datetime, timedelta
-import sys
-#Config
-tables_to_truncate = ['user', 'service_category', 'request', 'shortlist', "request_view", "match"]
-data_count = dict.fromkeys(tables_to_truncate, 0)
-number_of_request_to_generate = 200
-
-fake = Faker()
-
-db = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="password",
-    database="SixSeven"
-)
-
-cur = db.cursor()
-cur.execute("SET FOREIGN_KEY_CHECKS = 0") 
 
-for t in tables_to_truncate:
-    cur.execute(f"TRUNCATE TABLE `{t}`") 
-
-cur.execute("SET FOREIGN_KEY_CHECKS = 1") 
-db.commit()
-cur.close()
-
-def random_datetime_this_year(furthest_day = 30):
-    now = datetime.now()
-    start = now - timedelta(days=furthest_day)
-    created = fake.date_time_between(start_date=start, end_date=now)
-    # updated_at strictly after created_at by 1 minute to 60 days
-    delta = timedelta(
-        minutes=random.randint(1, 60),
-    ) + timedelta(days=random.randint(0, 60))
-    updated = min(created + delta, now)
-    if updated <= created:
-        updated = created + timedelta(minutes=1)
-    return created, updated
-
-# POPULATE: USER DATA
-def create_user(password, email, username, role, created_at, fullname=None):
-        """Insert new user into DB."""
-        try:
-            if fullname:
-                fullname = username
-            cursor = db.cursor()
-            sql = """
-                INSERT INTO user (password, email, username, role, full_name, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(sql, (password, email, username, role, fullname, created_at))
-            db.commit()
+# Config
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "password",
+    "database": "SixSeven",
+}
+tables_to_truncate = ['user', 'service_category', 'request', 'shortlist', "request_view", "match",
+                      "report_daily_rollup", "report_daily_csr", "report_rollup_dirty"]
+REQUESTS_PER_SCALE = 200
+USERS_PER_SCALE = 100
+CHUNK_SIZE = 1000            # requests generated per task
+BATCH_SIZE = 5000            # rows per INSERT / commit
+MAX_SHORTLISTS_PER_REQUEST = 25
+MAX_VIEWS_PER_REQUEST = 100
 
-            user_id = cursor.lastrowid
-            cursor.close()
-
-            return {
-                "id": user_id,
-                "username": username,
-                "role": role,
-                "full_name": fullname,
-            }
-        except Exception as e:
-            raise Exception(f"Error creating user: {e}")
-        
 users_to_create = [('1','admin@email.c','SystemAdmin','Admin','2025-10-20 04:04:41'),
                    ('11','csr@email.com','CSR','Csr_Rep','2025-10-20 04:04:41'),
                    ('pin123','pin@email.com','pin01','PIN_Support','2025-10-20 04:04:41'),
@@ -76,45 +45,6 @@ users_to_create = [('1','admin@email.c','SystemAdmin','Admin','2025-10-20 04:04:
                    ('1', None, 'ganbf','Admin','2025-10-20 11:26:35')]
 
 roles = ['Csr_Rep','PIN_Support']
-for i in range(100):
-    username = fake.unique.user_name()[:50]
-    email = fake.unique.ascii_email()[:100]  
-    # password = fake.password(length=12)[:255] 
-    password = 'password' 
-    role = random.choice(roles)  
-    full_name = fake.name()[:100]
-    created_at, updated_at = random_datetime_this_year(40)
-    users_to_create.append((password, email, username, role, created_at, full_name))
-
-user_by_role = {
-     'Admin': [], 'Csr_Rep': [], 'PIN_Support': [], 'Platform_Manager': []
-}
-
-for user in users_to_create:
-    data = create_user(*user)
-    print("Created user:", data)
-    user_by_role[data['role']].append(data)
-
-# POPULATE: CATEGORY DATA
-def create_category(id, name):
-        try:
-            cursor = db.cursor()
-            sql = """
-                INSERT INTO service_category (category_id, category_name)
-                VALUES (%s, %s)
-            """
-            cursor.execute(sql, (id, name))
-            db.commit()
-
-            id = cursor.lastrowid
-            cursor.close()
-
-            return {
-                "id": id,
-                "category_name": name,
-            }
-        except Exception as e:
-            raise Exception(f"Error creating user: {e}")
 
 # AVOID CHANGING THANKS :)
 category = ['Climate Action and Energy', 'Education and Scholarships'
@@ -122,102 +52,7 @@ category = ['Climate Action and Energy', 'Education and Scholarships'
                       , 'Digital Inclusion', 'Emergency Support'
                       , 'Hunger Relief', 'Fundraising', 'Arts and Culture']
 
-for index in range(len(category)):
-    print("Created category:", create_category(index+1, category[index]))
-
-# POPULATE: REQUEST DATA
-def create_request(pin_user_id, title, description
-                   , category_id, status, created_at
-                   , updated_at, view_count, location):
-        try:
-            cursor = db.cursor()
-            sql = """
-                INSERT INTO request (pin_user_id, title, description, category_id
-                , status, created_at, updated_at
-                , view_count, location)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(sql, (pin_user_id, title, description, category_id
-                , status, created_at, updated_at
-                , view_count, location))
-            db.commit()
-
-            id = cursor.lastrowid
-            cursor.close()
-
-            return {
-                'id': id, 'pin_user_id': pin_user_id,'title': title
-                ,'description': description,'status': status
-                ,'created_at': created_at,'updated_at': updated_at
-                ,'view_count': view_count,'category_id': category_id
-                ,'location': location}
-        except Exception as e:
-            raise Exception(f"Error creating user: {e}")
-        
-def save_shortlist(csr_id: int, request_id: int, added_at: datetime) -> None:
-        cur = db.cursor()
-        try:
-            cur.execute(
-                "INSERT INTO shortlist (csr_user_id, request_id, added_at) VALUES (%s, %s, %s)",
-                (csr_id, request_id, added_at)
-            )
-            db.commit()
-        finally:
-            cur.close()
-
-def save_view(request_id: int, timestamp: datetime) -> None:
-            cur = db.cursor()
-            try:
-                cur.execute(
-                    "INSERT INTO request_view (request_id, viewed_at) VALUES (%s, %s)",
-                    (request_id, timestamp)
-                )
-                db.commit()
-            finally:
-                cur.close()
-
-def ensure_completed_match(
-    request_id: int,
-    pin_user_id: int,
-    csr_user_id: int,
-    service_date: datetime,
-    completion_date: datetime
-):
-
-    cur3 = db.cursor()
-    try:
-        cur3.execute(
-            """
-            INSERT INTO `match`
-                (request_id, csr_user_id, pin_user_id, service_date, completion_date, status)
-            VALUES
-                (%s, %s, %s, %s, %s, 'Completed')
-            """,
-            (request_id, csr_user_id, pin_user_id, service_date, completion_date),
-        )  
-        
-        
-        new_id = cur3.lastrowid
-        db.commit()
-        return new_id
-    except Exception as e:
-        print("error:", e)
-    finally:
-        cur3.close()
-
-
-def make_title(cat_id, idx):
-    # Make a descriptive title that clearly matches the category
-    base = category[cat_id-1]
-    return f"{base} Request #{idx:03d}"
-
-def make_description(cat_id):
-    # Short themed description by category
-    theme = category[cat_id-1]
-    return fake.sentence(nb_words=10) + f" Related to {theme.lower()}."
-        
 statuses = ['Open', 'In Progress', 'Cancelled', 'Completed']
-statuses_weight = [30, 30, 10, 50]
 
 locations = ["Orchard", "Outram Park", "Dhoby Ghaut"
              , "City Hall", "Raffles Place", "Marina Bay"
@@ -226,36 +61,198 @@ locations = ["Orchard", "Outram Park", "Dhoby Ghaut"
              , "Clementi", "Buona Vista", "Holland Village", "Chinatown"
              , "Little India", "HarbourFront"]
 
-csr_count = int(len(user_by_role['Csr_Rep'])/2)
-for i in range(number_of_request_to_generate):
-    percent = int((i / number_of_request_to_generate) * 100)
-    steps = percent // 5
-    bar = "=" * steps + " " * (20 - steps)
-    sys.stdout.write("\rProgress: [%-20s] %3d%% (%d/%d)\n\n" % (bar, percent, i, number_of_request_to_generate))
-    sys.stdout.flush()
-
-    cat_id = random.randint(1,10)
-    title = make_title(cat_id, i)
-    description = make_description(cat_id)
-    status = random.choice(statuses)
-    created_at, updated_at = random_datetime_this_year(35)
-    pin_id = random.choice(user_by_role['PIN_Support'])['id']
-    location = random.choice(locations)
-    request = create_request(pin_id, title, description
-                   , cat_id, status, created_at
-                   , updated_at, random.randint(1, 1000), location)
-    
-    # Select afew random CSR to shortlist.  Randomly choose number of CSR to save (0 to len(csr)/2)
-    for csr in random.sample(user_by_role['Csr_Rep'], k = random.randint(0,csr_count)):
-        save_shortlist(csr['id'], i+1, random_datetime_this_year(35)[0])
-    
-    for j in range(random.randint(0,100)):
-        save_view(i+1, random_datetime_this_year(35)[0])
-
-    if status == 'Completed':
-        service_date, completion_date = random_datetime_this_year(35)
-        ensure_completed_match(i+1, pin_id, random.choice(user_by_role['Csr_Rep'])['id'], service_date, completion_date)
-    print("Created Request:", request)
-
-
-db.close()
\ No newline at end of file
+INSERTS = {
+    "user": "INSERT INTO user (user_id, password, email, username, role, full_name, created_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+    "request": "INSERT INTO request (request_id, pin_user_id, title, description, category_id, status, "
+               "created_at, updated_at, view_count, shortlist_count, location) "
+               "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+    "shortlist": "INSERT INTO shortlist (csr_user_id, request_id, added_at) VALUES (%s, %s, %s)",
+    "request_view": "INSERT INTO request_view (request_id, viewed_at) VALUES (%s, %s)",
+    "match": "INSERT INTO `match` (request_id, csr_user_id, pin_user_id, service_date, completion_date, status) "
+             "VALUES (%s, %s, %s, %s, %s, 'Completed')",
+}
+
+
+def random_datetime_this_year(rng: random.Random, now: datetime, furthest_day=30) -> Tuple[datetime, datetime]:
+    created = now - timedelta(seconds=rng.randrange(furthest_day * 86400))
+    # updated_at strictly after created_at by 1 minute to 60 days
+    delta = timedelta(minutes=rng.randint(1, 60)) + timedelta(days=rng.randint(0, 60))
+    updated = min(created + delta, now)
+    if updated <= created:
+        updated = created + timedelta(minutes=1)
+    return created.replace(microsecond=0), updated.replace(microsecond=0)
+
+
+def _chunk_seed(seed: int, kind: str, first_id: int) -> str:
+    # str seeds hash deterministically in random.Random (unlike hash(), which is salted per process)
+    return f"{seed}:{kind}:{first_id}"
+
+
+# Id pools shared by every request chunk; set once per worker instead of pickled into each task
+_PINS: List[int] = []
+_CSRS: List[int] = []
+
+
+def _init_worker(pins: List[int], csrs: List[int]) -> None:
+    global _PINS, _CSRS
+    _PINS, _CSRS = pins, csrs
+
+
+# ---------- generation (runs in worker processes) ----------
+def generate_users(task) -> List[tuple]:
+    """Users [first_id, first_id + count) with generated names; usernames/emails carry the id so they stay unique."""
+    seed, first_id, count, now = task
+    rng = random.Random(_chunk_seed(seed, "user", first_id))
+    fake = Faker()
+    fake.seed_instance(rng.random())
+    rows = []
+    for user_id in range(first_id, first_id + count):
+        created_at, _ = random_datetime_this_year(rng, now, 40)
+        rows.append((
+            user_id, 'password', f"{user_id}.{fake.ascii_email()}"[:100], f"{fake.user_name()}{user_id}"[:50],
+            rng.choice(roles), fake.name()[:100], created_at,
+        ))
+    return rows
+
+
+def generate_requests(task) -> Dict[str, List[tuple]]:
+    """Requests [first_id, first_id + count) plus their shortlists, views and completed matches."""
+    seed, first_id, count, now = task
+    pins, csrs = _PINS, _CSRS
+    rng = random.Random(_chunk_seed(seed, "request", first_id))
+    fake = Faker()
+    fake.seed_instance(rng.random())
+    csr_count = min(len(csrs) // 2, MAX_SHORTLISTS_PER_REQUEST)
+    out = {"request": [], "shortlist": [], "request_view": [], "match": []}
+    for request_id in range(first_id, first_id + count):
+        cat_id = rng.randint(1, 10)
+        theme = category[cat_id - 1]
+        status = rng.choice(statuses)
+        created_at, updated_at = random_datetime_this_year(rng, now, 35)
+        pin_id = rng.choice(pins)
+
+        # Select a few random CSRs to shortlist (0 to half the CSRs, capped)
+        shortlisted = rng.sample(csrs, k=rng.randint(0, csr_count)) if csrs else []
+        for csr_id in shortlisted:
+            out["shortlist"].append((csr_id, request_id, random_datetime_this_year(rng, now, 35)[0]))
+
+        views = rng.randint(0, MAX_VIEWS_PER_REQUEST)
+        for _ in range(views):
+            out["request_view"].append((request_id, random_datetime_this_year(rng, now, 35)[0]))
+
+        if status == 'Completed' and csrs:
+            service_date, completion_date = random_datetime_this_year(rng, now, 35)
+            out["match"].append((request_id, rng.choice(csrs), pin_id, service_date, completion_date))
+
+        out["request"].append((
+            request_id, pin_id, f"{theme} Request #{request_id:03d}",
+            fake.sentence(nb_words=10) + f" Related to {theme.lower()}.",
+            cat_id, status, created_at, updated_at, views, len(shortlisted), rng.choice(locations),
+        ))
+    return out
+
+
+# ---------- loading ----------
+def insert_rows(db, table: str, rows: Sequence[tuple], batch_size: int) -> int:
+    # executemany rewrites INSERT ... VALUES into one multi-row statement per batch
+    cur = db.cursor()
+    try:
+        for i in range(0, len(rows), batch_size):
+            cur.executemany(INSERTS[table], rows[i:i + batch_size])
+            db.commit()
+    finally:
+        cur.close()
+    return len(rows)
+
+
+def _tasks(total: int, chunk: int, make) -> Iterator:
+    for first in range(1, total + 1, chunk):
+        yield make(first, min(chunk, total - first + 1))
+
+
+def _generate(workers: int, fn, tasks, initargs=((), ())):
+    _init_worker(*map(list, initargs))
+    if workers <= 1:
+        yield from map(fn, tasks)
+        return
+    # keep a bounded number of chunks in flight so generation can't outrun the inserts and fill memory
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(fn, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(description="Clear the database and fill it with generated test data.")
+    p.add_argument("--scale", type=float, default=1.0,
+                   help=f"multiplier: {REQUESTS_PER_SCALE} requests and {USERS_PER_SCALE} users per unit")
+    p.add_argument("--requests", type=int, help="exact number of requests (overrides --scale)")
+    p.add_argument("--users", type=int, help="exact number of generated users (overrides --scale)")
+    p.add_argument("--seed", type=int, default=67)
+    p.add_argument("--workers", type=int, default=1, help="processes generating rows (1 = inline)")
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = p.parse_args(argv)
+
+    n_requests = args.requests if args.requests is not None else int(REQUESTS_PER_SCALE * args.scale)
+    n_users = args.users if args.users is not None else max(2, int(USERS_PER_SCALE * args.scale))
+    now = datetime.now()
+    started = time.perf_counter()
+
+    db = mysql.connector.connect(**DB_CONFIG)
+    cur = db.cursor()
+    cur.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for t in tables_to_truncate:
+        cur.execute(f"TRUNCATE TABLE `{t}`")
+    # rows are consistent by construction; skip per-row checks while loading
+    cur.execute("SET UNIQUE_CHECKS = 0")
+    db.commit()
+
+    # POPULATE: CATEGORY DATA
+    cur.executemany("INSERT INTO service_category (category_id, category_name) VALUES (%s, %s)",
+                    [(i + 1, name) for i, name in enumerate(category)])
+    db.commit()
+    print(f"Created {len(category)} categories")
+
+    # POPULATE: USER DATA (fixed accounts first, so their ids stay 1..5)
+    fixed = [(i + 1, pw, email, username, role, None, created_at)
+             for i, (pw, email, username, role, created_at) in enumerate(users_to_create)]
+    insert_rows(db, "user", fixed, args.batch_size)
+    first_generated = len(fixed) + 1
+    user_by_role = {'Admin': [], 'Csr_Rep': [], 'PIN_Support': [], 'Platform_Manager': []}
+    for row in fixed:
+        user_by_role[row[4]].append(row[0])
+    user_tasks = _tasks(n_users, CHUNK_SIZE, lambda first, n: (args.seed, first_generated + first - 1, n, now))
+    for rows in _generate(args.workers, generate_users, user_tasks):
+        insert_rows(db, "user", rows, args.batch_size)
+        for row in rows:
+            user_by_role[row[4]].append(row[0])
+    print(f"Created {len(fixed) + n_users} users")
+
+    # POPULATE: REQUEST DATA (+ shortlists, views, completed matches)
+    totals = dict.fromkeys(("request", "shortlist", "request_view", "match"), 0)
+    pins, csrs = user_by_role['PIN_Support'], user_by_role['Csr_Rep']
+    request_tasks = _tasks(n_requests, CHUNK_SIZE, lambda first, n: (args.seed, first, n, now))
+    for chunk in _generate(args.workers, generate_requests, request_tasks, (pins, csrs)):
+        for table in ("request", "shortlist", "request_view", "match"):
+            totals[table] += insert_rows(db, table, chunk[table], args.batch_size)
+        print(f"Progress: {totals['request']}/{n_requests} requests "
+              f"({time.perf_counter() - started:.1f}s)", flush=True)
+
+    cur.execute("SET UNIQUE_CHECKS = 1")
+    cur.execute("SET FOREIGN_KEY_CHECKS = 1")
+    # The generated rows are back-dated, so the report rollups are rebuilt on the next report
+    cur.execute("UPDATE report_rollup_state SET refreshed_at = NULL WHERE id = 1")
+    db.commit()
+    cur.close()
+    db.close()
+
+    print(", ".join(f"{n} {t}" for t, n in totals.items()) + f" in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
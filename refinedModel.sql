@@ -70,6 +70,7 @@ CREATE TABLE IF NOT EXISTS `sixseven`.`request` (
   INDEX `idx_pin_requests_status` (`status` ASC) VISIBLE,
   INDEX `idx_pin_requests_created` (`created_at` ASC) VISIBLE,
   INDEX `category_id_fk_idx` (`category_id` ASC) VISIBLE,
+  FULLTEXT INDEX `ft_request_text` (`title`, `description`) VISIBLE,
   CONSTRAINT `pin_requests_ibfk_1`
     FOREIGN KEY (`pin_user_id`)
     REFERENCES `sixseven`.`user` (`user_id`)
@@ -168,6 +169,66 @@ DEFAULT CHARACTER SET = utf8mb4
 COLLATE = utf8mb4_0900_ai_ci;
 
 
+-- -----------------------------------------------------
+-- Table `sixseven`.`cache_version`
+-- Bumped on every write to a cached table so all app workers can invalidate.
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `sixseven`.`cache_version` (
+  `name` VARCHAR(50) NOT NULL,
+  `version` BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`name`))
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+
+-- -----------------------------------------------------
+-- Reporting rollups (see entity/report_rollup_repository.py)
+-- Dimensions are the request's current category/location/status; category_id 0 = none.
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `sixseven`.`report_daily_rollup` (
+  `day` DATE NOT NULL,
+  `category_id` INT NOT NULL DEFAULT 0,
+  `location` VARCHAR(75) NOT NULL,
+  `status` VARCHAR(20) NOT NULL,
+  `created` INT NOT NULL DEFAULT 0,
+  `views` INT NOT NULL DEFAULT 0,
+  `shortlists` INT NOT NULL DEFAULT 0,
+  `matches_created` INT NOT NULL DEFAULT 0,
+  `completed` INT NOT NULL DEFAULT 0,
+  `completion_seconds` BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`day`, `category_id`, `location`, `status`))
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `sixseven`.`report_daily_csr` (
+  `day` DATE NOT NULL,
+  `csr_user_id` INT NOT NULL,
+  PRIMARY KEY (`day`, `csr_user_id`))
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `sixseven`.`report_rollup_dirty` (
+  `day` DATE NOT NULL,
+  PRIMARY KEY (`day`))
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `sixseven`.`report_rollup_state` (
+  `id` TINYINT NOT NULL,
+  `refreshed_at` DATETIME NULL DEFAULT NULL,
+  PRIMARY KEY (`id`))
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+-- single watermark row; NULL = never refreshed (first refresh rebuilds everything)
+INSERT IGNORE INTO `sixseven`.`report_rollup_state` (`id`, `refreshed_at`) VALUES (1, NULL);
+
+
 SET SQL_MODE=@OLD_SQL_MODE;
 SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS;
 SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS;
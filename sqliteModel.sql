@@ -0,0 +1,127 @@
+-- SQLite version of refinedModel.sql, used by the in-memory backend (DB_BACKEND = "sqlite").
+-- Keep in step with refinedModel.sql. Differences:
+--   ENUMs are TEXT with a CHECK, text columns use NOCASE like the MySQL _ci collation,
+--   timestamps default to local time like a MySQL TIMESTAMP,
+--   `ON UPDATE CURRENT_TIMESTAMP` is a trigger on the content columns,
+--   the FULLTEXT index is replaced by the ft_match() function (entity/sqlite_backend.py).
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS `user` (
+  `user_id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `username` VARCHAR(50) NOT NULL COLLATE NOCASE UNIQUE,
+  `password` VARCHAR(255) NOT NULL,
+  `role` TEXT NOT NULL COLLATE NOCASE
+    CHECK (`role` IN ('Admin', 'Csr_Rep', 'PIN_Support', 'Platform_Manager')),
+  `email` VARCHAR(100) NULL DEFAULT NULL COLLATE NOCASE,
+  `full_name` VARCHAR(100) NULL DEFAULT NULL COLLATE NOCASE,
+  `created_at` TIMESTAMP NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS `service_category` (
+  `category_id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `category_name` VARCHAR(100) NOT NULL COLLATE NOCASE UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS `request` (
+  `request_id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `pin_user_id` INT NOT NULL REFERENCES `user` (`user_id`) ON DELETE CASCADE,
+  `title` VARCHAR(200) NOT NULL COLLATE NOCASE,
+  `description` TEXT NOT NULL COLLATE NOCASE,
+  `status` TEXT NULL DEFAULT 'Open' COLLATE NOCASE
+    CHECK (`status` IN ('Open', 'In Progress', 'Completed', 'Cancelled')),
+  `created_at` TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  `updated_at` TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  `view_count` INT NULL DEFAULT 0,
+  `shortlist_count` INT NULL DEFAULT 0,
+  `category_id` INT NULL REFERENCES `service_category` (`category_id`),
+  `location` VARCHAR(75) NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS `idx_pin_requests_pin_user` ON `request` (`pin_user_id`);
+CREATE INDEX IF NOT EXISTS `idx_pin_requests_status` ON `request` (`status`);
+CREATE INDEX IF NOT EXISTS `idx_pin_requests_created` ON `request` (`created_at`);
+CREATE INDEX IF NOT EXISTS `category_id_fk_idx` ON `request` (`category_id`);
+
+-- MySQL only bumps updated_at when a row really changes and the statement doesn't set it;
+-- counter updates (`updated_at = updated_at`) never touch these columns.
+CREATE TRIGGER IF NOT EXISTS `request_updated_at`
+AFTER UPDATE OF `title`, `description`, `status`, `category_id`, `location`, `pin_user_id` ON `request`
+FOR EACH ROW
+WHEN NEW.`updated_at` IS OLD.`updated_at`
+ AND (NEW.`title` IS NOT OLD.`title` OR NEW.`description` IS NOT OLD.`description`
+      OR NEW.`status` IS NOT OLD.`status` OR NEW.`category_id` IS NOT OLD.`category_id`
+      OR NEW.`location` IS NOT OLD.`location` OR NEW.`pin_user_id` IS NOT OLD.`pin_user_id`)
+BEGIN
+  UPDATE `request` SET `updated_at` = datetime('now', 'localtime') WHERE `request_id` = NEW.`request_id`;
+END;
+
+CREATE TABLE IF NOT EXISTS `shortlist` (
+  `shortlist_id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `csr_user_id` INT NOT NULL REFERENCES `user` (`user_id`) ON DELETE CASCADE,
+  `request_id` INT NOT NULL REFERENCES `request` (`request_id`) ON DELETE CASCADE,
+  `notes` TEXT NULL DEFAULT NULL COLLATE NOCASE,
+  `added_at` TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  UNIQUE (`csr_user_id`, `request_id`)
+);
+CREATE INDEX IF NOT EXISTS `shortlist_request_id` ON `shortlist` (`request_id`);
+
+CREATE TABLE IF NOT EXISTS `request_view` (
+  `view_id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `request_id` INT NOT NULL REFERENCES `request` (`request_id`) ON DELETE CASCADE,
+  `viewed_by_user_id` INT NULL DEFAULT NULL REFERENCES `user` (`user_id`) ON DELETE SET NULL,
+  `viewed_at` TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  `user_ip` VARCHAR(45) NULL DEFAULT NULL
+);
+CREATE INDEX IF NOT EXISTS `request_view_request_id` ON `request_view` (`request_id`);
+CREATE INDEX IF NOT EXISTS `request_view_viewed_by` ON `request_view` (`viewed_by_user_id`);
+
+CREATE TABLE IF NOT EXISTS `match` (
+  `match_id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `request_id` INT NOT NULL REFERENCES `request` (`request_id`) ON DELETE RESTRICT,
+  `csr_user_id` INT NOT NULL REFERENCES `user` (`user_id`) ON DELETE RESTRICT,
+  `pin_user_id` INT NOT NULL REFERENCES `user` (`user_id`) ON DELETE RESTRICT,
+  `service_date` DATE NOT NULL,
+  `completion_date` TIMESTAMP NULL DEFAULT (datetime('now', 'localtime')),
+  `status` TEXT NULL DEFAULT 'Scheduled' COLLATE NOCASE
+    CHECK (`status` IN ('Scheduled', 'In Progress', 'Completed', 'Cancelled'))
+);
+CREATE INDEX IF NOT EXISTS `match_request_id` ON `match` (`request_id`);
+CREATE INDEX IF NOT EXISTS `pin_user_id` ON `match` (`pin_user_id`);
+CREATE INDEX IF NOT EXISTS `idx_service_matches_dates` ON `match` (`service_date`, `completion_date`);
+CREATE INDEX IF NOT EXISTS `idx_service_matches_users` ON `match` (`csr_user_id`, `pin_user_id`);
+
+CREATE TABLE IF NOT EXISTS `cache_version` (
+  `name` VARCHAR(50) NOT NULL PRIMARY KEY,
+  `version` BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS `report_daily_rollup` (
+  `day` DATE NOT NULL,
+  `category_id` INT NOT NULL DEFAULT 0,
+  `location` VARCHAR(75) NOT NULL COLLATE NOCASE,
+  `status` VARCHAR(20) NOT NULL COLLATE NOCASE,
+  `created` INT NOT NULL DEFAULT 0,
+  `views` INT NOT NULL DEFAULT 0,
+  `shortlists` INT NOT NULL DEFAULT 0,
+  `matches_created` INT NOT NULL DEFAULT 0,
+  `completed` INT NOT NULL DEFAULT 0,
+  `completion_seconds` BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`day`, `category_id`, `location`, `status`)
+);
+
+CREATE TABLE IF NOT EXISTS `report_daily_csr` (
+  `day` DATE NOT NULL,
+  `csr_user_id` INT NOT NULL,
+  PRIMARY KEY (`day`, `csr_user_id`)
+);
+
+CREATE TABLE IF NOT EXISTS `report_rollup_dirty` (
+  `day` DATE NOT NULL PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS `report_rollup_state` (
+  `id` TINYINT NOT NULL PRIMARY KEY,
+  `refreshed_at` DATETIME NULL DEFAULT NULL
+);
+
+INSERT OR IGNORE INTO `report_rollup_state` (`id`, `refreshed_at`) VALUES (1, NULL);
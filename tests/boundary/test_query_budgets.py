@@ -0,0 +1,256 @@
+"""
+Per-endpoint performance budgets: every call below runs against a seeded
+in-memory SQLite database and fails when it issues more SQL statements, spends
+more DB time or returns more bytes than its budget. Statement budgets don't
+grow with the data, so a per-row lookup (N+1) breaks them immediately. The
+read-only calls are also repeated on one long-lived app, so counts that creep
+up from checkout to checkout fail as well.
+
+When a change legitimately needs more, raise the budget in the same commit and
+say why. DB time on a slow machine can be loosened with QUERY_BUDGET_TIME_SCALE.
+Only the request's own connection is profiled; the SQL-free event stream is not
+covered.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+
+from app import create_app
+from entity.db_pool import get_pool
+from entity.sql_profiler import get_profiler
+
+TIME_SCALE = float(os.environ.get("QUERY_BUDGET_TIME_SCALE", "1"))
+
+N_REQUESTS = 120
+PINS = (2, 3, 4, 5)
+CSRS = (6, 7, 8)
+STATUSES = ("Open", "In Progress", "Completed", "Open")
+CATEGORIES = ("Transport", "Groceries", "Medical")
+WORDS = ("clinic", "groceries", "transport", "meal", "repair", "shopping")
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int
+    db_ms: float
+    bytes: int
+
+
+@dataclass(frozen=True)
+class Call:
+    method: str
+    path: str
+    json: Optional[Dict[str, Any]] = None
+    status: Tuple[int, ...] = (200,)
+
+
+# endpoint -> (call, budget)
+# Writes that change what the request lists show include one statement bumping the
+# `cache_version` counter behind the list ETags (entity/cache_version.py).
+BUDGETS = {
+    # request_boundary
+    "request detail": (Call("GET", "/api/requests/5"), Budget(1, 20, 600)),
+    "active requests": (Call("GET", "/api/requests/active"), Budget(4, 50, 48_000)),
+    "active requests, keyword": (Call("GET", "/api/requests/active?search=clinic"), Budget(4, 50, 6_000)),
+    "active requests, page": (Call("GET", "/api/requests/active?limit=20"), Budget(4, 30, 11_000)),
+    "my requests": (Call("GET", "/api/requests?pin_user_id=2"), Budget(1, 30, 16_000)),
+    "search my requests": (Call("GET", "/api/requests/search?pin_user_id=2&keyword=transport"), Budget(1, 30, 8_000)),
+    "create request": (
+        Call("POST", "/api/requests", {"pin_user_id": 2, "title": "Ride", "description": "Ride to clinic",
+                                       "location": "East", "category_id": 1}, (201,)),
+        Budget(3, 30, 600),
+    ),
+    "update request": (
+        Call("PUT", "/api/requests", {"pin_user_id": 2, "request_id": 4, "csr_id": None, "title": "Updated"}),
+        Budget(3, 30, 600),
+    ),
+    "delete request": (
+        Call("DELETE", "/api/requests", {"pin_user_id": 2, "request_id": 4}),
+        Budget(5, 30, 100),
+    ),
+    # match_boundary
+    "past matches": (Call("GET", "/api/pin/matches/past?pin_user_id=4"), Budget(1, 30, 26_000)),
+    "search past matches": (Call("GET", "/api/pin/matches/complete?csr_user_id=6&keyword=clinic"), Budget(1, 30, 9_000)),
+    "delete match": (Call("DELETE", "/api/pin/matches", {"match_id": 1}), Budget(3, 30, 500)),
+    "undo complete": (
+        Call("POST", "/api/pin/matches/undo-complete", {"request_id": 2, "pin_user_id": 4}),
+        Budget(6, 50, 600),
+    ),
+    # shortlist_boundary
+    "shortlist": (Call("GET", "/api/shortlist?csr_id=6"), Budget(2, 30, 12_000)),
+    "toggle shortlist": (
+        Call("POST", "/api/shortlist", {"pin_user_id": 7, "request_id": 2}, (201,)),
+        Budget(4, 30, 100),
+    ),
+    "search shortlist": (Call("GET", "/api/shortlist/search?csr_id=6&search=clinic"), Budget(1, 30, 12_000)),
+    # admin_boundary
+    "list users": (Call("GET", "/api/admin"), Budget(1, 20, 1_000)),
+    "create user": (
+        Call("POST", "/api/admin", {"username": "new", "password": "x", "role": "Csr_Rep"}, (201,)),
+        Budget(1, 20, 200),
+    ),
+    "update user": (Call("PUT", "/api/admin", {"id": 6, "username": "csr-6b", "role": "Csr_Rep"}), Budget(1, 20, 100)),
+    # + flagging the report days of the cascaded requests/shortlists and releasing the
+    # shortlist_count of what the user shortlisted
+    "delete user": (Call("DELETE", "/api/admin", {"id": 1}), Budget(5, 20, 100)),
+    "list profiles": (Call("GET", "/api/admin/profile"), Budget(1, 20, 1_500)),
+    "update profile": (Call("PUT", "/api/admin/profile", {"id": 6, "full_name": "Csr Six"}), Budget(1, 20, 100)),
+    # report_boundary; the CSR counts run on the request's connection too
+    "report": (Call("GET", "/api/report?days=30"), Budget(13, 100, 1_000)),
+}
+
+
+def _seed(conn) -> None:
+    now = datetime.now().replace(microsecond=0)
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT INTO user (user_id, username, password, role, full_name) VALUES (%s, %s, 'x', %s, %s)",
+        [(1, "admin", "Admin", "Admin")]
+        + [(u, f"pin-{u}", "PIN_Support", f"Pin {u}") for u in PINS]
+        + [(u, f"csr-{u}", "Csr_Rep", f"Csr {u}") for u in CSRS],
+    )
+    cur.executemany("INSERT INTO service_category (category_name) VALUES (%s)", [(c,) for c in CATEGORIES])
+    requests, views, shortlists, matches = [], [], [], []
+    for i in range(1, N_REQUESTS + 1):
+        created = now - timedelta(days=i % 28, hours=i % 24)
+        status = STATUSES[i % len(STATUSES)]
+        pin = PINS[i % len(PINS)]
+        words = f"{WORDS[i % len(WORDS)]} {WORDS[(i * 7) % len(WORDS)]}"
+        requests.append((i, pin, f"Request {i} {words}", f"Need help with {words}", status, created, created,
+                         1 + i % len(CATEGORIES), ("East", "West", "North")[i % 3]))
+        views += [(i, created + timedelta(hours=h)) for h in range(1, 4)]
+        if i % 2 == 0:
+            shortlists.append((CSRS[i % len(CSRS)], i, created + timedelta(hours=1)))
+        if status == "Completed":
+            matches.append((i, CSRS[i % len(CSRS)], pin, created.date(), created + timedelta(days=1)))
+    cur.executemany(
+        """
+        INSERT INTO request (request_id, pin_user_id, title, description, status, created_at, updated_at,
+                             category_id, location)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        requests,
+    )
+    cur.executemany("INSERT INTO request_view (request_id, viewed_at) VALUES (%s, %s)", views)
+    cur.executemany("INSERT INTO shortlist (csr_user_id, request_id, added_at) VALUES (%s, %s, %s)", shortlists)
+    cur.executemany(
+        """
+        INSERT INTO `match` (request_id, csr_user_id, pin_user_id, service_date, completion_date, status)
+        VALUES (%s, %s, %s, %s, %s, 'Completed')
+        """,
+        matches,
+    )
+    cur.execute(
+        """
+        UPDATE request
+        SET view_count = (SELECT COUNT(*) FROM request_view v WHERE v.request_id = request.request_id),
+            shortlist_count = (SELECT COUNT(*) FROM shortlist s WHERE s.request_id = request.request_id)
+        """
+    )
+    cur.close()
+    conn.commit()
+
+
+def _seeded_app(**config):
+    app = create_app({"DB_BACKEND": "sqlite", "TESTING": True, "SINGLE_FLIGHT_WINDOW": 0.0, **config})
+    with get_pool(app).connection() as conn:
+        _seed(conn)
+    return app
+
+
+@pytest.fixture
+def app():
+    return _seeded_app()
+
+
+def _measure(app, call: Call):
+    resp = app.test_client().open(call.path, method=call.method, json=call.json)
+    body = resp.get_data()
+    assert resp.status_code in call.status, body[:500]
+    return body, get_profiler(app).recent()[0]
+
+
+@pytest.mark.parametrize("name", list(BUDGETS))
+def test_endpoint_stays_within_budget(app, name):
+    call, budget = BUDGETS[name]
+    body, profile = _measure(app, call)
+    report = f"{name}: {profile['query_count']} queries, {profile['db_ms']} ms, {len(body)} bytes"
+    assert profile["query_count"] <= budget.queries, f"{report}; repeated: {profile['repeated']}"
+    assert profile["db_ms"] <= budget.db_ms * TIME_SCALE, report
+    assert len(body) <= budget.bytes, report
+
+
+def test_query_counts_are_stable_across_checkouts():
+    # One long-lived app whose pooled connection is reused by every call: per-process
+    # drift, e.g. connections re-wrapped on each checkout, shows up as growing counts.
+    # Cache re-checks are pushed out of the way.
+    app = _seeded_app(DB_POOL_SIZE=1, CATEGORY_CACHE_CHECK_INTERVAL=3600.0, REPORT_ROLLUP_MAX_AGE=3600.0)
+    reads = {name: entry for name, entry in BUDGETS.items() if entry[0].method == "GET"}
+    for call, _ in reads.values():
+        _measure(app, call)  # warm caches and the report rollup first
+    for _ in range(3):
+        for name, (call, budget) in reads.items():
+            counts = [_measure(app, call)[1]["query_count"] for _ in range(2)]
+            assert counts[0] == counts[1] <= budget.queries, f"{name}: {counts}"
+
+
+def test_budget_catches_per_row_lookups(app, monkeypatch):
+    from control.request_controller import SearchPinRequestController
+    from entity.pin_request import Request
+
+    original = SearchPinRequestController.list_active_requests
+
+    def per_row(self, search, stream=False):
+        return [
+            Request._row_to_request(self.pin_req_repo.get_request_by_id(r.request_id))
+            for r in original(self, search)
+        ]
+
+    monkeypatch.setattr(SearchPinRequestController, "list_active_requests", per_row)
+    call, budget = BUDGETS["active requests"]
+    _, profile = _measure(app, call)
+    assert profile["query_count"] > budget.queries
+
+
+def test_active_etag_is_one_lookup_and_moves_on_every_write(app):
+    client = app.test_client()
+    tag = client.get("/api/requests/active?limit=20").headers["ETag"]
+    resp = client.get("/api/requests/active?limit=20", headers={"If-None-Match": tag})
+    assert resp.status_code == 304
+    assert get_profiler(app).recent()[0]["query_count"] == 1  # the counter, no aggregate over the table
+
+    seen = {tag}
+    for title in ("First", "Second"):  # same second: MAX(updated_at) wouldn't move for the second one
+        client.put("/api/requests", json={"pin_user_id": 2, "request_id": 4, "csr_id": None, "title": title})
+        resp = client.get("/api/requests/active?limit=20", headers={"If-None-Match": tag})
+        assert resp.status_code == 200
+        tag = resp.headers["ETag"]
+        assert tag not in seen
+        seen.add(tag)
+
+
+def test_concurrent_reports_fit_in_the_pool(monkeypatch):
+    # Every pooled connection is held by a report at once: any second checkout
+    # from inside a report would wait out DB_POOL_TIMEOUT and fail.
+    from entity.report_rollup_repository import ReportRollupRepository
+
+    size = 3
+    app = _seeded_app(DB_POOL_SIZE=size, DB_POOL_TIMEOUT=2.0, REPORT_ROLLUP_MAX_AGE=3600.0)
+    call, _ = BUDGETS["report"]
+    _measure(app, call)  # build the rollup once, so the concurrent calls only read
+    all_in = threading.Barrier(size, timeout=5)
+    original = ReportRollupRepository.refresh
+
+    def refresh_once_all_checked_out(self, *args, **kwargs):
+        all_in.wait()
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(ReportRollupRepository, "refresh", refresh_once_all_checked_out)
+    with ThreadPoolExecutor(max_workers=size) as workers:
+        reports = list(workers.map(lambda _: app.test_client().get(call.path).get_json(), range(size)))
+    assert all(report and report["requests_created"] == N_REQUESTS for report in reports), reports
@@ -0,0 +1,31 @@
+from datetime import date, datetime
+from unittest.mock import Mock
+from control.match_controller import ViewPastMatchController
+
+def make_row(match_id):
+    ts = datetime(2025, 10, 1, 12, 0, 0)
+    return {
+        "match_id": match_id, "request_id": 100 + match_id, "csr_user_id": 2, "pin_user_id": 3,
+        "service_date": date(2025, 10, 1), "completion_date": ts, "status": "Completed",
+        "request_pin_user_id": 3, "request_title": "Groceries", "request_description": "desc",
+        "request_status": "Completed", "request_created_at": ts, "request_updated_at": ts,
+        "category_id": 4, "location": "Bishan", "view_count": 9, "shortlist_count": 2,
+        "category_name": "Senior Support",
+    }
+
+def test_view_past_matches_hydrates_from_single_query():
+    match_repo = Mock(spec_set=["list_past_matches"])
+    match_repo.list_past_matches.return_value = [make_row(1), make_row(2)]
+    req_repo = Mock(spec_set=["get_request_by_id"])
+    cat_repo = Mock(spec_set=["get_category"])
+
+    matches = ViewPastMatchController(match_repo, req_repo, cat_repo).view_past_matches(
+        user_id=3, user_type="pin_user_id"
+    )
+
+    assert [m.request.request_id for m in matches] == [101, 102]
+    assert matches[0].request.title == "Groceries"
+    assert matches[0].request.category == {"category_id": 4, "category_name": "Senior Support"}
+    match_repo.list_past_matches.assert_called_once()
+    req_repo.get_request_by_id.assert_not_called()
+    cat_repo.get_category.assert_not_called()
@@ -0,0 +1,70 @@
+from datetime import datetime
+import pytest
+from unittest.mock import Mock
+from control.request_controller import SearchPinRequestController, ListMyPinRequestsController
+
+def make_row(request_id, category_id=2, category_name="Shelter"):
+    now = datetime(2025, 10, 20, 9, 0, 0)
+    return {
+        "request_id": request_id, "pin_user_id": 3, "title": f"Request {request_id}",
+        "description": "desc", "status": "Open", "created_at": now, "updated_at": now,
+        "view_count": 4, "shortlist_count": 1, "category_id": category_id,
+        "category_name": category_name, "location": "Bishan",
+    }
+
+@pytest.fixture
+def cat_repo():
+    return Mock(spec_set=["get_category"])
+
+def test_list_active_requests_uses_joined_category(cat_repo):
+    req_repo = Mock(spec_set=["search_requests_by_status"])
+    req_repo.search_requests_by_status.return_value = [make_row(i) for i in range(1, 501)]
+    result = SearchPinRequestController(req_repo, cat_repo=cat_repo).list_active_requests("")
+    assert len(result) == 500
+    assert result[0].category == {"category_id": 2, "category_name": "Shelter"}
+    req_repo.search_requests_by_status.assert_called_once()
+    cat_repo.get_category.assert_not_called()
+
+def test_list_my_requests_without_category(cat_repo):
+    req_repo = Mock(spec_set=["list_requests_by_pin"])
+    req_repo.list_requests_by_pin.return_value = [make_row(7, category_id=None, category_name=None)]
+    result = ListMyPinRequestsController(req_repo, None, cat_repo).list_my_requests(pin_user_id=3)
+    assert result[0].category is None
+    cat_repo.get_category.assert_not_called()
+
+def test_list_active_requests_page_returns_cursor_for_next_page(cat_repo):
+    req_repo = Mock(spec_set=["search_requests_by_status"])
+    req_repo.search_requests_by_status.return_value = [make_row(i) for i in range(3, 0, -1)]
+    controller = SearchPinRequestController(req_repo, cat_repo=cat_repo)
+
+    items, next_cursor = controller.list_active_requests_page("", limit=2)
+
+    assert [r.request_id for r in items] == [3, 2]
+    assert next_cursor is not None
+    _, kwargs = req_repo.search_requests_by_status.call_args
+    assert kwargs["limit"] == 3 and kwargs["after"] is None
+
+    req_repo.search_requests_by_status.return_value = [make_row(1)]
+    items, last_cursor = controller.list_active_requests_page("", limit=2, cursor=next_cursor)
+    _, kwargs = req_repo.search_requests_by_status.call_args
+    assert kwargs["after"] == (items[0].created_at, 2)
+    assert last_cursor is None
+
+def test_list_active_requests_page_rejects_bad_cursor(cat_repo):
+    req_repo = Mock(spec_set=["search_requests_by_status"])
+    with pytest.raises(ValueError):
+        SearchPinRequestController(req_repo, cat_repo=cat_repo).list_active_requests_page("", cursor="not-a-cursor")
+
+def test_request_feed_filters_but_keeps_moves_out_and_deletes():
+    from utility.event_hub import EventHub
+    from control.request_controller import RequestFeedController
+    hub = EventHub(keepalive=0.01)
+    open_req = {"status": "Open", "category_id": 2}
+    done_req = {"status": "Completed", "category_id": 2}
+    hub.publish("created", {"request": open_req, "changed": []})
+    hub.publish("created", {"request": {"status": "Open", "category_id": 5}, "changed": []})
+    hub.publish("updated", {"request": done_req, "changed": ["status"]})
+    hub.publish("updated", {"request": done_req, "changed": ["title"]})
+    hub.publish("deleted", {"request_id": 9, "pin_user_id": 3})
+    feed = RequestFeedController(hub).subscribe(status="Open", category_id=2, last_event_id=0)
+    assert [next(feed).id for _ in range(3)] == [1, 3, 5]
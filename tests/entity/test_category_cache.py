@@ -0,0 +1,59 @@
+import pytest
+from entity.category_cache import CategoryCache
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    def execute(self, sql, params=None):
+        self.db.queries.append(sql)
+        if "cache_version" in sql:
+            self.result = [(self.db.version,)]
+        else:
+            self.result = [dict(r) for r in self.db.categories]
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+class FakeDb:
+    def __init__(self):
+        self.version = 1
+        self.categories = [{"category_id": 1, "category_name": "Shelter"}]
+        self.queries = []
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+@pytest.fixture
+def db():
+    return FakeDb()
+
+def test_lookups_are_served_from_memory(db):
+    cache = CategoryCache(check_interval=60)
+    assert cache.get_category(db, 1) == {"category_id": 1, "category_name": "Shelter"}
+    assert cache.list_categories(db) == [{"id": 1, "name": "Shelter"}]
+    assert cache.get_category(db, 99) is None
+    assert len(db.queries) == 2  # one version check + one load
+    assert cache.stats()["misses"] == 1
+
+def test_reload_when_another_process_bumps_version(db):
+    cache = CategoryCache(check_interval=0)
+    cache.list_categories(db)
+    db.categories.append({"category_id": 2, "category_name": "Hunger Relief"})
+    assert len(cache.list_categories(db)) == 1  # version unchanged -> still cached
+    db.version = 2
+    assert len(cache.list_categories(db)) == 2
+
+def test_invalidate_forces_reload(db):
+    cache = CategoryCache(check_interval=60)
+    cache.list_categories(db)
+    db.categories = []
+    cache.invalidate()
+    assert cache.list_categories(db) == []
@@ -0,0 +1,83 @@
+from datetime import datetime
+from entity.report import ReportRepository, CategoryCount, LocationCount
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.db.statements += 1
+        if "report_rollup_state" in sql:
+            self.rows = [(datetime.now(),)]
+        elif "FROM report_rollup_dirty" in sql:
+            self.rows = []
+        elif "FROM report_daily_rollup" in sql:
+            self.rows = self.db.rollup
+        else:
+            self.rows = [{"new_csrs": 1, "active_csrs": 3}]
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+class FakeDb:
+    in_transaction = False
+
+    def __init__(self, rollup):
+        self.rollup = rollup
+        self.statements = 0
+
+    def start_transaction(self):
+        pass
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+class FakeCategoryCache:
+    def list_categories(self, db):
+        return [{"id": 1, "name": "Shelter"}, {"id": 2, "name": "Hunger Relief"}, {"id": 3, "name": "Arts"}]
+
+def rollup_row(category_id, location, status, created, **metrics):
+    row = {"category_id": category_id, "location": location, "status": status, "created": created,
+           "views": 0, "shortlists": 0, "matches_created": 0, "completed": 0, "completion_seconds": 0}
+    row.update(metrics)
+    return row
+
+def test_get_report_reads_fresh_rollup():
+    db = FakeDb([
+        rollup_row(1, "Bishan", "Open", 3, views=30, shortlists=6),
+        rollup_row(1, "Orchard", "Completed", 2, views=10, matches_created=2, completed=2, completion_seconds=345600),
+        rollup_row(2, "Bishan", "In Progress", 1),
+        rollup_row(3, "Bishan", "Open", 0, views=5),  # activity on a request created before the window
+    ])
+    repo = ReportRepository(db, cat_cache=FakeCategoryCache(), rollup_max_age=3600)
+    frm, to = datetime(2025, 10, 1), datetime(2025, 10, 31)
+
+    report = repo.get_report(frm, to)
+
+    assert db.statements == 4  # watermark check, flagged days in the window, rollup read, CSR counts
+    assert report.requests_created == 6
+    assert (report.status_snapshot.open, report.status_snapshot.in_progress,
+            report.status_snapshot.completed, report.status_snapshot.cancelled) == (3, 1, 2, 0)
+    assert report.by_location == [LocationCount("Bishan", 4), LocationCount("Orchard", 2)]
+    assert report.by_category == [CategoryCount("Shelter", 5), CategoryCount("Hunger Relief", 1), CategoryCount("Arts", 0)]
+    assert report.request_views == 45 and report.request_shortlists == 6 and report.active_csrs == 3
+    assert report.avg_time_to_completion_days == 2.0
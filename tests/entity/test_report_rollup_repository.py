@@ -0,0 +1,108 @@
+from datetime import date, datetime
+from unittest.mock import MagicMock
+from entity.report_rollup_repository import ReportRollupRepository
+
+def test_contiguous_ranges_groups_adjacent_days():
+    days = {date(2025, 10, 3), date(2025, 10, 1), date(2025, 10, 2), date(2025, 10, 7)}
+    assert ReportRollupRepository._contiguous_ranges(days) == [
+        (date(2025, 10, 1), date(2025, 10, 3)),
+        (date(2025, 10, 7), date(2025, 10, 7)),
+    ]
+
+def test_refresh_rebuilds_dirty_days_and_days_since_watermark():
+    db = MagicMock()
+    cur = db.cursor.return_value
+    cur.fetchone.return_value = (datetime(2025, 10, 20, 23, 0),)
+    cur.fetchall.return_value = [(date(2025, 9, 1),)]
+    repo = ReportRollupRepository(db)
+
+    rebuilt = repo.refresh(now=datetime(2025, 10, 21, 8, 0))
+
+    assert rebuilt == 3  # 2025-09-01 (dirty) + 10-20 and 10-21 (since the last refresh)
+    deletes = [c.args[1] for c in cur.execute.call_args_list
+               if c.args[0].startswith("DELETE FROM report_daily_rollup")]
+    assert deletes == [(date(2025, 9, 1), date(2025, 9, 1)), (date(2025, 10, 20), date(2025, 10, 21))]
+    db.commit.assert_called()
+
+def _sqlite_db():
+    from entity.sqlite_backend import SqlitePool
+    pool = SqlitePool(size=1)
+    return pool, pool.acquire()
+
+def _rollup_total(db, column):
+    cur = db.cursor()
+    cur.execute(f"SELECT COALESCE(SUM({column}), 0) FROM report_daily_rollup")
+    return cur.fetchone()[0]
+
+def test_deleting_a_user_drops_their_events_from_the_rollup():
+    from entity.pin_request_repository import RequestRepository
+    from entity.shortlist_repository import ShortlistRepository
+    from entity.user_repository import UserRepository
+
+    pool, db = _sqlite_db()
+    try:
+        users = UserRepository(db)
+        pin = users.create_user("pin01", "x", "PIN_Support")["id"]
+        csr = users.create_user("csr01", "x", "Csr_Rep")["id"]
+        req = RequestRepository(db).create_request(pin, "Ride", "Ride home", None, "East")
+        ShortlistRepository(db).save_shortlist(csr, req["request_id"], None, datetime(2025, 9, 1, 10, 0))
+        rollup = ReportRollupRepository(db)
+        rollup.refresh()
+        assert (_rollup_total(db, "created"), _rollup_total(db, "shortlists")) == (1, 1)
+
+        users.delete_user(csr)  # 2025-09-01 is before the watermark: only the dirty flag gets it rebuilt
+        users.delete_user(pin)
+        rollup.refresh()
+        assert (_rollup_total(db, "created"), _rollup_total(db, "shortlists")) == (0, 0)
+    finally:
+        pool.release(db)
+        pool.close()
+
+def test_refresh_inside_a_unit_of_work_does_not_commit_it():
+    from entity.unit_of_work import UnitOfWork
+    from entity.user_repository import UserRepository
+
+    pool, db = _sqlite_db()
+    try:
+        with UnitOfWork(db) as uow:
+            UserRepository(db).create_user("pin01", "x", "PIN_Support")
+            ReportRollupRepository(db).refresh()
+            uow.rollback_only()
+        assert UserRepository(db).list_users() == []
+    finally:
+        pool.release(db)
+        pool.close()
+
+def test_first_refresh_only_builds_the_requested_window():
+    from entity.pin_request_repository import RequestRepository
+    from entity.report import ReportRepository
+    from entity.shortlist_repository import ShortlistRepository
+    from entity.user_repository import UserRepository
+
+    pool, db = _sqlite_db()
+    try:
+        users = UserRepository(db)
+        pin = users.create_user("pin01", "x", "PIN_Support")["id"]
+        csr = users.create_user("csr01", "x", "Csr_Rep")["id"]
+        req = RequestRepository(db).create_request(pin, "Ride", "Ride home", None, "East")
+        ShortlistRepository(db).save_shortlist(csr, req["request_id"], None, datetime(2025, 9, 1, 10, 0))
+        cur = db.cursor()
+        cur.executemany(  # 2025-09-03 is the end of the window, so not in it
+            "INSERT INTO request_view (request_id, viewed_at) VALUES (%s, %s)",
+            [(req["request_id"], datetime(2025, 9, day, 10, 0)) for day in (2, 3)],
+        )
+        db.commit()
+        rollup = ReportRollupRepository(db)
+
+        assert rollup.refresh(window=(date(2025, 9, 1), date(2025, 9, 3))) == 2
+        assert (_rollup_total(db, "shortlists"), _rollup_total(db, "views")) == (1, 1)
+
+        report = ReportRepository(db, rollup_max_age=3600).get_report(datetime(2025, 9, 1), datetime(2025, 9, 3))
+        assert (report.request_views, report.request_shortlists, report.active_csrs) == (1, 1, 1)
+        assert rollup.summary_rows(date(2025, 9, 3), date(2025, 9, 4)) == []  # still only flagged
+
+        rollup.refresh(max_age_seconds=3600, window=(date(2025, 9, 3), date(2025, 9, 4)))
+        assert _rollup_total(db, "views") == 2
+    finally:
+        pool.release(db)
+        pool.close()
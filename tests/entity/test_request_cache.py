@@ -0,0 +1,47 @@
+from datetime import datetime
+from unittest.mock import Mock
+from entity.pin_request import Request
+from entity.request_cache import RequestCache
+from control.request_controller import ReadRequestController
+
+ROW = {
+    "request_id": 7, "pin_user_id": 3, "title": "Groceries", "description": "desc", "status": "Open",
+    "created_at": datetime(2025, 10, 20), "updated_at": datetime(2025, 10, 20), "view_count": 4,
+    "shortlist_count": 1, "category_id": 2, "category_name": "Shelter", "location": "Bishan",
+}
+
+def _req(request_id):
+    return Request._row_to_request({**ROW, "request_id": request_id})
+
+def test_lru_bound_and_ttl():
+    cache = RequestCache(max_entries=2, ttl=60)
+    for i in (1, 2):
+        cache.put(i, _req(i), cache.generation())
+    assert cache.get(1) is not None          # 1 is now most recently used
+    cache.put(3, _req(3), cache.generation())
+    assert cache.get(2) is None              # evicted
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+    expired = RequestCache(ttl=0)
+    expired.put(1, _req(1), expired.generation())
+    assert expired.get(1) is None
+
+def test_load_racing_an_invalidation_is_not_cached():
+    cache = RequestCache()
+    generation = cache.generation()
+    cache.invalidate(7)                      # a write commits while the read is loading
+    assert cache.put(7, _req(7), generation) is False
+    assert cache.get(7) is None
+
+def test_read_through_hits_the_database_once_until_invalidated():
+    repo = Mock(spec_set=["get_request_by_id"])
+    repo.get_request_by_id.return_value = dict(ROW)
+    cache = RequestCache()
+    controller = ReadRequestController(repo, Mock(), None, cache)
+    first = controller.read_request(request_id=7)
+    first.title = "changed by a caller"
+    assert controller.read_request(request_id=7).title == "Groceries"
+    assert repo.get_request_by_id.call_count == 1
+    cache.invalidate(7)
+    controller.read_request(request_id=7)
+    assert repo.get_request_by_id.call_count == 2
+    assert cache.stats()["hits"] == 1
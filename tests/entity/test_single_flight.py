@@ -0,0 +1,60 @@
+import threading
+import time
+import pytest
+from flask import Flask
+from entity import single_flight
+from entity.single_flight import SingleFlight, coalesce
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def query():
+        calls.append(1)
+        release.wait(1)
+        return [{"request_id": 1}]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", query))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [[{"request_id": 1}]] * 8
+    assert flight.stats() == {"executions": 1, "shared": 7, "in_flight": 0}
+
+def test_errors_are_not_kept_and_window_reuses_results():
+    flight = SingleFlight(window=60)
+    with pytest.raises(RuntimeError):
+        flight.do("k", lambda: (_ for _ in ()).throw(RuntimeError("db down")))
+    assert flight.do("k", lambda: [1]) == [1]
+    assert flight.do("k", lambda: [2]) == [1]   # still inside the window
+    assert flight.do("other", lambda: [3]) == [3]
+
+class Repo:
+    def __init__(self):
+        self.calls = 0
+
+    @coalesce
+    def search(self, *, status, query="", stream=False):
+        self.calls += 1
+        return [status, query]
+
+def test_decorator_normalises_arguments_and_skips_streams():
+    app = Flask(__name__)
+    app.config["SINGLE_FLIGHT_WINDOW"] = 60
+    single_flight.init_app(app)
+    repo = Repo()
+    with app.app_context():
+        repo.search(status=("Open", "In Progress"))
+        repo.search(query="", status=["Open", "In Progress"])
+        assert repo.calls == 1
+        repo.search(status=("Open",), stream=True)
+        repo.search(status=("Open",), stream=True)
+        assert repo.calls == 3
+    repo.search(status=("Open",))  # no app: called directly
+    assert repo.calls == 4
@@ -0,0 +1,60 @@
+from unittest.mock import MagicMock
+import pytest
+from flask import Flask
+from entity import sql_profiler
+from entity.sql_profiler import SqlProfiler, RepeatedQueryError, normalize_sql
+
+def fake_conn(rows):
+    conn = MagicMock()
+    conn.cursor.return_value.fetchall.return_value = rows
+    return conn
+
+def test_normalize_sql_collapses_literals_and_placeholders():
+    a = normalize_sql("SELECT *  FROM request\n WHERE request_id = %s AND status = 'Open'")
+    b = normalize_sql("SELECT * FROM request WHERE request_id = 42 AND status = 'Completed'")
+    assert a == b == "SELECT * FROM request WHERE request_id = ? AND status = ?"
+    assert normalize_sql("SELECT 1 FROM t WHERE id IN (%s, %s, %s)") == "SELECT ? FROM t WHERE id IN (?, ...)"
+
+def test_capture_counts_queries_rows_and_flags_repeats():
+    profiler = SqlProfiler(repeat_threshold=3)
+    db = profiler.wrap(fake_conn([{"id": 1}, {"id": 2}]))
+    with profiler.capture("view past matches") as profile:
+        with db.cursor(dictionary=True) as cur:
+            cur.execute("SELECT * FROM `match` WHERE pin_user_id = %s", (3,))
+            cur.fetchall()
+        for request_id in range(5):  # the per-row re-fetch an N+1 looks like
+            with db.cursor(dictionary=True) as cur:
+                cur.execute("SELECT * FROM request WHERE request_id = %s", (request_id,))
+
+    entry = profiler.finish(profile)
+    assert entry["query_count"] == 6 and entry["rows"] == 2
+    assert entry["repeated"] == [{"sql": "SELECT * FROM request WHERE request_id = ?", "count": 5}]
+    assert profiler.stats()["flagged"] == 1
+
+def test_request_hooks_add_server_timing_and_strict_mode_rejects_repeats():
+    app = Flask(__name__)
+    app.config.update(SQL_PROFILER_REPEAT_THRESHOLD=2, SQL_PROFILER_STRICT=True)
+    profiler = sql_profiler.init_app(app)
+    db = profiler.wrap(fake_conn([]))
+
+    @app.get("/ok")
+    def ok():
+        with db.cursor() as cur:
+            cur.execute("SELECT 1")
+        return "ok"
+
+    @app.get("/loop")
+    def loop():
+        for i in range(3):
+            with db.cursor() as cur:
+                cur.execute("SELECT * FROM request WHERE request_id = %s", (i,))
+        return "loop"
+
+    client = app.test_client()
+    resp = client.get("/ok")
+    assert 'db;dur=' in resp.headers["Server-Timing"] and '1 queries' in resp.headers["Server-Timing"]
+
+    app.testing = True
+    with pytest.raises(RepeatedQueryError):
+        client.get("/loop")
+    assert [e["path"] for e in profiler.recent()] == ["/loop", "/ok"]
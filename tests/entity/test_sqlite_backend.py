@@ -0,0 +1,190 @@
+from datetime import date, datetime
+
+import pytest
+from mysql.connector import errorcode, errors
+
+from entity.category_cache import CategoryCache
+from entity.match_repository import MatchRepository
+from entity.pin_request_repository import RequestRepository
+from entity.request_view_repository import RequestViewRepository
+from entity.service_category_repository import ServiceCategoryRepository
+from entity.shortlist_repository import ShortlistRepository
+from entity.sqlite_backend import SqlitePool, translate
+from entity.user_repository import UserRepository
+
+
+@pytest.fixture
+def pool():
+    pool = SqlitePool(size=2)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def db(pool):
+    with pool.connection() as conn:
+        yield conn
+
+
+@pytest.fixture
+def seeded(db):
+    users = UserRepository(db)
+    pin = users.create_user("pin01", "x", "PIN_Support")["id"]
+    csr = users.create_user("csr01", "x", "Csr_Rep")["id"]
+    cat = ServiceCategoryRepository(db, cache=CategoryCache()).create_category("Transport")
+    return {"pin": pin, "csr": csr, "cat": cat}
+
+
+def test_translate_rewrites_mysql_dialect():
+    assert translate("SELECT * FROM t WHERE a = %s") == "SELECT * FROM t WHERE a = ?"
+    assert translate("INSERT IGNORE INTO d (day) VALUES (%s)").startswith("INSERT OR IGNORE INTO")
+    assert "excluded.refreshed_at" in translate(
+        "INSERT INTO s (id, refreshed_at) VALUES (1, %s) ON DUPLICATE KEY UPDATE refreshed_at = VALUES(refreshed_at)"
+    )
+    assert translate("DELETE m FROM `match` m WHERE m.request_id = %s") == (
+        "DELETE FROM `match` WHERE rowid IN (SELECT m.rowid FROM `match` m WHERE m.request_id = ?)"
+    )
+    assert "ft_match(?, r.title, r.description)" in translate(
+        "SELECT 1 FROM request r WHERE MATCH(r.title, r.description) AGAINST (%s IN BOOLEAN MODE)"
+    )
+
+
+def test_request_lifecycle(db, seeded):
+    repo = RequestRepository(db)
+    created = repo.create_request(seeded["pin"], "Ride to clinic", "Need transport", seeded["cat"], "East")
+    assert created["status"] == "Open"
+    assert created["category_name"] == "Transport"
+    assert isinstance(created["created_at"], datetime)
+
+    updated = repo.update_request(created["request_id"], seeded["pin"], status="In Progress")
+    assert updated["status"] == "In Progress"
+
+    found = repo.search_requests_by_status(status=["In Progress"], query="transp")
+    assert [r["request_id"] for r in found] == [created["request_id"]]
+    assert repo.search_requests_by_status(status="In Progress", query="groceries") == []
+
+    assert repo.delete_request(created["request_id"], seeded["pin"]) is True
+    assert repo.get_request_by_id(created["request_id"]) is None
+
+
+def test_shortlist_keeps_counter_and_rejects_duplicates(db, seeded):
+    req = RequestRepository(db).create_request(seeded["pin"], "Meal", "Hot meal", seeded["cat"], "West")
+    shortlist = ShortlistRepository(db)
+    shortlist.save_shortlist(seeded["csr"], req["request_id"], None, datetime.now())
+    assert RequestRepository(db).get_request_by_id(req["request_id"])["shortlist_count"] == 1
+
+    with pytest.raises(errors.IntegrityError) as info:
+        shortlist.save_shortlist(seeded["csr"], req["request_id"], None, datetime.now())
+    assert info.value.errno == errorcode.ER_DUP_ENTRY
+
+    assert shortlist.delete_shortlist_by_userid_and_requestid(seeded["csr"], req["request_id"])
+    assert RequestRepository(db).get_request_by_id(req["request_id"])["shortlist_count"] == 0
+
+
+def test_completed_match_shows_in_past_matches(db, seeded):
+    req = RequestRepository(db).create_request(seeded["pin"], "Ride", "Ride home", seeded["cat"], "East")
+    matches = MatchRepository(db)
+    match_id = matches.ensure_completed_match(
+        request_id=req["request_id"], pin_user_id=seeded["pin"], csr_user_id=seeded["csr"],
+        service_date=date(2025, 10, 1), completion_date=datetime(2025, 10, 2, 9, 30),
+    )
+    rows = matches.list_past_matches(seeded["csr"], "csr_user_id")
+    assert [r["match_id"] for r in rows] == [match_id]
+    assert rows[0]["service_date"] == date(2025, 10, 1)
+
+    assert matches.delete_by_request(req["request_id"]) == 1
+    assert matches.list_past_matches(seeded["csr"], "csr_user_id") == []
+
+
+def test_completion_trend_covers_exactly_the_requested_days(db, seeded):
+    repo = MatchRepository(db)
+    assert repo.completion_trend_with_ma(datetime(2025, 9, 1), datetime(2025, 9, 1)) == []
+    assert repo.completion_trend_with_ma(datetime(2025, 9, 2), datetime(2025, 9, 1)) == []
+    trend = repo.completion_trend_with_ma(datetime(2025, 9, 1), datetime(2025, 9, 3))
+    assert [(t["day"], t["completed"], t["ma"]) for t in trend] == [(date(2025, 9, 1), 0, 0), (date(2025, 9, 2), 0, 0)]
+
+
+def test_completing_an_existing_match_invalidates_the_request(db, seeded, monkeypatch):
+    import entity.match_repository as match_repository
+
+    req = RequestRepository(db).create_request(seeded["pin"], "Ride", "Ride home", seeded["cat"], "East")
+    cur = db.cursor()
+    cur.execute(
+        "INSERT INTO `match` (request_id, csr_user_id, pin_user_id, service_date, completion_date, status)"
+        " VALUES (%s, %s, %s, '2025-10-01', NULL, 'Completed')",
+        (req["request_id"], seeded["csr"], seeded["pin"]),
+    )
+    db.commit()
+    invalidated = []
+    monkeypatch.setattr(match_repository, "invalidate_request", invalidated.append)
+
+    MatchRepository(db).ensure_completed_match(
+        request_id=req["request_id"], pin_user_id=seeded["pin"], csr_user_id=seeded["csr"],
+    )
+    assert invalidated == [req["request_id"]]
+
+
+def test_deleting_a_csr_releases_their_shortlists(db, seeded):
+    req = RequestRepository(db).create_request(seeded["pin"], "Meal", "Hot meal", seeded["cat"], "West")
+    other = UserRepository(db).create_user("csr02", "x", "Csr_Rep")["id"]
+    shortlists = ShortlistRepository(db)
+    shortlists.save_shortlist(seeded["csr"], req["request_id"], None, datetime.now())
+    shortlists.save_shortlist(other, req["request_id"], None, datetime.now())
+
+    UserRepository(db).delete_user(seeded["csr"])
+    assert RequestRepository(db).get_request_by_id(req["request_id"])["shortlist_count"] == 1
+    assert RequestRepository(db).reconcile_counters() == 0
+
+
+def test_foreign_key_errors_carry_mysql_errno(db, seeded):
+    cur = db.cursor()
+    with pytest.raises(errors.IntegrityError) as info:
+        cur.execute(
+            "INSERT INTO request (pin_user_id, title, description, location) VALUES (%s, 't', 'd', 'x')", (999,)
+        )
+    assert info.value.errno == errorcode.ER_NO_REFERENCED_ROW_2
+    db.rollback()
+
+
+def test_reconcile_counters_fixes_drift(db, seeded):
+    repo = RequestRepository(db)
+    req = repo.create_request(seeded["pin"], "Ride", "Ride home", seeded["cat"], "East")
+    cur = db.cursor()
+    cur.execute("UPDATE request SET view_count = 7 WHERE request_id = %s", (req["request_id"],))
+    db.commit()
+    assert repo.reconcile_counters() == 1
+    assert repo.get_request_by_id(req["request_id"])["view_count"] == 0
+
+
+def test_request_version_moves_only_after_the_write_commits(pool, db, seeded):
+    from entity.unit_of_work import UnitOfWork
+
+    before = RequestRepository(db).version()
+    with pool.connection() as other:
+        with UnitOfWork(db):
+            RequestRepository(db).create_request(seeded["pin"], "Ride", "Ride home", seeded["cat"], "East")
+            assert RequestRepository(other).version() == before  # the counter row isn't touched yet
+        assert RequestRepository(other).version() == before + 1
+
+
+def test_view_batch_skips_deleted_requests(db, seeded):
+    repo = RequestRepository(db)
+    kept = repo.create_request(seeded["pin"], "Ride", "Ride home", seeded["cat"], "East")["request_id"]
+    gone = repo.create_request(seeded["pin"], "Meal", "Hot meal", seeded["cat"], "West")["request_id"]
+    repo.delete_request(gone, seeded["pin"])
+    now = datetime.now()
+    assert RequestViewRepository(db).save_views([(kept, now), (gone, now), (kept, now)]) == 2
+    assert repo.get_request_by_id(kept)["view_count"] == 2
+    assert RequestViewRepository(db).save_views([(gone, now)]) == 0
+
+
+def test_pools_are_isolated():
+    a, b = SqlitePool(size=1), SqlitePool(size=1)
+    try:
+        with a.connection() as conn:
+            UserRepository(conn).create_user("only-in-a", "x", "Admin")
+        with b.connection() as conn:
+            assert UserRepository(conn).list_users() == []
+    finally:
+        a.close()
+        b.close()
@@ -0,0 +1,73 @@
+import pytest
+from mysql.connector import errors
+from entity.unit_of_work import UnitOfWork, after_commit, commit, run_in_transaction
+
+class FakeConn:
+    def __init__(self):
+        self.log = []
+        self.in_transaction = False
+
+    def start_transaction(self):
+        self.in_transaction = True
+        self.log.append("BEGIN")
+
+    def commit(self):
+        self.in_transaction = False
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.in_transaction = False
+        self.log.append("ROLLBACK")
+
+    def cursor(self):
+        conn = self
+
+        class Cur:
+            def execute(self, sql):
+                conn.log.append(sql)
+
+            def close(self):
+                pass
+
+        return Cur()
+
+def test_repository_commits_are_deferred_to_one_commit():
+    db, done = FakeConn(), []
+    with UnitOfWork(db):
+        commit(db)
+        after_commit(db, done.append, "invalidate")
+        commit(db)
+        assert done == []
+    assert db.log == ["BEGIN", "COMMIT"]
+    assert done == ["invalidate"]
+    commit(db)  # outside a unit of work it commits straight away
+    assert db.log[-1] == "COMMIT" and len(db.log) == 3
+
+def test_failed_savepoint_rolls_back_alone_and_drops_its_hooks():
+    db, done = FakeConn(), []
+    with UnitOfWork(db) as uow:
+        with pytest.raises(ValueError):
+            with uow.savepoint():
+                after_commit(db, done.append, "inner")
+                raise ValueError("step failed")
+        with uow.savepoint():
+            after_commit(db, done.append, "kept")
+    assert db.log == [
+        "BEGIN", "SAVEPOINT uow_sp_1", "ROLLBACK TO SAVEPOINT uow_sp_1",
+        "SAVEPOINT uow_sp_2", "RELEASE SAVEPOINT uow_sp_2", "COMMIT",
+    ]
+    assert done == ["kept"]
+
+def test_deadlock_retries_the_whole_unit_of_work():
+    db, attempts = FakeConn(), []
+
+    def work(uow):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise errors.InternalError(msg="Deadlock found", errno=1213)
+        return "ok"
+
+    assert run_in_transaction(db, work, backoff=0) == "ok"
+    assert db.log == ["BEGIN", "ROLLBACK", "BEGIN", "ROLLBACK", "BEGIN", "COMMIT"]
+    with pytest.raises(errors.IntegrityError):
+        run_in_transaction(db, lambda uow: (_ for _ in ()).throw(errors.IntegrityError(msg="dup", errno=1062)))
@@ -0,0 +1,45 @@
+from app import BLUEPRINTS, create_app
+from entity.db_pool import DatabasePool, get_pool
+from entity.sqlite_backend import SqlitePool
+
+
+def test_create_app_does_not_connect():
+    # nothing listens on this port; building the app must not notice
+    app = create_app({"DB_CONFIG": {"host": "127.0.0.1", "port": 1, "user": "x", "password": "x"}})
+    pool = get_pool(app)
+    assert isinstance(pool, DatabasePool)
+    assert not pool.opened
+
+
+def test_create_app_registers_every_blueprint_and_times_imports():
+    app = create_app({"DB_BACKEND": "sqlite"})
+    assert len(app.blueprints) == len(BLUEPRINTS)
+    timings = app.extensions["import_timings"]
+    assert {name for name, _ in BLUEPRINTS} <= set(timings)
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+def test_sqlite_app_serves_requests():
+    app = create_app({"DB_BACKEND": "sqlite"})
+    assert isinstance(get_pool(app), SqlitePool)
+    resp = app.test_client().get("/test_db")
+    assert resp.status_code == 200
+    assert b"successful" in resp.data
+
+
+def test_pooled_connection_is_profiled_once_per_request():
+    app = create_app({"DB_BACKEND": "sqlite", "DB_POOL_SIZE": 1})
+    client = app.test_client()
+    timings = [client.get("/test_db").headers["Server-Timing"] for _ in range(4)]
+    assert all('desc="1 queries' in t for t in timings), timings
+    # the pool keeps the bare connection, not the profiler's wrapper
+    assert [type(c).__name__ for c in get_pool(app)._idle] == ["SqliteConnection"]
+
+
+def test_sql_profiles_are_only_served_when_enabled():
+    assert create_app({"DB_BACKEND": "sqlite"}).test_client().get("/debug/sql").status_code == 404
+    client = create_app({"DB_BACKEND": "sqlite", "SQL_PROFILE_ENDPOINT": True}).test_client()
+    client.get("/test_db")
+    resp = client.get("/debug/sql")
+    assert resp.status_code == 200
+    assert resp.get_json()["requests"]
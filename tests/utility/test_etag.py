@@ -0,0 +1,39 @@
+from flask import Flask, jsonify
+from utility.etag import conditional
+
+def _client(state):
+    app = Flask(__name__)
+
+    @app.get("/items")
+    @conditional(lambda: state["marker"])
+    def items():
+        state["calls"] += 1
+        return jsonify([1, 2, 3])
+
+    return app.test_client()
+
+def test_matching_if_none_match_skips_the_view():
+    state = {"marker": (3, "2025-10-20 04:04:41"), "calls": 0}
+    client = _client(state)
+    first = client.get("/items")
+    assert first.status_code == 200 and first.headers["ETag"]
+    again = client.get("/items", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert state["calls"] == 1
+
+def test_marker_change_or_other_query_string_returns_full_body():
+    state = {"marker": (3,), "calls": 0}
+    client = _client(state)
+    tag = client.get("/items").headers["ETag"]
+    assert client.get("/items?search=x", headers={"If-None-Match": tag}).status_code == 200
+    state["marker"] = (4,)
+    resp = client.get("/items", headers={"If-None-Match": tag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != tag
+
+def test_no_marker_means_no_etag():
+    state = {"marker": None, "calls": 0}
+    resp = _client(state).get("/items")
+    assert resp.status_code == 200
+    assert "ETag" not in resp.headers
@@ -0,0 +1,29 @@
+import threading
+from utility.event_hub import EventHub, RESET
+
+def test_subscriber_wakes_on_publish_and_idles_with_keepalive():
+    hub = EventHub(keepalive=0.05)
+    feed = hub.subscribe()
+    assert next(feed) is None  # nothing yet: heartbeat
+    threading.Timer(0.01, hub.publish, args=("created", {"n": 1})).start()
+    event = next(e for e in feed if e is not None)
+    assert (event.type, event.data) == ("created", {"n": 1})
+    assert hub.stats()["subscribers"] == 1
+    feed.close()
+    assert hub.stats()["subscribers"] == 0
+
+def test_resume_from_last_event_id_and_reset_when_too_far_behind():
+    hub = EventHub(history=3, keepalive=0.01)
+    for n in range(1, 5):
+        hub.publish("updated", {"n": n})
+    resumed = hub.subscribe(last_event_id=2)
+    assert [next(resumed).data["n"] for _ in range(2)] == [3, 4]
+    behind = hub.subscribe(last_event_id=0)
+    assert next(behind).type == RESET
+    assert next(hub.subscribe(last_event_id=99)).type == RESET  # id from a previous process
+
+def test_close_ends_subscriptions():
+    hub = EventHub(keepalive=5)
+    feed = hub.subscribe()
+    threading.Timer(0.01, hub.close).start()
+    assert list(feed) == []
@@ -0,0 +1,46 @@
+import json
+from flask import Flask
+from utility.json_stream import stream_json_array, wants_stream
+
+def _app(source):
+    app = Flask(__name__)
+
+    @app.get("/items")
+    def items():
+        if wants_stream():
+            return stream_json_array(source(), lambda n: {"id": n})
+        return "not streamed"
+
+    return app.test_client()
+
+def test_streamed_array_matches_items_across_chunks():
+    client = _app(lambda: iter(range(250)))
+    resp = client.get("/items?stream=1")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/json"
+    assert json.loads(resp.get_data(as_text=True)) == [{"id": n} for n in range(250)]
+
+def test_empty_source_gives_empty_array():
+    resp = _app(lambda: iter(())).get("/items?stream=1")
+    assert json.loads(resp.get_data(as_text=True)) == []
+
+def test_error_before_first_item_propagates_to_caller():
+    def failing():
+        raise RuntimeError("db down")
+        yield
+
+    app = Flask(__name__)
+
+    @app.get("/items")
+    def items():
+        try:
+            return stream_json_array(failing())
+        except RuntimeError as e:
+            return {"error": str(e)}, 500
+
+    resp = app.test_client().get("/items")
+    assert resp.status_code == 500
+    assert resp.get_json() == {"error": "db down"}
+
+def test_stream_flag_is_opt_in():
+    assert _app(lambda: iter(())).get("/items").get_data(as_text=True) == "not streamed"
@@ -0,0 +1,45 @@
+import threading
+from flask import Flask, Blueprint
+from utility import metrics
+from utility.metrics import Counter, Histogram
+
+def test_counter_sums_stripes_across_threads():
+    c = Counter("jobs_total", "Jobs.")
+    labels = (("kind", "a"),)
+    threads = [threading.Thread(target=lambda: [c.inc(labels) for _ in range(1000)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert c.collect() == {labels: 8000}
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.7, 3.0):
+        h.observe((("route", "/x"),), v)
+    lines = h.render()
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/x"} 4' in lines
+
+def test_request_hooks_label_by_blueprint_and_route_template():
+    app = Flask(__name__)
+    bp = Blueprint("pin_req_api", __name__)
+
+    @bp.get("/api/requests/<int:request_id>")
+    def get_request(request_id):
+        return "ok"
+
+    app.register_blueprint(bp)
+    metrics.init_app(app)
+    client = app.test_client()
+    client.get("/api/requests/1")
+    client.get("/api/requests/2")
+    client.get("/nope")
+
+    text = metrics.get_metrics(app).render(app)
+    assert ('http_requests_total{blueprint="pin_req_api",route="/api/requests/<int:request_id>",'
+            'method="GET",status="200"} 2') in text
+    assert 'http_requests_total{blueprint="app",route="<unmatched>",method="GET",status="404"} 1' in text
+    assert "http_requests_in_flight 0" in text
@@ -0,0 +1,135 @@
+# utility/event_hub.py
+"""
+In-process fan-out of request events to Server-Sent Events subscribers.
+
+Publishers append to one bounded ring of recent events and wake every waiting
+subscriber with a single `notify_all`. Subscribers keep no queue of their own,
+only the id of the last event they saw, so hundreds of idle connections cost a
+blocked thread each and nothing per event beyond reading the new tail. The ring
+also lets a reconnecting client resume from `Last-Event-ID`; one that fell
+further behind than the ring gets a `reset` event and should refetch.
+
+The hub lives in one process: with several worker processes each serves the
+events published by its own workers.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from flask import Flask, current_app
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+
+RESET = "reset"
+
+
+class EventHub:
+    def __init__(self, history: int = 1000, keepalive: float = 15.0):
+        self.keepalive = keepalive
+        self._cond = threading.Condition()
+        self._events: Deque[Event] = deque(maxlen=history)
+        self._last_id = 0
+        self._subscribers = 0
+        self._published = 0
+        self._closed = False
+
+    # ---------- producer side ----------
+    def publish(self, type: str, data: Dict[str, Any]) -> Event:
+        with self._cond:
+            self._last_id += 1
+            event = Event(self._last_id, type, data)
+            self._events.append(event)
+            self._published += 1
+            self._cond.notify_all()
+        return event
+
+    # ---------- consumer side ----------
+    def subscribe(
+        self, last_event_id: Optional[int] = None, accept: Optional[Callable[[Event], bool]] = None
+    ) -> Iterator[Optional[Event]]:
+        """
+        Yield events published after `last_event_id` (default: from now on) that
+        pass `accept`, forever. Yields None when nothing arrived for `keepalive`
+        seconds so the caller can write a heartbeat and notice dead clients.
+        """
+        with self._cond:
+            self._subscribers += 1
+            if last_event_id is None:
+                seen = self._last_id
+            elif last_event_id > self._last_id:
+                seen = -1  # id from before a restart: force a reset
+            else:
+                seen = last_event_id
+        try:
+            while True:
+                with self._cond:
+                    if seen == self._last_id and not self._closed:
+                        self._cond.wait(self.keepalive)
+                    if self._closed:
+                        return
+                    missed = self._last_id - seen
+                    oldest = self._events[0].id if self._events else self._last_id + 1
+                    if missed and seen + 1 < oldest:
+                        # older events already left the ring
+                        pending = [Event(self._last_id, RESET, {})]
+                    else:
+                        start = len(self._events) - missed
+                        pending = list(itertools.islice(self._events, start, None))
+                    seen = self._last_id
+                if not pending:
+                    yield None
+                for event in pending:
+                    if event.type == RESET or accept is None or accept(event):
+                        yield event
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    def close(self) -> None:
+        """End every open subscription (shutdown, tests)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "subscribers": self._subscribers,
+                "published": self._published,
+                "buffered": len(self._events),
+                "last_id": self._last_id,
+            }
+
+
+def format_sse(event: Optional[Event], dumps: Callable[[Any], str]) -> str:
+    """One SSE frame; None becomes a comment line used as heartbeat."""
+    if event is None:
+        return ": keepalive\n\n"
+    return f"id: {event.id}\nevent: {event.type}\ndata: {dumps(event.data)}\n\n"
+
+
+# ---------- Flask integration ----------
+def init_app(app: Flask) -> EventHub:
+    app.config.setdefault("EVENT_HUB_HISTORY", 1000)
+    app.config.setdefault("EVENT_HUB_KEEPALIVE", 15.0)
+    hub = EventHub(
+        history=int(app.config["EVENT_HUB_HISTORY"]),
+        keepalive=float(app.config["EVENT_HUB_KEEPALIVE"]),
+    )
+    app.extensions["event_hub"] = hub
+    return hub
+
+
+def get_event_hub(app: Optional[Flask] = None) -> EventHub:
+    app = app or current_app
+    return app.extensions["event_hub"]
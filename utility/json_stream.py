@@ -0,0 +1,45 @@
+# utility/json_stream.py
+"""
+Chunked JSON array responses.
+
+`stream_json_array(items, to_dict)` serialises one item at a time with the
+app's JSON provider (same output as `jsonify`) and sends the array in chunks,
+so the response never holds more than a few items in memory. Pair it with a
+lazy source such as `stream_rows` for constant memory end to end.
+"""
+from typing import Any, Callable, Iterable, Iterator
+
+from flask import Response, current_app, request, stream_with_context
+
+ITEMS_PER_CHUNK = 100
+
+
+def wants_stream() -> bool:
+    """True when the client asked for a streamed list (`?stream=1`)."""
+    return request.args.get("stream", "").lower() in ("1", "true", "yes")
+
+
+def stream_json_array(
+    items: Iterable[Any], to_dict: Callable[[Any], Any] = lambda item: item, status: int = 200
+) -> Response:
+    it = iter(items)
+    # Pull the first item now: the query runs before the 200 is committed, so a
+    # failing query can still be turned into an error response by the caller.
+    try:
+        first = next(it)
+    except StopIteration:
+        return Response("[]\n", status=status, mimetype="application/json")
+    dumps = current_app.json.dumps
+
+    def generate() -> Iterator[str]:
+        buf = ["[", dumps(to_dict(first))]
+        for item in it:
+            buf.append(",")
+            buf.append(dumps(to_dict(item)))
+            if len(buf) >= ITEMS_PER_CHUNK * 2:
+                yield "".join(buf)
+                buf.clear()
+        buf.append("]\n")
+        yield "".join(buf)
+
+    return Response(stream_with_context(generate()), status=status, mimetype="application/json")
@@ -0,0 +1,270 @@
+# utility/metrics.py
+"""
+In-process request metrics in the Prometheus text exposition format.
+
+Counters and histograms are striped: each worker thread updates one of
+`STRIPES` shards chosen by its thread id, each behind its own lock, so
+concurrent requests rarely contend and a scrape just sums the shards.
+Gauges for the pool, the category and request caches, view sink, event hub
+and SQL profiler are read from `app.extensions` at scrape time, so the hot
+path never touches them.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import Flask, current_app, g, request
+
+STRIPES = 16
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Striped:
+    def __init__(self):
+        self._locks = [threading.Lock() for _ in range(STRIPES)]
+        self._shards: List[Dict[Labels, Any]] = [{} for _ in range(STRIPES)]
+
+    def _slot(self) -> int:
+        return threading.get_ident() % STRIPES
+
+
+class Counter(_Striped):
+    def __init__(self, name: str, help_text: str):
+        super().__init__()
+        self.name = name
+        self.help = help_text
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        i = self._slot()
+        with self._locks[i]:
+            shard = self._shards[i]
+            shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                items = list(shard.items())
+            for labels, v in items:
+                totals[labels] = totals.get(labels, 0) + v
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, v in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_fmt_labels(labels)} {_fmt_value(v)}")
+        return lines
+
+
+class Histogram(_Striped):
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: Labels, value: float) -> None:
+        i = self._slot()
+        with self._locks[i]:
+            shard = self._shards[i]
+            data = shard.get(labels)
+            if data is None:
+                # per-bucket (non-cumulative) counts, then +Inf, sum
+                data = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for b, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[b] += 1
+                    break
+            else:
+                data[len(self.buckets)] += 1
+            data[-1] += value
+
+    def collect(self) -> Dict[Labels, List[float]]:
+        totals: Dict[Labels, List[float]] = {}
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                items = [(k, list(v)) for k, v in shard.items()]
+            for labels, data in items:
+                acc = totals.setdefault(labels, [0] * len(data))
+                for j, v in enumerate(data):
+                    acc[j] += v
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, data in sorted(self.collect().items()):
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), data):
+                running += n
+                le = "+Inf" if bound == float("inf") else _fmt_value(bound)
+                lines.append(f"{self.name}_bucket{_fmt_labels(labels + (('le', le),))} {running}")
+            lines.append(f"{self.name}_sum{_fmt_labels(labels)} {_fmt_value(data[-1])}")
+            lines.append(f"{self.name}_count{_fmt_labels(labels)} {running}")
+        return lines
+
+
+class RequestMetrics:
+    """HTTP metrics recorded by the request hooks below."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.requests = Counter("http_requests_total", "HTTP requests by blueprint, route, method and status.")
+        self.latency = Histogram(
+            "http_request_duration_seconds", "HTTP request latency by blueprint, route and method.", buckets
+        )
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    def started(self) -> None:
+        with self._in_flight_lock:
+            self._in_flight += 1
+
+    def finished(self, blueprint: str, route: str, method: str, status: int, seconds: float) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        base = (("blueprint", blueprint), ("route", route), ("method", method))
+        self.requests.inc(base + (("status", str(status)),))
+        self.latency.observe(base, seconds)
+
+    def render(self, app: Flask) -> str:
+        lines = self.requests.render() + self.latency.render()
+        lines += _gauge("http_requests_in_flight", "Requests currently being served.", [((), self._in_flight)])
+        lines += _extension_gauges(app)
+        return "\n".join(lines) + "\n"
+
+
+# ---------- gauges read from other extensions at scrape time ----------
+def _extension_gauges(app: Flask) -> List[str]:
+    lines: List[str] = []
+    ext = app.extensions
+
+    pool = ext.get("db_pool")
+    if pool is not None:
+        s = pool.stats()
+        lines += _gauge("db_pool_size", "Configured database pool size.", [((), s["size"])])
+        lines += _gauge(
+            "db_pool_connections",
+            "Database connections by state.",
+            [((("state", "in_use"),), s["in_use"]), ((("state", "idle"),), s["idle"])],
+        )
+
+    cache = ext.get("category_cache")
+    if cache is not None:
+        s = cache.stats()
+        lookups = s["hits"] + s["misses"]
+        lines += _gauge(
+            "category_cache_lookups_total",
+            "Category cache lookups by result.",
+            [((("result", "hit"),), s["hits"]), ((("result", "miss"),), s["misses"])],
+            kind="counter",
+        )
+        lines += _gauge(
+            "category_cache_hit_ratio", "Share of category lookups served from memory.",
+            [((), s["hits"] / lookups if lookups else 0)],
+        )
+
+    requests_cache = ext.get("request_cache")
+    if requests_cache is not None:
+        s = requests_cache.stats()
+        lines += _gauge(
+            "request_cache_lookups_total",
+            "Request detail cache lookups by result.",
+            [((("result", "hit"),), s["hits"]), ((("result", "miss"),), s["misses"])],
+            kind="counter",
+        )
+        lines += _gauge("request_cache_evictions_total", "Requests evicted by the LRU bound.",
+                        [((), s["evictions"])], kind="counter")
+        lines += _gauge("request_cache_entries", "Requests currently cached.", [((), s["size"])])
+
+    flight = ext.get("single_flight")
+    if flight is not None:
+        s = flight.stats()
+        lines += _gauge(
+            "single_flight_calls_total",
+            "Coalesced repository reads: executed vs served from another caller's query.",
+            [((("result", "executed"),), s["executions"]), ((("result", "shared"),), s["shared"])],
+            kind="counter",
+        )
+
+    sink = ext.get("view_sink")
+    if sink is not None:
+        s = sink.stats()
+        lines += _gauge("view_sink_queued", "Request views waiting to be written.", [((), s["queued"])])
+        lines += _gauge(
+            "view_sink_events_total",
+            "Request views by outcome.",
+            [((("outcome", k),), s[k]) for k in ("accepted", "dropped", "flushed", "failed", "orphaned") if k in s],
+            kind="counter",
+        )
+
+    hub = ext.get("event_hub")
+    if hub is not None:
+        s = hub.stats()
+        lines += _gauge("event_hub_subscribers", "Open request event streams.", [((), s["subscribers"])])
+        lines += _gauge("event_hub_events_total", "Request events published.", [((), s["published"])], kind="counter")
+
+    profiler = ext.get("sql_profiler")
+    if profiler is not None:
+        s = profiler.stats()
+        lines += _gauge(
+            "sql_profiled_requests_total",
+            "Requests profiled, and those flagged as likely N+1.",
+            [((("kind", "all"),), s["requests"]), ((("kind", "flagged"),), s["flagged"])],
+            kind="counter",
+        )
+    return lines
+
+
+def _gauge(name: str, help_text: str, samples: Iterable[Tuple[Labels, float]], kind: str = "gauge") -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_fmt_labels(labels)} {_fmt_value(v)}" for labels, v in samples]
+    return lines
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_value(v: float) -> str:
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v)) if abs(v) < 1e15 else repr(v)
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+# ---------- Flask integration ----------
+def init_app(app: Flask) -> RequestMetrics:
+    metrics = RequestMetrics(app.config.get("METRICS_LATENCY_BUCKETS", DEFAULT_BUCKETS))
+    app.extensions["metrics"] = metrics
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    return metrics
+
+
+def get_metrics(app: Optional[Flask] = None) -> RequestMetrics:
+    app = app or current_app
+    return app.extensions["metrics"]
+
+
+def _start_timer() -> None:
+    g._metrics_started = time.perf_counter()
+    get_metrics().started()
+
+
+def _record_request(response):
+    started = g.pop("_metrics_started", None)
+    if started is not None:
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        get_metrics().finished(
+            request.blueprint or "app", rule, request.method, response.status_code, time.perf_counter() - started
+        )
+    return response
@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+class KeysetCursor:
+    """
+    Opaque cursor for keyset pagination over (created_at, request_id).
+    Clients only ever echo back the `next_cursor` string they were given.
+    """
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 200
+
+    @staticmethod
+    def encode(created_at: datetime, request_id: int) -> str:
+        raw = json.dumps({"c": created_at.isoformat(), "id": request_id}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return datetime.fromisoformat(data["c"]), int(data["id"])
+        except Exception as e:
+            raise ValueError("cursor is invalid") from e
+
+    @staticmethod
+    def _require_limit(limit: Optional[int]) -> int:
+        if limit is None:
+            return KeysetCursor.DEFAULT_LIMIT
+        if not isinstance(limit, int) or limit <= 0:
+            raise ValueError("limit must be a positive integer")
+        return min(limit, KeysetCursor.MAX_LIMIT)